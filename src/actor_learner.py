@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+from multiprocessing import Pipe, Process, Queue
+
+import numpy as np
+
+from const import Const
+
+
+class ActorLearner:
+  """
+  Trains the learners in a dedicated learner process while the actors (the processes that play the
+  hands) keep generating training data: The training data of each training interval is queued for the
+  learner process, which trains the players on it and sends the trained players back so they can be
+  published to the actors. The learner process also writes the checkpoints of the players and the losses.
+  """
+
+  def __init__(self, players, trained_players, log):
+    """
+    Starts a new learner process.
+
+    :players: All players of the game, which are sent back after training.
+    :trained_players: The distinct players to train and checkpoint, out of all players.
+    :log: Logger instance.
+    """
+    self.log = log
+    # number of hands whose training data the players that were received last are trained on
+    self.trained_hands = 0
+
+    self._jobs = Queue()
+    self._updates, updates = Pipe(duplex=False)
+    self._process = Process(target=ActorLearner._learn, args=(players, trained_players, self._jobs, updates, log),
+        name="learner", daemon=True)
+    self._process.start()
+    updates.close()
+    self.log.info("Started learner process {}".format(self._process.pid))
+
+  @property
+  def pid(self):
+    return self._process.pid
+
+  def train(self, training_data):
+    """
+    Queues training data for the learner process.
+
+    :training_data: 2D-numpy-array of samples to train on.
+    """
+    # the queue sends the data in the background, by which time the rows may already be overwritten
+    self._jobs.put(("train", np.array(training_data)))
+
+  def checkpoint(self, current_iteration, total_iterations):
+    """
+    Queues a checkpoint of the players for the learner process, which is created after the queued training.
+
+    :current_iteration: The number of the currently finished iteration.
+    :total_iterations: The total number of iterations.
+    """
+    self._jobs.put(("checkpoint", (current_iteration, total_iterations)))
+
+  def has_update(self):
+    """
+    Checks whether the learner process sent trained players.
+
+    :returns: True if trained players can be received without waiting.
+    """
+    return self._updates.poll()
+
+  def receive_update(self):
+    """
+    Receives the players of the next training, waiting for the learner process to finish it if needed.
+
+    :returns: List of all (trained) players.
+    """
+    self.trained_hands, players = self._updates.recv()
+    self.log.debug("Received players trained on {} hands".format(self.trained_hands))
+    return players
+
+  def stop(self):
+    """
+    Waits for the learner process to finish the queued jobs and stops it.
+
+    :returns: List of all players after the last training or None if nothing was trained.
+    """
+    self._jobs.put(None)
+    players = None
+    while True:
+      update = self._updates.recv()
+      if update is None:
+        break
+      self.trained_hands, players = update
+    self._process.join()
+    return players
+
+  @staticmethod
+  def _learn(players, trained_players, jobs, updates, log):
+    trained_hands = 0
+    for job, arguments in iter(jobs.get, None):
+      if job == "train":
+        for player in trained_players:
+          player.train(arguments, log)
+        trained_hands += len(arguments) // Const.DECISIONS_PER_HAND
+        updates.send((trained_hands, players))
+      else:
+        for player in trained_players:
+          player.checkpoint(*arguments, log)
+    updates.send(None)
+    updates.close()
@@ -3,9 +3,8 @@
 
 from abc import abstractmethod
 
-import numpy as np
-
 from game_type import GameType
+from hand_random import HandRandom
 from player import Player
 
 
@@ -35,7 +34,7 @@ class BaselinePlayer(Player):
   @staticmethod
   def _select_random_game_type():
     game_types = list(GameType)
-    return game_types[np.random.randint(len(game_types))]
+    return game_types[HandRandom.generator.integers(len(game_types))]
 
 class RandomCardPlayer(BaselinePlayer):
   """
@@ -48,7 +47,7 @@ class RandomCardPlayer(BaselinePlayer):
 
   def _select_card(self, args, log):
     valid_cards = args[0]
-    return valid_cards[np.random.randint(len(valid_cards))]
+    return valid_cards[int(HandRandom.generator.random() * len(valid_cards))]
 
   def _select_game_type(self):
     return BaselinePlayer._select_random_game_type()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+
+import numpy as np
+
+import parallel_game
+import utils
+from baseline_players import HighestCardPlayer, RandomCardPlayer
+from card_tables import CardTables
+from const import Const
+from game_type import GameType
+from hand_random import HandRandom
+from learner_player import LearnerPlayer
+from parallel_game import ParallelGame
+from player import Player
+
+
+class BatchGame(ParallelGame):
+  """
+  Plays all hands of a batch at once, using numpy arrays instead of Hand/Round instances.
+  Only players whose decisions don't depend on the state of the game are supported.
+  """
+
+  SUPPORTED_STRATEGIES = ["random", "highest"]
+
+  def __init__(self, players):
+    super(BatchGame, self).__init__(players)
+    assert all(isinstance(player, (RandomCardPlayer, HighestCardPlayer)) for player in players), \
+        "only random and highest card players can play batches of hands"
+    self._highest_card_seats = np.array([isinstance(player, HighestCardPlayer) for player in players])
+
+  def play_hands(self, already_played_hands, training_data=None, hand_count=None):
+    return self._play_deals(self._deal_stream.get_deals(already_played_hands, int(hand_count or Config.BATCH_SIZE)),
+        already_played_hands, training_data)
+
+  def _play_deals(self, deals, already_played_hands, training_data=None):
+    """
+    Plays one hand for each deal.
+
+    :deals: 2D-numpy-array with the card ids in the order in which they're distributed.
+    :already_played_hands: Number of hands that were played before.
+    :training_data: Optional: Array to write the training data to instead of a new array, if it's needed.
+
+    :returns: The same tuple as `ParallelGame.play_hands`.
+    """
+    log = parallel_game.LOG
+    count = len(deals)
+    store_training_data = Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING
+    log.debug("[{}]: Starting to play {} hands...".format(self._id, utils.format_human(count)))
+
+    dealers = (already_played_hands + np.arange(count)) % Const.PLAYER_COUNT
+    game_types, random_values = BatchGame._draw_random_decisions(already_played_hands, count)
+    selected_game_types = np.zeros((Const.PLAYER_COUNT, len(GameType)), dtype=int)
+    np.add.at(selected_game_types, (dealers, game_types), 1)
+
+    if store_training_data:
+      if training_data is None:
+        # samples per game times number of games, number of cards plus score
+        training_data = np.ones((Const.DECISIONS_PER_HAND * count, Const.CARDS_PER_HAND + 1), dtype=int)
+      game_type_decisions = BatchGame._get_game_type_decisions(deals, dealers, game_types)
+    else:
+      training_data = None
+      game_type_decisions = None
+
+    trick_scores, trick_winners = self._play_tricks(deals, dealers, game_types, random_values, training_data)
+
+    # the hand is done, add 5 points for the last stich
+    team_1_tricks = trick_winners % 2 == 0
+    scores_team_1 = np.where(team_1_tricks, trick_scores, 0)
+    scores_team_2 = np.where(team_1_tricks, 0, trick_scores)
+    scores_team_1 = np.concatenate((scores_team_1, 5 * team_1_tricks[:, -1:]), axis=1)
+    scores_team_2 = np.concatenate((scores_team_2, 5 * ~team_1_tricks[:, -1:]), axis=1)
+    hand_scores_team_1 = scores_team_1.sum(axis=1)
+    hand_scores_team_2 = scores_team_2.sum(axis=1)
+
+    if store_training_data:
+      BatchGame._add_rewards(training_data, trick_scores, trick_winners, hand_scores_team_1, hand_scores_team_2)
+      game_type_decisions[:, -1] = np.where(dealers % 2 == 0, hand_scores_team_1, hand_scores_team_2)
+
+    score_progress = np.stack((np.cumsum(scores_team_1, axis=1), np.cumsum(scores_team_2, axis=1)), axis=-1)
+
+    log.debug("[{}]: ... finished playing {} hands".format(self._id, utils.format_human(count)))
+
+    # the baseline players don't predict any scores
+    return score_progress, training_data, game_type_decisions, selected_game_types, \
+        LearnerPlayer.collect_inference_statistics()
+
+  @staticmethod
+  def _draw_random_decisions(first_hand, count):
+    """
+    Draws the random numbers of the hands in the same way as the players of `Hand`.
+
+    :first_hand: Index of the first hand within the whole game.
+    :count: Number of hands.
+
+    :returns: A tuple with the game type value of each hand and the random values for the card
+      selections of the random players of each hand.
+    """
+    game_types = np.full(count, Config.FORCE_GAME_TYPE.value if Config.FORCE_GAME_TYPE else 0)
+    random_values = np.zeros((count, Const.CARDS_PER_HAND))
+    for i in range(count):
+      generator = HandRandom.get_decision_generator(first_hand + i)
+      if not Config.FORCE_GAME_TYPE:
+        game_types[i] = generator.integers(len(GameType))
+      random_values[i] = generator.random(Const.CARDS_PER_HAND)
+    return game_types, random_values
+
+  @staticmethod
+  def _get_game_type_decisions(deals, dealers, game_types):
+    # number of games, number of initial hand cards plus chosen game type and score
+    game_type_decisions = np.ones((len(deals), Const.CARDS_PER_PLAYER + 2), dtype=int)
+    dealer_cards = np.sort(deals.reshape(len(deals), Const.PLAYER_COUNT, Const.CARDS_PER_PLAYER)[
+      np.arange(len(deals)), dealers], axis=1)
+    game_type_decisions[:, 0] = game_types
+    game_type_decisions[:, 1:-1] = Config.ENCODING.card_indices[GameType.OBENABE.value, dealer_cards]
+    return game_type_decisions
+
+  def _play_tricks(self, deals, dealers, game_types, random_values, training_data):
+    """
+    Plays all tricks of all hands.
+
+    :deals: 2D-numpy-array with the card ids in the order in which they're distributed.
+    :dealers: Index of the player that plays the first card, per hand.
+    :game_types: Game type value per hand.
+    :random_values: Random values for the card selections of the random players, per hand.
+    :training_data: Array to write the decision states to, None if they aren't needed.
+
+    :returns: A tuple with the scores and the winning player of each trick of each hand.
+    """
+    # pylint: disable=too-many-locals
+    count = len(deals)
+    hand_indices = np.arange(count)
+    in_hand = np.zeros((count, Const.PLAYER_COUNT, Const.CARDS_PER_HAND), dtype=bool)
+    in_hand[hand_indices[:, np.newaxis], np.arange(Const.CARDS_PER_HAND) // Const.CARDS_PER_PLAYER, deals] = True
+    # absolute player who played the card in a previous trick, -1 if the card wasn't played
+    owners = np.full((count, Const.CARDS_PER_HAND), -1)
+
+    is_trump = CardTables.IS_TRUMP[game_types]
+    strengths = CardTables.STRENGTHS[game_types]
+    priorities = CardTables.VALUE_RANKS[game_types] * Const.CARDS_PER_HAND * 2
+    buurs = np.maximum(CardTables.TRUMP_SUITS[game_types], 0) * Const.CARDS_PER_SUIT + CardTables.VALUE_BUUR
+
+    trick_scores = np.zeros((count, Const.CARDS_PER_PLAYER), dtype=int)
+    trick_winners = np.zeros((count, Const.CARDS_PER_PLAYER), dtype=int)
+    # number of random values that were used per hand
+    random_counts = np.zeros(count, dtype=int)
+    leaders = dealers
+    for trick in range(Const.CARDS_PER_PLAYER):
+      trick_cards = np.zeros((count, Const.PLAYER_COUNT), dtype=int)
+      best_trump_strengths = np.full(count, -1)
+      for position in range(Const.PLAYER_COUNT):
+        seats = (leaders + position) % Const.PLAYER_COUNT
+        hands = in_hand[hand_indices, seats]
+        if position == 0:
+          # the first player can always choose from all cards
+          valid_cards = hands
+          orders = np.arange(Const.CARDS_PER_HAND)
+        else:
+          valid_cards, orders = BatchGame._get_valid_cards(hands, trick_cards[:, 0], is_trump, strengths,
+              best_trump_strengths, buurs)
+
+        random_seats = ~self._highest_card_seats[seats]
+        selected_cards = np.where(random_seats,
+            BatchGame._select_random_cards(valid_cards, orders, random_values[hand_indices, random_counts]),
+            np.argmax(np.where(valid_cards, priorities - orders, -2 * Const.CARDS_PER_HAND), axis=1))
+        if trick < Const.CARDS_PER_PLAYER - 1:
+          # the cards of the last trick are played without a decision
+          random_counts += random_seats
+
+        if training_data is not None and trick < Const.CARDS_PER_PLAYER - 1:
+          rows = hand_indices * Const.DECISIONS_PER_HAND + (seats % 2) * Const.DECISIONS_PER_HAND // 2 + \
+              trick * 2 + seats // 2
+          training_data[rows, :-1] = BatchGame._encode_decision_states(seats, hands, owners,
+              trick_cards[:, :position], selected_cards, is_trump, game_types)
+
+        in_hand[hand_indices, seats, selected_cards] = False
+        trick_cards[:, position] = selected_cards
+        best_trump_strengths = np.where(is_trump[hand_indices, selected_cards],
+            np.maximum(best_trump_strengths, strengths[hand_indices, selected_cards]), best_trump_strengths)
+
+      # evaluate trick, the winner starts the next one
+      owners[hand_indices[:, np.newaxis], trick_cards] = \
+          (leaders[:, np.newaxis] + np.arange(Const.PLAYER_COUNT)) % Const.PLAYER_COUNT
+      leaders = (leaders + CardTables.get_trick_winners(game_types, trick_cards)) % Const.PLAYER_COUNT
+      trick_scores[:, trick] = CardTables.get_trick_scores(game_types, trick_cards)
+      trick_winners[:, trick] = leaders
+
+    return trick_scores, trick_winners
+
+  @staticmethod
+  def _get_valid_cards(hands, first_cards, is_trump, strengths, best_trump_strengths, buurs):
+    """
+    Determines the valid cards like `Player.get_valid_cards_to_play` for the players of all hands.
+
+    :returns: A tuple with the valid cards and their order within the list of valid cards.
+    """
+    hand_indices = np.arange(len(hands))
+    led_suit_cards = CardTables.SUITS == CardTables.SUITS[first_cards][:, np.newaxis]
+    following_cards = hands & led_suit_cards
+    can_follow = following_cards.any(axis=1, keepdims=True)
+    first_is_trump = is_trump[hand_indices, first_cards][:, np.newaxis]
+
+    # without trumps, this boils down to following suit if possible
+    trumps = hands & is_trump
+    non_undertrumping_trumps = trumps & (strengths > best_trump_strengths[:, np.newaxis])
+    only_trumps = (trumps == hands).all(axis=1, keepdims=True)
+    only_buur = (following_cards.sum(axis=1) == 1)[:, np.newaxis] & \
+        following_cards[hand_indices, buurs][:, np.newaxis]
+    valid_cards = np.where(can_follow,
+        np.where(first_is_trump, np.where(only_buur, hands, following_cards),
+          following_cards | non_undertrumping_trumps),
+        np.where(only_trumps, hands, (hands & ~is_trump) | non_undertrumping_trumps))
+
+    # cards that match the suit come before the trumps unless a trump was led
+    orders = np.arange(Const.CARDS_PER_HAND) + Const.CARDS_PER_HAND * (~led_suit_cards & ~first_is_trump)
+    return valid_cards, orders
+
+  @staticmethod
+  def _select_random_cards(valid_cards, orders, random_values):
+    # select the card at the random position within the (ordered) list of valid cards
+    selections = (random_values * valid_cards.sum(axis=1)).astype(int)
+    ordered_cards = np.argsort(np.where(valid_cards, orders, 2 * Const.CARDS_PER_HAND), axis=1)
+    return ordered_cards[np.arange(len(valid_cards)), selections]
+
+  @staticmethod
+  def _encode_decision_states(seats, hands, owners, played_cards, selected_cards, is_trump, game_types):
+    """
+    Encodes the decision states like `Player.select_card_to_play` for the players of all hands.
+
+    :seats: Index of the deciding player, per hand.
+    :hands: Cards in the hands of the deciding players.
+    :owners: Absolute players who played the cards in a previous trick, -1 for unknown cards.
+    :played_cards: Ids of the cards that are currently in play, in order of being played.
+    :selected_cards: Ids of the selected cards.
+    :is_trump: Whether the cards are trumps, per hand.
+    :game_types: Game type value per hand.
+
+    :returns: 2D-numpy-array with the decision state of each hand.
+    """
+    # pylint: disable=too-many-arguments
+    encoding = Config.ENCODING
+    hand_indices = np.arange(len(seats))
+    is_trump = is_trump.astype(int)
+    cards = np.where(owners >= 0, encoding.known_card_codes[seats[:, np.newaxis], owners, is_trump], 0)
+    in_play_codes = encoding.in_play_codes[played_cards.shape[1]]
+    for i in range(played_cards.shape[1]):
+      cards[hand_indices, played_cards[:, i]] = in_play_codes[i, is_trump[hand_indices, played_cards[:, i]]]
+    cards[hands] = encoding.in_hand_codes[is_trump[hands]]
+    cards[hand_indices, selected_cards] = encoding.selected_codes[is_trump[hand_indices, selected_cards]]
+
+    # move the cards from the card id to the card index of the encoding
+    states = np.zeros_like(cards)
+    states[hand_indices[:, np.newaxis], encoding.card_indices[game_types]] = cards
+
+    if encoding.sort_states:
+      states = Player._sort_decision_states(states, encoding.card_index_by_suit) # pylint: disable=protected-access
+    return states
+
+  @staticmethod
+  def _add_rewards(training_data, trick_scores, trick_winners, hand_scores_team_1, hand_scores_team_2):
+    # the rows of each hand are the 16 decisions of team 1 followed by those of team 2, 2 per trick
+    decisions_per_team = Const.DECISIONS_PER_HAND // 2
+    row_tricks = np.tile(np.repeat(np.arange(Const.CARDS_PER_PLAYER - 1), 2), 2)
+    row_teams = np.repeat(np.arange(2), decisions_per_team)
+
+    won_tricks = (trick_winners[:, row_tricks] % 2) == row_teams
+    round_scores = np.where(won_tricks, 1, -1) * trick_scores[:, row_tricks] * Config.ENCODING.round_score_factor
+    hand_scores = np.where(row_teams == 0, hand_scores_team_1[:, np.newaxis], hand_scores_team_2[:, np.newaxis]) * \
+        Config.ENCODING.hand_score_factor
+    training_data[:, -1] = (round_scores + hand_scores).reshape(-1)
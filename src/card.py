@@ -3,6 +3,7 @@
 
 from config import Config
 
+from card_tables import CardTables
 from const import Const
 from game_type import GameType
 
@@ -29,15 +30,17 @@ class Card:
   VALUE_BANNER = 4
   VALUE_BUUR = 5
 
-  VALUE_ORDER_TRUMP = [0, 1, 2, 7, 3, 8, 4, 5, 6]
-
   def __init__(self, suit, value):
     self._suit = suit
     self._value = value
+    self._card_id = suit * Const.CARDS_PER_SUIT + value
     self._icon = Card.VALUES[value] + Card.SUITS[suit]
     self._game_type = None
     self._score = None
     self._is_trump = None
+    self._value_rank = None
+    self._strength = None
+    self._card_index = None
 
   @property
   def suit(self):
@@ -53,6 +56,13 @@ class Card:
     """
     return self._value
 
+  @property
+  def card_id(self):
+    """
+    Id of the card (integer from 0 to 35) which is used to look up the card in the `CardTables`.
+    """
+    return self._card_id
+
   @property
   def score(self):
     """
@@ -97,78 +107,32 @@ class Card:
     """
     Index of the card within an array of all cards.
     """
-    value_map = Card.VALUE_ORDER_TRUMP if Config.ENCODING.order_value and self.is_trump else \
-        range(Const.CARDS_PER_SUIT)
-    if Config.ENCODING.card_index_by_suit:
-      return value_map[self.value] + self.suit * Const.CARDS_PER_SUIT
-    return Const.SUIT_COUNT * value_map[self.value] + self.suit
+    if self._card_index is None:
+      # before the game type is known, the card is treated like a non-trump
+      game_type = self._game_type or GameType.OBENABE
+      self._card_index = Config.ENCODING.card_indices[game_type.value, self._card_id].item()
+    return self._card_index
 
   def __str__(self):
     return self._icon
 
   def __eq__(self, other):
-    return isinstance(other, Card) and self.suit == other.suit and self.value == other.value
+    return isinstance(other, Card) and self._card_id == other._card_id
 
   def set_game_type(self, game_type):
     """
-    Remembers the game type and sets the score of the card depending on the game type (trump).
+    Remembers the game type and looks up the card's properties (e.g. score) for the game type.
 
     :game_type: Type of the game which determines the score of a card.
     """
     self._game_type = game_type
-    self._is_trump = self.suit == Card.TRUMP_GAME_TYPE_TO_SUIT.get(self._game_type)
-    if self._game_type == GameType.OBENABE:
-      scores = {
-          0: 0,
-          1: 0,
-          2: 8,
-          3: 0,
-          4: 10,
-          5: 2,
-          6: 3,
-          7: 4,
-          8: 11
-          }
-    elif self._game_type == GameType.UNNENUFE:
-      scores = {
-          0: 11,
-          1: 0,
-          2: 8,
-          3: 0,
-          4: 10,
-          5: 2,
-          6: 3,
-          7: 4,
-          8: 0
-          }
-    elif self._game_type.is_trump_game_type:
-      scores = {
-          0: 0,
-          1: 0,
-          2: 0,
-          3: 14,
-          4: 10,
-          5: 20,
-          6: 3,
-          7: 4,
-          8: 11
-          } if self._is_trump else {
-              0: 0,
-              1: 0,
-              2: 0,
-              3: 0,
-              4: 10,
-              5: 2,
-              6: 3,
-              7: 4,
-              8: 11
-              }
-    else:
-      raise ValueError("Unknown game type: '{}'".format(self._game_type))
-    self._score = scores[self._value]
+    self._is_trump = CardTables.IS_TRUMP[game_type.value, self._card_id].item()
+    self._score = CardTables.SCORES[game_type.value, self._card_id].item()
+    self._value_rank = CardTables.VALUE_RANKS[game_type.value, self._card_id].item()
+    self._strength = CardTables.STRENGTHS[game_type.value, self._card_id].item()
+    self._card_index = None
 
   def is_beaten_by(self, other_card):
-    # pylint: disable=too-many-return-statements
     """
     Determines if the current card is beaten by the other card.
 
@@ -176,26 +140,11 @@ class Card:
 
     :returns: True if the other card beats the current card instance.
     """
-    if self._game_type in [GameType.OBENABE, GameType.UNNENUFE]:
-      return self.suit == other_card.suit and self.has_worse_value_than(other_card)
-    if self._game_type.is_trump_game_type:
-      if self.is_trump ^ other_card.is_trump:
-        # only one of the cards is trump
-        return other_card.is_trump
-      if not self.is_trump:
-        # none of the cards is trump
-        return self.suit == other_card.suit and self.has_worse_value_than(other_card)
-      # both are trump
-      if self.is_buur:
-        return False
-      if other_card.is_buur:
-        return True
-      if self.is_nell:
-        return False
-      if other_card.is_nell:
-        return True
-      return self.has_worse_value_than(other_card)
-    raise ValueError("Unknown game type: '{}'".format(self._game_type))
+    if self._is_trump != other_card._is_trump: # pylint: disable=protected-access
+      # only one of the cards is trump
+      return other_card._is_trump # pylint: disable=protected-access
+    # the strength of the trumps already accounts for buur and nell
+    return self._suit == other_card._suit and self._strength < other_card._strength # pylint: disable=protected-access
 
   def has_worse_value_than(self, other_card):
     """
@@ -205,8 +154,4 @@ class Card:
 
     :returns: True if the other card has a better value than the current card instance.
     """
-    if self._game_type == GameType.OBENABE or self._game_type.is_trump_game_type:
-      return self.value < other_card.value
-    if self._game_type == GameType.UNNENUFE:
-      return self.value > other_card.value
-    raise ValueError("Unknown game type: '{}'".format(self._game_type))
+    return self._value_rank < other_card._value_rank # pylint: disable=protected-access
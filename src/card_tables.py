@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from const import Const
+from game_type import GameType
+
+
+class CardTables:
+  """
+  Precomputed rules of the game for cards that are represented as plain integer ids.
+
+  The id of a card is `suit * CARDS_PER_SUIT + value`, which corresponds to the order in which the
+  cards are created. All per-game-type tables are indexed by `[game_type.value, card_id]`.
+  """
+
+  CARD_COUNT = Const.CARDS_PER_HAND
+  GAME_TYPE_COUNT = len(GameType)
+
+  """
+  Suit and value of each card id.
+  """
+  SUITS = np.repeat(np.arange(Const.SUIT_COUNT), Const.CARDS_PER_SUIT)
+  VALUES = np.tile(np.arange(Const.CARDS_PER_SUIT), Const.SUIT_COUNT)
+
+  """
+  Trump suit of each game type, -1 if the game type doesn't have trumps.
+  """
+  TRUMP_SUITS = np.array([-1, -1, 0, 1, 2, 3])
+
+  """
+  Order of the trump values from lowest to highest: 6, 7, 8, 10, Q, K, A, 9 (nell), J (buur).
+  """
+  VALUE_ORDER_TRUMP = np.array([0, 1, 2, 7, 3, 8, 4, 5, 6])
+
+  """
+  Special values, these correspond to the values of `Card`.
+  """
+  VALUE_ACHT = 2
+  VALUE_NELL = 3
+  VALUE_BANNER = 4
+  VALUE_BUUR = 5
+
+  """
+  Scores of the values per game type, for trump and non-trump cards.
+  """
+  SCORES_OBENABE = [0, 0, 8, 0, 10, 2, 3, 4, 11]
+  SCORES_UNNENUFE = [11, 0, 8, 0, 10, 2, 3, 4, 0]
+  SCORES_TRUMP = [0, 0, 0, 14, 10, 20, 3, 4, 11]
+  SCORES_NON_TRUMP = [0, 0, 0, 0, 10, 2, 3, 4, 11]
+
+  @staticmethod
+  def _build_is_trump():
+    return CardTables.SUITS[np.newaxis, :] == CardTables.TRUMP_SUITS[:, np.newaxis]
+
+  @staticmethod
+  def _build_scores():
+    scores = np.zeros((CardTables.GAME_TYPE_COUNT, CardTables.CARD_COUNT), dtype=int)
+    for game_type in GameType:
+      if game_type == GameType.OBENABE:
+        scores[game_type.value] = np.array(CardTables.SCORES_OBENABE)[CardTables.VALUES]
+      elif game_type == GameType.UNNENUFE:
+        scores[game_type.value] = np.array(CardTables.SCORES_UNNENUFE)[CardTables.VALUES]
+      else:
+        scores[game_type.value] = np.where(CardTables.IS_TRUMP[game_type.value],
+            np.array(CardTables.SCORES_TRUMP)[CardTables.VALUES],
+            np.array(CardTables.SCORES_NON_TRUMP)[CardTables.VALUES])
+    return scores
+
+  @staticmethod
+  def _build_value_ranks():
+    # higher ranks are better values, this ignores the special order of the trumps
+    value_ranks = np.tile(CardTables.VALUES, (CardTables.GAME_TYPE_COUNT, 1))
+    value_ranks[GameType.UNNENUFE.value] = Const.CARDS_PER_SUIT - 1 - CardTables.VALUES
+    return value_ranks
+
+  @staticmethod
+  def _build_strengths():
+    # trumps are stronger than all non-trumps and are ordered by the special trump order
+    return np.where(CardTables.IS_TRUMP, Const.CARDS_PER_SUIT + CardTables.VALUE_ORDER_TRUMP[CardTables.VALUES],
+        CardTables.VALUE_RANKS)
+
+  @staticmethod
+  def _build_beaten_by():
+    # a card is beaten by a trump if it isn't a trump itself, otherwise by a stronger card of the same suit
+    is_trump = CardTables.IS_TRUMP
+    same_suit = CardTables.SUITS[:, np.newaxis] == CardTables.SUITS[np.newaxis, :]
+    stronger = CardTables.STRENGTHS[:, :, np.newaxis] < CardTables.STRENGTHS[:, np.newaxis, :]
+    return (~is_trump[:, :, np.newaxis] & is_trump[:, np.newaxis, :]) | (same_suit[np.newaxis] & stronger)
+
+  @staticmethod
+  def _build_is_high_score_low_value():
+    # in trump games, only the banners are high score/low value cards, otherwise the achts too
+    is_high_score_low_value = np.tile(np.isin(CardTables.VALUES, [CardTables.VALUE_ACHT, CardTables.VALUE_BANNER]),
+        (CardTables.GAME_TYPE_COUNT, 1))
+    is_high_score_low_value[CardTables.TRUMP_SUITS >= 0] = CardTables.VALUES == CardTables.VALUE_BANNER
+    return is_high_score_low_value
+
+  @staticmethod
+  def _build_suit_masks():
+    return [sum(1 << card_id for card_id in range(CardTables.CARD_COUNT) if CardTables.SUITS[card_id] == suit) \
+        for suit in range(Const.SUIT_COUNT)]
+
+  @staticmethod
+  def _build_trump_masks():
+    return [CardTables.SUIT_MASKS[suit] if suit >= 0 else 0 for suit in CardTables.TRUMP_SUITS]
+
+  @staticmethod
+  def _build_buur_masks():
+    return [1 << int(suit * Const.CARDS_PER_SUIT + CardTables.VALUE_BUUR) if suit >= 0 else 0 \
+        for suit in CardTables.TRUMP_SUITS]
+
+  @staticmethod
+  def _build_beating_masks():
+    return [[sum(1 << int(other_card_id) for other_card_id in np.flatnonzero(beaten_by)) \
+        for beaten_by in game_type_beaten_by] for game_type_beaten_by in CardTables.BEATEN_BY]
+
+  @staticmethod
+  def get_valid_cards_mask(hand_mask, played_card_ids, game_type_value):
+    """
+    Determines which cards of a hand would be valid to play.
+
+    :hand_mask: Bit mask of the card ids in the hand.
+    :played_card_ids: List of the ids of the cards that are currently in play.
+    :game_type_value: Value of the current game type.
+
+    :returns: Bit mask of the card ids that are valid to play.
+    """
+    if not played_card_ids:
+      # the first player can always choose from all cards
+      return hand_mask
+
+    # try to match suit
+    led_suit = CardTables.SUIT_LIST[played_card_ids[0]]
+    following_mask = hand_mask & CardTables.SUIT_MASKS[led_suit]
+    trump_mask = CardTables.TRUMP_MASKS[game_type_value]
+    if not trump_mask:
+      # all cards are valid if unable to match suit
+      return following_mask or hand_mask
+
+    # find the best trump that was played so far, the trumps in the hand must beat it
+    trumps_in_hand = hand_mask & trump_mask
+    strengths = CardTables.STRENGTH_LISTS[game_type_value]
+    best_trump = None
+    for card_id in played_card_ids:
+      if trump_mask >> card_id & 1 and (best_trump is None or strengths[best_trump] < strengths[card_id]):
+        best_trump = card_id
+    non_undertrumping_mask = trumps_in_hand if best_trump is None else \
+        trumps_in_hand & CardTables.BEATING_MASKS[game_type_value][best_trump]
+
+    if not following_mask:
+      # all non-undertrumping cards are valid if unable to match suit and non-trump cards are in the hand
+      if trumps_in_hand == hand_mask:
+        return hand_mask
+      return (hand_mask & ~trump_mask) | non_undertrumping_mask
+    if led_suit == CardTables.TRUMP_SUITS[game_type_value]:
+      # if the only valid (trump) card is the buur, all cards are valid, otherwise all valid (trump) cards are
+      return hand_mask if following_mask == CardTables.BUUR_MASKS[game_type_value] else following_mask
+    # besides matching suit, non-undertrumping trumps can also be played
+    return following_mask | non_undertrumping_mask
+
+  @staticmethod
+  def get_equivalent_cards(card_ids, gone_mask, game_type_value):
+    """
+    Groups cards that are strategically equivalent: cards of the same suit with the same score where
+    every card of the suit with a strength in between is gone, i.e. was already played or is held by
+    the same player. Cards that are currently in play aren't gone because they may be beaten by only
+    some of the cards.
+
+    :card_ids: List of the ids of the cards to group.
+    :gone_mask: Bit mask of the card ids that are gone.
+    :game_type_value: Value of the current game type.
+
+    :returns: List of the groups of equivalent cards, each group is a list of the indices within
+      `card_ids` ordered by increasing strength.
+    """
+    strengths = CardTables.STRENGTH_LISTS[game_type_value]
+    scores = CardTables.SCORE_LISTS[game_type_value]
+    groups = []
+    previous_card = None
+    for i in sorted(range(len(card_ids)), key=lambda i: (CardTables.SUIT_LIST[card_ids[i]], strengths[card_ids[i]])):
+      card = card_ids[i]
+      suit = CardTables.SUIT_LIST[card]
+      if previous_card is not None and suit == CardTables.SUIT_LIST[previous_card] and \
+          scores[card] == scores[previous_card] and all(gone_mask >> other_card & 1
+              for other_card in range(suit * Const.CARDS_PER_SUIT, (suit + 1) * Const.CARDS_PER_SUIT)
+              if strengths[previous_card] < strengths[other_card] < strengths[card]):
+        groups[-1].append(i)
+      else:
+        groups.append([i])
+      previous_card = card
+    return groups
+
+  @staticmethod
+  def get_card_indices(order_value, card_index_by_suit):
+    """
+    Calculates the indices of the cards within the state array of an encoding.
+
+    :order_value: True if the trump values should be re-arranged by their trump order.
+    :card_index_by_suit: True if the cards should be grouped by suit instead of by value.
+
+    :returns: Array of the card indices per game type and card id.
+    """
+    value_map = np.tile(CardTables.VALUES, (CardTables.GAME_TYPE_COUNT, 1))
+    if order_value:
+      value_map = np.where(CardTables.IS_TRUMP, CardTables.VALUE_ORDER_TRUMP[CardTables.VALUES], value_map)
+    if card_index_by_suit:
+      return value_map + CardTables.SUITS * Const.CARDS_PER_SUIT
+    return Const.SUIT_COUNT * value_map + CardTables.SUITS
+
+  @staticmethod
+  def get_trick_winners(game_types, tricks):
+    """
+    Determines the winning position of tricks, vectorized over any number of tricks.
+
+    :game_types: Array of game type values, one per trick.
+    :tricks: Array of shape (..., PLAYER_COUNT) with the card ids in the order they were played.
+
+    :returns: Array with the index of the winning card within each trick.
+    """
+    game_types = np.asarray(game_types)[..., np.newaxis]
+    tricks = np.asarray(tricks)
+    # only trumps and cards that follow the suit of the first card can win the trick
+    eligible = CardTables.IS_TRUMP[game_types, tricks] | \
+        (CardTables.SUITS[tricks] == CardTables.SUITS[tricks[..., :1]])
+    return np.argmax(np.where(eligible, CardTables.STRENGTHS[game_types, tricks], -1), axis=-1)
+
+  @staticmethod
+  def get_trick_scores(game_types, tricks):
+    """
+    Calculates the scores of tricks, vectorized over any number of tricks.
+
+    :game_types: Array of game type values, one per trick.
+    :tricks: Array of shape (..., PLAYER_COUNT) with the card ids of each trick.
+
+    :returns: Array with the score of each trick.
+    """
+    return CardTables.SCORES[np.asarray(game_types)[..., np.newaxis], np.asarray(tricks)].sum(axis=-1)
+
+
+CardTables.IS_TRUMP = CardTables._build_is_trump() # pylint: disable=protected-access
+CardTables.SCORES = CardTables._build_scores() # pylint: disable=protected-access
+CardTables.VALUE_RANKS = CardTables._build_value_ranks() # pylint: disable=protected-access
+CardTables.STRENGTHS = CardTables._build_strengths() # pylint: disable=protected-access
+CardTables.BEATEN_BY = CardTables._build_beaten_by() # pylint: disable=protected-access
+CardTables.IS_HIGH_SCORE_LOW_VALUE = CardTables._build_is_high_score_low_value() # pylint: disable=protected-access
+
+# plain python versions of the tables that are used for operations on single cards
+CardTables.SUIT_LIST = CardTables.SUITS.tolist()
+CardTables.VALUE_LIST = CardTables.VALUES.tolist()
+CardTables.IS_TRUMP_LISTS = CardTables.IS_TRUMP.tolist()
+CardTables.SCORE_LISTS = CardTables.SCORES.tolist()
+CardTables.VALUE_RANK_LISTS = CardTables.VALUE_RANKS.tolist()
+CardTables.STRENGTH_LISTS = CardTables.STRENGTHS.tolist()
+CardTables.IS_HIGH_SCORE_LOW_VALUE_LISTS = CardTables.IS_HIGH_SCORE_LOW_VALUE.tolist()
+CardTables.SUIT_MASKS = CardTables._build_suit_masks() # pylint: disable=protected-access
+CardTables.TRUMP_MASKS = CardTables._build_trump_masks() # pylint: disable=protected-access
+CardTables.BUUR_MASKS = CardTables._build_buur_masks() # pylint: disable=protected-access
+CardTables.BEATING_MASKS = CardTables._build_beating_masks() # pylint: disable=protected-access
@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from abc import ABC, abstractmethod
+
+from better_rules_player import BetterRulesPlayer
+from card_tables import CardTables
+from const import Const
+from fixed_better_rules_player import FixedBetterRulesPlayer
+from game_type import GameType
+from simple_rules_player import SimpleRulesPlayer
+
+
+class CompiledRules:
+  """
+  Building blocks of the rule-based players that work on card ids and the tables of `CardTables`.
+  The choices are lists of card ids and each method makes the same decision as the corresponding
+  method of the rule-based players.
+  """
+
+  @staticmethod
+  def is_beaten_by(card, other_card, game_type):
+    return CardTables.BEATING_MASKS[game_type][card] >> other_card & 1
+
+  @staticmethod
+  def get_beating_cards(choices, cards_to_beat, game_type):
+    beating_mask = ~0
+    for card in cards_to_beat:
+      beating_mask &= CardTables.BEATING_MASKS[game_type][card]
+    return [card for card in choices if beating_mask >> card & 1]
+
+  @staticmethod
+  def are_all_trumps(choices, game_type):
+    is_trump = CardTables.IS_TRUMP_LISTS[game_type]
+    return all(is_trump[card] for card in choices)
+
+  @staticmethod
+  def get_points(played_cards, game_type):
+    scores = CardTables.SCORE_LISTS[game_type]
+    return sum(scores[card] for card in played_cards)
+
+  @staticmethod
+  def get_counts_per_suit(choices):
+    suit_counts = [0] * Const.SUIT_COUNT
+    for card in choices:
+      suit_counts[CardTables.SUIT_LIST[card]] += 1
+    return suit_counts
+
+  @staticmethod
+  def select_best_card_of_first_non_trump_suit(choices, game_type):
+    is_trump = CardTables.IS_TRUMP_LISTS[game_type]
+    all_trumps = CompiledRules.are_all_trumps(choices, game_type)
+    best_card = None
+    for card in choices:
+      if (best_card is None or (CompiledRules.is_beaten_by(best_card, card, game_type) and
+          CardTables.SUIT_LIST[best_card] == CardTables.SUIT_LIST[card])) and (all_trumps or not is_trump[card]):
+        best_card = card
+    return best_card
+
+  @staticmethod
+  def select_worst_card(choices, game_type):
+    is_trump = CardTables.IS_TRUMP_LISTS[game_type]
+    value_ranks = CardTables.VALUE_RANK_LISTS[game_type]
+    worst_card = choices[0]
+    for card in choices:
+      if (not is_trump[worst_card] and not is_trump[card] and value_ranks[card] < value_ranks[worst_card]) or \
+          (is_trump[worst_card] and CompiledRules.is_beaten_by(card, worst_card, game_type)):
+        worst_card = card
+    return worst_card
+
+  @staticmethod
+  def select_useless_card(choices, game_type):
+    # the pairwise comparison of the rule-based players boils down to the first card with the lowest
+    # "usefulness", where trumps are only considered if there are no other cards
+    is_trump = CardTables.IS_TRUMP_LISTS[game_type]
+    scores = CardTables.SCORE_LISTS[game_type]
+    value_sign = -1 if game_type == GameType.UNNENUFE.value else 1
+    suit_counts = CompiledRules.get_counts_per_suit(choices)
+
+    def usefulness(card):
+      value = CardTables.VALUE_LIST[card]
+      usefulness = value_sign * value + scores[card] + 3 * suit_counts[CardTables.SUIT_LIST[card]]
+      if is_trump[card] and value == CardTables.VALUE_NELL:
+        usefulness += 6
+      if is_trump[card] and value == CardTables.VALUE_BUUR:
+        usefulness += 5
+      return usefulness
+
+    non_trumps = [card for card in choices if not is_trump[card]]
+    return min(non_trumps or choices, key=usefulness)
+
+  @staticmethod
+  def select_trump_card(choices, has_opponent_left, game_type):
+    if not has_opponent_left:
+      is_high_score_low_value = CardTables.IS_HIGH_SCORE_LOW_VALUE_LISTS[game_type]
+      for card in choices:
+        if is_high_score_low_value[card]:
+          return card
+    return CompiledRules.select_useless_card(choices, game_type)
+
+  @staticmethod
+  def select_high_scoring_or_useless_card(choices, has_opponent_left, game_type):
+    if CardTables.TRUMP_MASKS[game_type] and has_opponent_left:
+      return CompiledRules.select_useless_card(choices, game_type)
+
+    is_trump = CardTables.IS_TRUMP_LISTS[game_type]
+    scores = CardTables.SCORE_LISTS[game_type]
+    is_high_score_low_value = CardTables.IS_HIGH_SCORE_LOW_VALUE_LISTS[game_type]
+    all_trumps = CompiledRules.are_all_trumps(choices, game_type)
+    high_scoring = sorted([card for card in choices if is_high_score_low_value[card] and
+      (not is_trump[card] or all_trumps)], key=lambda card: scores[card], reverse=True)
+    if not high_scoring:
+      return CompiledRules.select_useless_card(choices, game_type)
+
+    suit_counts = CompiledRules.get_counts_per_suit(choices)
+    card_to_play = high_scoring[0]
+    for card in high_scoring:
+      if scores[card] >= scores[card_to_play] and \
+          suit_counts[CardTables.SUIT_LIST[card]] < suit_counts[CardTables.SUIT_LIST[card_to_play]]:
+        card_to_play = card
+    return card_to_play
+
+  @staticmethod
+  def select_trump_puller(choices, game_type):
+    # the first low trump that can be used to pull trumps, if any
+    if CardTables.TRUMP_MASKS[game_type]:
+      is_trump = CardTables.IS_TRUMP_LISTS[game_type]
+      for card in choices:
+        if is_trump[card] and CardTables.VALUE_LIST[card] <= CardTables.VALUE_ACHT:
+          return card
+    return None
+
+
+class CompiledRulesPlayer(ABC):
+  """
+  Mixin for rule-based players whose card selection is implemented in `_select_card_id`.
+  """
+
+  def _select_card(self, args, log):
+    valid_cards, played_cards, _, game_type = args
+    choices = [card.card_id for card in valid_cards]
+    selected_card = self._select_card_id(choices, [card.card_id for card in played_cards], game_type.value)
+    return valid_cards[choices.index(selected_card)]
+
+  @abstractmethod
+  def _select_card_id(self, choices, played_cards, game_type):
+    """
+    Selects a card like the rule-based player would.
+
+    :choices: List of the ids of the valid cards.
+    :played_cards: List of the ids of the cards that are in play.
+    :game_type: Value of the game type.
+
+    :returns: The id of the selected card.
+    """
+    pass
+
+
+class CompiledSimpleRulesPlayer(CompiledRulesPlayer, SimpleRulesPlayer):
+  """
+  Compiled version of the `SimpleRulesPlayer`.
+  """
+
+  def _select_card_id(self, choices, played_cards, game_type):
+    if not played_cards:
+      return CompiledRules.select_best_card_of_first_non_trump_suit(choices, game_type)
+
+    if len(played_cards) == 1:
+      cards_to_beat = played_cards[:1]
+    elif len(played_cards) == 2:
+      if CompiledRules.is_beaten_by(played_cards[1], played_cards[0], game_type):
+        return CompiledRules.select_worst_card(choices, game_type)
+      cards_to_beat = played_cards[1:]
+    else:
+      if CompiledRules.is_beaten_by(played_cards[0], played_cards[1], game_type) and \
+          CompiledRules.is_beaten_by(played_cards[2], played_cards[1], game_type):
+        return CompiledRules.select_worst_card(choices, game_type)
+      cards_to_beat = played_cards[0::2]
+
+    beating_cards = CompiledRules.get_beating_cards(choices, cards_to_beat, game_type)
+    if not beating_cards:
+      return CompiledRules.select_worst_card(choices, game_type)
+    if CompiledRules.are_all_trumps(beating_cards, game_type) and \
+        CompiledRules.get_points(played_cards, game_type) < SimpleRulesPlayer.STECHEN_THRESHOLD:
+      return CompiledRules.select_worst_card(choices, game_type)
+    return CompiledRules.select_worst_card(beating_cards, game_type)
+
+
+class CompiledBetterRulesPlayer(CompiledRulesPlayer, BetterRulesPlayer):
+  """
+  Compiled version of the `BetterRulesPlayer`.
+  """
+
+  def _select_card_id(self, choices, played_cards, game_type):
+    if not played_cards:
+      trump_puller = CompiledRules.select_trump_puller(choices, game_type)
+      if trump_puller is not None:
+        return trump_puller
+      return CompiledRules.select_best_card_of_first_non_trump_suit(choices, game_type)
+
+    if len(played_cards) == 1:
+      cards_to_beat = played_cards[:1]
+    elif len(played_cards) == 2:
+      if CompiledRules.is_beaten_by(played_cards[1], played_cards[0], game_type):
+        return CompiledRules.select_high_scoring_or_useless_card(choices, True, game_type)
+      cards_to_beat = played_cards[1:]
+    else:
+      if CompiledRules.is_beaten_by(played_cards[0], played_cards[1], game_type) and \
+          CompiledRules.is_beaten_by(played_cards[2], played_cards[1], game_type):
+        return CompiledRules.select_high_scoring_or_useless_card(choices, False, game_type)
+      cards_to_beat = played_cards[0::2]
+
+    has_opponent_left = len(played_cards) < Const.PLAYER_COUNT - 1
+    beating_cards = CompiledRules.get_beating_cards(choices, cards_to_beat, game_type)
+    if not beating_cards:
+      return CompiledRules.select_useless_card(choices, game_type)
+    if CompiledRules.are_all_trumps(beating_cards, game_type):
+      threshold = BetterRulesPlayer.STECHEN_THRESHOLD_EARLY if has_opponent_left else \
+          BetterRulesPlayer.STECHEN_THRESHOLD_LATE
+      if CompiledRules.get_points(played_cards, game_type) >= threshold:
+        return CompiledRules.select_trump_card(beating_cards, has_opponent_left, game_type)
+      return CompiledRules.select_useless_card(choices, game_type)
+    if len(played_cards) == 1:
+      return CompiledRules.select_useless_card(beating_cards, game_type)
+    return CompiledRules.select_high_scoring_or_useless_card(beating_cards, has_opponent_left, game_type)
+
+
+class CompiledFixedBetterRulesPlayer(CompiledRulesPlayer, FixedBetterRulesPlayer):
+  """
+  Compiled version of the `FixedBetterRulesPlayer`.
+  """
+
+  def _select_card_id(self, choices, played_cards, game_type):
+    if len(choices) == 1:
+      return choices[0]
+
+    if not played_cards:
+      trump_puller = CompiledRules.select_trump_puller(choices, game_type)
+      if trump_puller is not None:
+        return trump_puller
+      return CompiledRules.select_best_card_of_first_non_trump_suit(choices, game_type)
+
+    if len(played_cards) == 1:
+      cards_to_beat = played_cards[:1]
+    elif len(played_cards) == 2:
+      if not CompiledRules.is_beaten_by(played_cards[0], played_cards[1], game_type):
+        return CompiledRules.select_high_scoring_or_useless_card(choices, True, game_type)
+      cards_to_beat = played_cards[1:]
+    else:
+      if CompiledRules.is_beaten_by(played_cards[0], played_cards[1], game_type) and \
+          not CompiledRules.is_beaten_by(played_cards[1], played_cards[2], game_type):
+        return CompiledRules.select_high_scoring_or_useless_card(choices, False, game_type)
+      cards_to_beat = played_cards[0::2]
+
+    has_opponent_left = len(played_cards) < Const.PLAYER_COUNT - 1
+    beating_cards = CompiledRules.get_beating_cards(choices, cards_to_beat, game_type)
+    if not beating_cards:
+      return CompiledRules.select_useless_card(choices, game_type)
+
+    beating_card = CompiledRules.select_high_scoring_or_useless_card(beating_cards, False, game_type) if \
+        not has_opponent_left else CompiledRules.select_useless_card(beating_cards, game_type)
+    if not CardTables.IS_TRUMP_LISTS[game_type][beating_card] or \
+        CardTables.IS_TRUMP_LISTS[game_type][played_cards[0]]:
+      return beating_card
+
+    threshold = FixedBetterRulesPlayer.STECHEN_THRESHOLD_EARLY if has_opponent_left else \
+        FixedBetterRulesPlayer.STECHEN_THRESHOLD_LATE
+    if CompiledRules.get_points(played_cards, game_type) >= threshold:
+      return CompiledRules.select_trump_card(beating_cards, has_opponent_left, game_type)
+    return CompiledRules.select_useless_card(choices, game_type)
@@ -5,16 +5,25 @@
 class Config:
   # training/model
   SEED = None
+  RANDOM_KEY = 0
   ENCODING = None
   STORE_TRAINING_DATA = False
   ONLINE_TRAINING = False
   STORE_SCORES = False
+  FIRST_LAYER_ACCUMULATOR = False
+  PREDICTION_CACHE_SIZE = 0
+  INFERENCE_PRECISION = None
+  QUANTIZATION_ANALYSIS = False
+  PRUNE_EQUIVALENT_CARDS = False
+  DISTILLATION_LAYERS = None
 
   # game configuration
   TEAM_1_STRATEGY = None
   TEAM_1_MODEL_ARGS = None
   TEAM_2_STRATEGY = None
   FORCE_GAME_TYPE = None
+  BATCH_ENGINE = False
+  DEAL_FILE = None
 
   # intervals
   TOTAL_HANDS = None
@@ -31,17 +40,17 @@ class Config:
   LOAD_TRAINING_DATA_FILE_NAME = None
   STORE_TRAINING_DATA_FILE_NAME = None
   STORE_GAME_TYPE_DECISIONS_FILE_NAME = None
+  DISTILLATION_DATA_FILE_NAME = None
   EVALUATION_DIRECTORY = None
   LOSS_FILE = None
 
   # parallel processing
   PARALLEL_PROCESSES = None
   BATCH_SIZE = None
-  BATCH_COUNT = None
-
-  @staticmethod
-  def set_batch_count():
-    """
-    Assigns the number of batches to the correct number depending on the other config entries.
-    """
-    Config.BATCH_COUNT = int(Config.TOTAL_HANDS / Config.BATCH_SIZE / Config.PARALLEL_PROCESSES)
+  CONCURRENT_HANDS = 1
+  SHARED_WEIGHTS = False
+  MAX_STALENESS = 0
+  ACTOR_LEARNER = False
+  REMOTE_WORKERS = 0
+  REMOTE_ADDRESS = None
+  REMOTE_AUTHKEY = None
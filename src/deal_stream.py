@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from argparse import ArgumentParser
+
+import numpy as np
+
+from config import Config
+from const import Const
+from hand_random import HandRandom
+
+
+class DealStream:
+  """
+  Source of the deals of the hands. A deal is a row of card ids in the order in which the cards are
+  distributed: player i gets the cards at positions 9*i to 9*i+8.
+
+  Deals are either generated in bulk or read from a pre-generated deal file which is memory-mapped,
+  so all processes (and all runs) can play the same deals.
+  """
+
+  def __init__(self, deal_file=None):
+    self._deal_file = deal_file
+    self._deals = None
+
+  def __getstate__(self):
+    # the memory-mapped deals are re-opened by each process instead of copying them
+    state = self.__dict__.copy()
+    state["_deals"] = None
+    return state
+
+  @property
+  def deal_count(self):
+    """
+    Number of deals in the deal file, None if the deals are generated.
+    """
+    if not self._deal_file:
+      return None
+    return len(self._get_stored_deals())
+
+  def get_deals(self, first_hand, count):
+    """
+    Gets the deals for a number of hands.
+
+    :first_hand: Index of the first hand within the whole game, determines the deals of the deal file.
+    :count: Number of deals to get.
+
+    :returns: uint8-array of shape (count, CARDS_PER_HAND) with one deal per row.
+    """
+    if not self._deal_file:
+      return DealStream.generate_deals(first_hand, count)
+
+    deals = self._get_stored_deals()
+    start = first_hand % len(deals)
+    if start + count <= len(deals):
+      return np.array(deals[start:start+count])
+    # wrap around if there are more hands than deals
+    return deals[(start + np.arange(count)) % len(deals)]
+
+  def _get_stored_deals(self):
+    if self._deals is None:
+      self._deals = np.load(self._deal_file, mmap_mode="r")
+      assert self._deals.dtype == np.uint8 and self._deals.ndim == 2 and \
+          self._deals.shape[1] == Const.CARDS_PER_HAND, "invalid deal file"
+    return self._deals
+
+  @staticmethod
+  def generate_deals(first_hand, count):
+    """
+    Generates the random deals of consecutive hands.
+
+    :first_hand: Index of the first hand within the whole game.
+    :count: Number of deals to generate.
+
+    :returns: uint8-array of shape (count, CARDS_PER_HAND) with one deal per row.
+    """
+    return np.argsort(HandRandom.get_deal_values(first_hand, count), axis=1).astype(np.uint8)
+
+
+def main():
+  parser = ArgumentParser()
+  parser.add_argument("--deal-file", required=True,
+      help="Name of the deal file to create (.npy)")
+  parser.add_argument("--hands", type=float, required=True,
+      help="Number of deals to generate")
+  parser.add_argument("--seed", type=int, nargs="?", const=42,
+      help="Random seed to use, no seed means random")
+  args = parser.parse_args()
+
+  Config.RANDOM_KEY = args.seed if args.seed else HandRandom.create_random_key()
+  # generate in chunks to limit the memory that is needed for the random numbers
+  deals = np.lib.format.open_memmap(args.deal_file, mode="w+", dtype=np.uint8,
+      shape=(int(args.hands), Const.CARDS_PER_HAND))
+  chunk_size = int(1e6)
+  for start in range(0, len(deals), chunk_size):
+    deals[start:start+chunk_size] = DealStream.generate_deals(start, min(chunk_size, len(deals) - start))
+  deals.flush()
+  print("Generated {} deals to '{}'".format(len(deals), args.deal_file))
+
+if __name__ == "__main__":
+  main()
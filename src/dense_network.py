@@ -0,0 +1,270 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from shared_weights import SharedWeights
+
+
+class DenseNetwork:
+  """
+  Minimal forward pass of a fully-connected network, for predicting the scores of the few candidate
+  states of a decision without the per-call overhead of the ML libraries.
+  """
+
+  ACTIVATIONS = {
+      "identity": None,
+      "relu": lambda x: np.maximum(x, 0, out=x),
+      "tanh": lambda x: np.tanh(x, out=x),
+      "logistic": lambda x: np.divide(1, np.add(1, np.exp(np.negative(x, out=x), out=x), out=x), out=x)
+      }
+
+  """
+  Names of the supported Keras activations, mapped to the names of the activations above.
+  """
+  KERAS_ACTIVATIONS = {
+      "linear": "identity",
+      "relu": "relu",
+      "tanh": "tanh",
+      "sigmoid": "logistic"
+      }
+
+  """
+  Keras layers that don't do anything during inference.
+  """
+  KERAS_INFERENCE_NOOP_LAYERS = ["InputLayer", "Dropout"]
+
+  """
+  Number of states that are predicted together. The states are padded to whole blocks, so the rounding
+  of a score doesn't depend on the other states that are predicted in the same call. Larger blocks
+  waste more time on padding when predicting the few candidate states of a single decision.
+  """
+  BLOCK_SIZE = 8
+
+  """
+  Supported reduced precisions for predicting scores, see `with_precision`.
+  """
+  PRECISIONS = ["float32"]
+
+  def __init__(self, weights, biases, activation="relu", dtype=None, output_activation="identity"):
+    """
+    Creates a new network from the parameters of its layers.
+
+    :weights: List of the weight matrices of the layers (inputs x outputs).
+    :biases: List of the bias vectors of the layers.
+    :activation: Name of the activation function of the hidden layers.
+    :dtype: Optional: Data type of the computations, defaults to the type of the weights.
+    :output_activation: Optional: Name of the activation function of the output layer, defaults to linear.
+    """
+    assert len(weights) == len(biases), "Need weights and biases for each layer"
+    assert activation in DenseNetwork.ACTIVATIONS, "Unsupported activation '{}'".format(activation)
+    assert output_activation in DenseNetwork.ACTIVATIONS, "Unsupported activation '{}'".format(output_activation)
+    dtype = dtype or weights[0].dtype
+    self.weights = [np.ascontiguousarray(weight, dtype=dtype) for weight in weights]
+    self.biases = [np.ascontiguousarray(bias, dtype=dtype) for bias in biases]
+    self.activation = activation
+    self.output_activation = output_activation
+    self._activation_function = DenseNetwork.ACTIVATIONS[activation]
+    self._output_activation_function = DenseNetwork.ACTIVATIONS[output_activation]
+
+  def __getstate__(self):
+    # the activation functions are lambdas which can't be pickled, they're looked up again by name
+    state = self.__dict__.copy()
+    del state["_activation_function"]
+    del state["_output_activation_function"]
+    state["weights"] = [SharedWeights.reference(weight) for weight in self.weights]
+    state["biases"] = [SharedWeights.reference(bias) for bias in self.biases]
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    self.weights = [SharedWeights.resolve(weight) for weight in self.weights]
+    self.biases = [SharedWeights.resolve(bias) for bias in self.biases]
+    self._activation_function = DenseNetwork.ACTIVATIONS[self.activation]
+    self._output_activation_function = DenseNetwork.ACTIVATIONS[self.output_activation]
+
+  @property
+  def dtype(self):
+    return self.weights[0].dtype
+
+  @staticmethod
+  def quantize(weight):
+    """
+    Quantizes a weight matrix to int8 with a single (symmetric) scale.
+
+    :weight: The weight matrix.
+
+    :returns: A tuple with the int8 matrix and the scale, which restore the weights when multiplied.
+    """
+    scale = float(np.abs(weight).max()) / 127 or 1.0
+    return np.round(weight / scale).astype(np.int8), scale
+
+  def with_precision(self, precision):
+    """
+    Creates a copy of the network with reduced precision.
+
+    :precision: The precision to compute in, see `PRECISIONS`.
+
+    :returns: The new network.
+    """
+    assert precision in DenseNetwork.PRECISIONS, "Unsupported precision '{}'".format(precision)
+    return DenseNetwork(self.weights, self.biases, self.activation, np.dtype(precision), self.output_activation)
+
+  def quantized(self):
+    """
+    Creates a copy of the network whose weights are quantized to int8 per layer (see `quantize`), to
+    analyze which scores int8 weights would predict. NOTE: numpy doesn't multiply int8 matrices
+    efficiently, so the quantized weights are restored to float32 and the copy doesn't save any memory.
+
+    :returns: The new network.
+    """
+    weights = [np.float32(scale) * quantized.astype(np.float32)
+        for quantized, scale in map(DenseNetwork.quantize, self.weights)]
+    return DenseNetwork(weights, self.biases, self.activation, np.float32, self.output_activation)
+
+  def share(self):
+    """
+    Creates a copy of the network whose weights are in shared memory, so it can be pickled without
+    copying them (see `SharedWeights`).
+
+    :returns: The new network.
+    """
+    arrays = SharedWeights.share(self.weights + self.biases)
+    return DenseNetwork(arrays[:len(self.weights)], arrays[len(self.weights):], self.activation,
+        self.dtype, self.output_activation)
+
+  def update_shared_weights(self, network):
+    """
+    Overwrites the weights of a shared network in place with the ones of another network of the same shape.
+
+    :network: The network with the new weights.
+    """
+    SharedWeights.update(self.weights + self.biases, network.weights + network.biases)
+
+  @staticmethod
+  def from_mlp_regressor(regressor, dtype=None):
+    """
+    Extracts the network of a (fitted) MLPRegressor.
+
+    :regressor: The sklearn MLPRegressor.
+    :dtype: Optional: Data type of the computations, defaults to the type of the regressor's weights.
+
+    :returns: The network, which predicts the same scores as the regressor (up to rounding).
+    """
+    return DenseNetwork(regressor.coefs_, regressor.intercepts_, regressor.activation, dtype)
+
+  @staticmethod
+  def from_keras_model(model, dtype=None):
+    """
+    Extracts the network of a Keras model that is a plain stack of dense layers.
+
+    :model: The Keras (Sequential) model.
+    :dtype: Optional: Data type of the computations, defaults to the type of the model's weights.
+
+    :returns: The network, which predicts the same scores as the model (up to rounding).
+    """
+    weights = []
+    biases = []
+    activations = []
+    for layer in model.layers:
+      layer_type = layer.__class__.__name__
+      if layer_type in DenseNetwork.KERAS_INFERENCE_NOOP_LAYERS:
+        continue
+      if layer_type != "Dense":
+        raise ValueError("Unsupported layer type '{}'".format(layer_type))
+      activation = layer.activation.__name__
+      if activation not in DenseNetwork.KERAS_ACTIVATIONS:
+        raise ValueError("Unsupported activation '{}'".format(activation))
+
+      layer_weights = layer.get_weights()
+      weights.append(layer_weights[0])
+      biases.append(layer_weights[1] if len(layer_weights) > 1 else np.zeros(layer_weights[0].shape[1],
+        dtype=layer_weights[0].dtype))
+      activations.append(DenseNetwork.KERAS_ACTIVATIONS[activation])
+
+    if not weights:
+      raise ValueError("The model doesn't have any dense layers")
+    if len(set(activations[:-1])) > 1:
+      raise ValueError("The hidden layers have different activations: {}".format(activations[:-1]))
+    return DenseNetwork(weights, biases, activations[0] if len(activations) > 1 else "identity", dtype,
+        output_activation=activations[-1])
+
+  def predict(self, states):
+    """
+    Predicts the scores of states. The score of a state is exactly the same regardless of the other
+    states, so the states of many decisions can be predicted at once.
+
+    :states: 2D-numpy-array of the states.
+
+    :returns: 1D-numpy-array with the score of each state.
+    """
+    return self._predict_blocks(np.asarray(states, dtype=self.dtype), 0)
+
+  def predict_from_first_layer(self, first_layers):
+    """
+    Predicts the scores of states from the pre-activations of their first layer, like `predict`.
+
+    :first_layers: 2D-numpy-array with the first layer's pre-activation of each state.
+
+    :returns: 1D-numpy-array with the score of each state.
+    """
+    return self._predict_blocks(first_layers, 1)
+
+  def get_first_layer(self, state):
+    """
+    Calculates the pre-activation of the first layer for a state.
+
+    :state: 1D-numpy-array of the state.
+
+    :returns: 1D-numpy-array with the pre-activation of the first layer.
+    """
+    return np.asarray(state, dtype=self.dtype) @ self.weights[0] + self.biases[0]
+
+  def update_first_layer(self, first_layer, indices, changes):
+    """
+    Updates the pre-activation of the first layer for changed entries of the state.
+
+    :first_layer: The pre-activation of the first layer before the change, which isn't modified.
+    :indices: Indices of the changed entries.
+    :changes: Differences of the changed entries.
+
+    :returns: 1D-numpy-array with the updated pre-activation of the first layer.
+    """
+    return first_layer + np.asarray(changes, dtype=self.dtype) @ self.weights[0][indices]
+
+  def get_candidate_first_layers(self, first_layer, indices, changes):
+    """
+    Calculates the pre-activations of the first layer for candidate states that each differ from
+    the same state in a single entry.
+
+    :first_layer: The pre-activation of the first layer of the state.
+    :indices: Index of the changed entry of each candidate state.
+    :changes: Difference of the changed entry of each candidate state.
+
+    :returns: 2D-numpy-array with the first layer's pre-activation of each candidate state.
+    """
+    return first_layer + np.asarray(changes, dtype=self.dtype)[:, np.newaxis] * self.weights[0][indices]
+
+  def _predict_blocks(self, values, applied_layers):
+    """
+    Completes the forward pass in blocks of states.
+
+    :values: 2D-numpy-array of the states or of the pre-activations of the layers that were already applied.
+    :applied_layers: Number of layers whose weights and biases were already applied to the values.
+
+    :returns: 1D-numpy-array with the score of each state.
+    """
+    count = len(values)
+    block_count = -(-count // DenseNetwork.BLOCK_SIZE)
+    activations = np.zeros((block_count * DenseNetwork.BLOCK_SIZE, values.shape[1]), dtype=self.dtype)
+    activations[:count] = values
+    activations = activations.reshape(block_count, DenseNetwork.BLOCK_SIZE, -1)
+    last_layer = len(self.weights) - 1
+    for i, (weight, bias) in enumerate(zip(self.weights, self.biases)):
+      if i >= applied_layers:
+        activations = np.matmul(activations, weight)
+        activations += bias
+      activation_function = self._activation_function if i != last_layer else self._output_activation_function
+      if activation_function:
+        activation_function(activations)
+    return activations.reshape(block_count * DenseNetwork.BLOCK_SIZE, -1)[:count].ravel()
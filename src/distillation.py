@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import pickle
+import time
+from config import Config
+
+import numpy as np
+from sklearn.neural_network import MLPRegressor
+
+import utils
+from card import Card
+from const import Const
+from deal_stream import DealStream
+from hand import Hand
+from hand_random import HandRandom
+from parallel_game import ParallelGame
+from sklearn_player import SklearnPlayer
+
+
+class Distillation:
+  """
+  Distills the learners of team 1 (the teachers) into a small MLP (the student): The student is trained
+  on the scores that the teachers predict for decision states, which are streamed from a training data
+  file or from hands that the teachers play. Afterwards, the student is compared with the teachers on
+  hands that weren't used for the training.
+  """
+
+  # number of states that the teacher labels at once, the states of 1000 hands
+  CHUNK_SIZE = Const.DECISIONS_PER_HAND * int(1e3)
+
+  def __init__(self, pool, players, log):
+    """
+    Creates a new distillation.
+
+    :pool: Pool of the processes that play the hands.
+    :players: The players of the hands, the learners of team 1 are the teachers.
+    :log: Logger instance.
+    """
+    self.pool = pool
+    self.log = log
+
+    self.players = players
+    self.teacher = self.players[0]
+
+    self.student = MLPRegressor(hidden_layer_sizes=Config.DISTILLATION_LAYERS, warm_start=True)
+    self.student.training_samples = 0
+    self.student.game_type = Config.FORCE_GAME_TYPE
+    self.student_players = [SklearnPlayer("{}-student".format(player.name), Config.ENCODING.card_code_players[i],
+      self.student, False, log) if i % 2 == 0 else player for i, player in enumerate(self.players)]
+
+  def run(self):
+    """
+    Trains the student, evaluates it and writes it to the evaluation directory along with the report.
+    """
+    self.log.error("Distilling {} ({} samples) into MLP {} with states from {}".format(
+      Config.TEAM_1_STRATEGY, utils.format_human(self.teacher.training_samples),
+      "x".join(str(size) for size in Config.DISTILLATION_LAYERS),
+      Config.DISTILLATION_DATA_FILE_NAME or "{} hands against {}".format(
+        utils.format_human(Config.TOTAL_HANDS), Config.TEAM_2_STRATEGY)))
+
+    for states in self._stream_states():
+      self._train_student(states)
+
+    student_file_name = "{}/student_{}.pkl".format(Config.EVALUATION_DIRECTORY,
+        "x".join(str(size) for size in Config.DISTILLATION_LAYERS))
+    self.log.info("Writing student to {}".format(student_file_name))
+    with open(student_file_name, "wb") as fh:
+      pickle.dump(self.student, fh)
+
+    # evaluate on the hands that follow the ones of the training
+    report = self.evaluate(Config.TOTAL_HANDS)
+    self.log.success("Student selects the same card as the teacher in {:.2f}% of {} decisions".format(
+      100.0 * report["agreement"], utils.format_human(report["decisions"])))
+    self.log.success("Teacher plays {:.1f} hands/s, student plays {:.1f} hands/s (speedup: {:.2f})".format(
+      report["teacher_hands_per_second"], report["student_hands_per_second"], report["speedup"]))
+    with open("{}/distillation.json".format(Config.EVALUATION_DIRECTORY), "w") as fh:
+      json.dump(report, fh, indent=2)
+
+  def evaluate(self, first_hand):
+    """
+    Compares the student with the teachers on a batch of hands.
+
+    :first_hand: Index of the first hand of the batch.
+
+    :returns: Dict with the fraction of the teachers' decisions for which the student selects the same
+      card, the number of these decisions, and the hands/s when playing with the teachers and the student.
+    """
+    agreeing_decisions, decisions = self._compare_decisions(first_hand)
+
+    ParallelGame.inject_log(self.log)
+    teacher_hands_per_second = Distillation._measure_hands_per_second(self.players, first_hand)
+    student_hands_per_second = Distillation._measure_hands_per_second(self.student_players, first_hand)
+
+    return {
+        "student_training_samples": self.student.training_samples,
+        "decisions": decisions,
+        "agreement": agreeing_decisions / max(decisions, 1),
+        "teacher_hands_per_second": teacher_hands_per_second,
+        "student_hands_per_second": student_hands_per_second,
+        "speedup": student_hands_per_second / teacher_hands_per_second
+        }
+
+  def _stream_states(self):
+    """
+    Generator of the decision states to train the student on.
+
+    :returns: 2D-numpy-arrays of states.
+    """
+    if Config.DISTILLATION_DATA_FILE_NAME:
+      for chunk in utils.process_binary_file(Config.DISTILLATION_DATA_FILE_NAME, Distillation.CHUNK_SIZE):
+        yield chunk[:, :-1]
+      return
+
+    parallel_games = [ParallelGame(self.players) for _ in range(Config.PARALLEL_PROCESSES)]
+    # the teachers aren't trained, so the workers can keep them throughout
+    published_game = ParallelGame.publish(parallel_games[0]) if Config.PARALLEL_PROCESSES > 1 else None
+    played_hands = 0
+    while played_hands < Config.TOTAL_HANDS:
+      # the last batches may be incomplete
+      first_hands = range(played_hands, min(played_hands + Config.BATCH_SIZE * Config.PARALLEL_PROCESSES,
+        Config.TOTAL_HANDS), Config.BATCH_SIZE)
+      hand_counts = [min(Config.BATCH_SIZE, Config.TOTAL_HANDS - first_hand) for first_hand in first_hands]
+      if published_game:
+        batch = [self.pool.apply_async(ParallelGame.play_published_hands, (first_hand, published_game, None, hand_count))
+            for first_hand, hand_count in zip(first_hands, hand_counts)]
+        results = [b.get() for b in batch]
+      else:
+        ParallelGame.inject_log(self.log)
+        results = [game.play_hands(first_hand, hand_count=hand_count)
+            for game, first_hand, hand_count in zip(parallel_games, first_hands, hand_counts)]
+      for result in results:
+        training_data = result[1]
+        for i in range(0, len(training_data), Distillation.CHUNK_SIZE):
+          yield training_data[i:i+Distillation.CHUNK_SIZE, :-1]
+      previous_hands = played_hands
+      played_hands += sum(hand_counts)
+      if int(played_hands / Config.LOGGING_INTERVAL) > int(previous_hands / Config.LOGGING_INTERVAL):
+        self.log.warning("Played {}/{} hands, trained student on {} samples".format(
+          utils.format_human(played_hands), utils.format_human(Config.TOTAL_HANDS),
+          utils.format_human(self.student.training_samples)))
+
+    if published_game:
+      ParallelGame.withdraw(published_game)
+
+  def _train_student(self, states):
+    """
+    Trains the student on the scores that the teacher predicts for the states.
+
+    :states: 2D-numpy-array of states.
+    """
+    scores = self.teacher._predict_scores(states) # pylint: disable=protected-access
+    self.student.partial_fit(states, scores)
+    self.student.training_samples += len(states)
+    self.log.debug("Trained student on {} samples, loss {:.1f}".format(
+      utils.format_human(self.student.training_samples), self.student.loss_))
+
+  def _compare_decisions(self, first_hand):
+    """
+    Plays a batch of hands with the teachers and checks for each of their decisions whether the student
+    would select the same card.
+
+    :first_hand: Index of the first hand of the batch.
+
+    :returns: A tuple with the number of agreeing decisions and the number of decisions.
+    """
+    # pylint: disable=protected-access
+    teacher_predicts = {player._get_predict_function() for player in self.players[0::2]}
+    student_predict = self.student_players[0]._get_predict_function()
+
+    hand = Hand(self.players, [Card(suit, value) for suit in range(len(Card.SUITS))
+      for value in range(len(Card.VALUES))], self.log)
+    deals = DealStream(Config.DEAL_FILE).get_deals(first_hand, Config.BATCH_SIZE)
+    agreeing_decisions = 0
+    decisions = 0
+    for i, deal in enumerate(deals):
+      hand_index = first_hand + i
+      HandRandom.start_hand(hand_index)
+      hand.deal(deal)
+      steps = hand.play_steps(hand_index % Const.PLAYER_COUNT)
+      scores = None
+      while True:
+        try:
+          predict, states = steps.send(scores)
+        except StopIteration:
+          break
+        scores = predict(states)
+        if predict in teacher_predicts:
+          agreeing_decisions += np.argmax(scores) == np.argmax(student_predict(states))
+          decisions += 1
+    return int(agreeing_decisions), decisions
+
+  @staticmethod
+  def _measure_hands_per_second(players, first_hand):
+    start_time = time.time()
+    ParallelGame(players).play_hands(first_hand)
+    return Config.BATCH_SIZE / (time.time() - start_time)
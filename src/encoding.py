@@ -3,6 +3,7 @@
 
 import numpy as np
 
+from card_tables import CardTables
 from const import Const
 
 
@@ -45,6 +46,41 @@ class Encoding:
     self._trump_code_offset = trump_code_offset
     self._order_value = order_value
 
+    # index of each card within the state array, per game type and card id
+    self._card_indices = CardTables.get_card_indices(order_value, card_index_by_suit)
+
+    # lookup tables of the card codes, the last axis distinguishes between non-trumps and trumps
+    self._compile_card_codes()
+
+
+  def _compile_card_codes(self):
+    trump_code_offsets = np.array([0, self._trump_code_offset])
+    card_code_players = np.array(self._card_code_players)
+    players = np.arange(Const.PLAYER_COUNT)
+
+    # codes of previously played cards per viewing player and (absolute) player who played the card
+    relative_players = (players[np.newaxis, :] - players[:, np.newaxis]) % Const.PLAYER_COUNT
+    known_players = relative_players if self._relative_player_encoding else \
+        np.tile(players, (Const.PLAYER_COUNT, 1))
+    self._known_card_codes = card_code_players[known_players][:, :, np.newaxis] + trump_code_offsets
+
+    # translation of absolute to relative player codes per viewing player, -1 for invalid codes
+    self._relative_player_codes = np.full((Const.PLAYER_COUNT, Const.MAX_CARD_CODE + 1), -1, dtype=int)
+    self._relative_player_codes[:, 0] = 0
+    for trump_code_offset in set(trump_code_offsets):
+      self._relative_player_codes[:, card_code_players + trump_code_offset] = \
+          card_code_players[relative_players] + trump_code_offset
+
+    # codes of the cards in play per number of cards in play and position of the card
+    self._in_play_codes = np.zeros((Const.PLAYER_COUNT, Const.PLAYER_COUNT - 1, 2), dtype=int)
+    for played in range(Const.PLAYER_COUNT):
+      for position in range(played):
+        self._in_play_codes[played, position] = trump_code_offsets + (
+            self._card_code_in_play[played - position - 1] if self._relative_in_play_encoding
+            else self._card_code_in_play)
+
+    self._in_hand_codes = self._card_code_in_hand + trump_code_offsets
+    self._selected_codes = self._card_code_selected + trump_code_offsets
 
   @property
   def baseline(self):
@@ -75,6 +111,35 @@ class Encoding:
   def order_value(self):
     return self._order_value
 
+  @property
+  def card_indices(self):
+    return self._card_indices
+
+  @property
+  def known_card_codes(self):
+    # indexed by viewing player, player who played the card, and whether the card is a trump
+    return self._known_card_codes
+
+  @property
+  def relative_player_codes(self):
+    # indexed by viewing player and absolute card code
+    return self._relative_player_codes
+
+  @property
+  def in_play_codes(self):
+    # indexed by number of cards in play, position of the card, and whether the card is a trump
+    return self._in_play_codes
+
+  @property
+  def in_hand_codes(self):
+    # indexed by whether the card is a trump
+    return self._in_hand_codes
+
+  @property
+  def selected_codes(self):
+    # indexed by whether the card is a trump
+    return self._selected_codes
+
 
   @property
   def round_score_factor(self):
@@ -120,4 +185,5 @@ class Encoding:
         self.round_score_factor, self.hand_score_factor, self.baseline)
 
   def __str__(self):
-    return str(self.__dict__)
+    # the precomputed tables are derived from the other fields
+    return str({key: value for key, value in self.__dict__.items() if not isinstance(value, np.ndarray)})
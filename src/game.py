@@ -5,21 +5,27 @@ import csv
 import os
 import struct
 import time
+from collections import deque
 from datetime import datetime, timedelta
 
 import numpy as np
 from psutil import Process
 
 import utils
+from actor_learner import ActorLearner
 from baseline_players import HighestCardPlayer, RandomCardPlayer
+from batch_game import BatchGame
 from better_rules_player import BetterRulesPlayer
+from compiled_rules_players import CompiledBetterRulesPlayer, CompiledFixedBetterRulesPlayer, CompiledSimpleRulesPlayer
 from config import Config
 from const import Const
 from fixed_better_rules_player import FixedBetterRulesPlayer
 from game_type import GameType
 from keras_player import KerasPlayer
 from parallel_game import ParallelGame
+from remote import RemoteCoordinator
 from score import Score
+from shared_weights import SharedWeights
 from simple_rules_player import SimpleRulesPlayer
 from sklearn_player import MlpPlayer, OtherMlpPlayer, SgdPlayer
 
@@ -31,6 +37,9 @@ class Game:
       "simple": SimpleRulesPlayer,
       "better": BetterRulesPlayer,
       "fixed-better": FixedBetterRulesPlayer,
+      "simple-compiled": CompiledSimpleRulesPlayer,
+      "better-compiled": CompiledBetterRulesPlayer,
+      "fixed-better-compiled": CompiledFixedBetterRulesPlayer,
       "baseline": None,
       "sgd": SgdPlayer,
       "mlp": MlpPlayer,
@@ -38,6 +47,10 @@ class Game:
       "keras": KerasPlayer
       }
 
+  # chunks per worker that are started ahead when there's no training data to handle, so the
+  # workers don't wait for the results of their previous chunk to be processed
+  STARTED_CHUNKS_PER_PROCESS = 2
+
   def __init__(self, pool, log):
     self.pool = pool
     self.log = log
@@ -51,7 +64,13 @@ class Game:
         )
 
     self._overall_score = Score()
+    # the "current score" is the score of the current, ongoing game
+    self._current_score_team_1 = 0
+    self._current_score_team_2 = 0
+    self._checkpoint_score = Score()
     self._selected_game_types = np.zeros((Const.PLAYER_COUNT, len(GameType)), dtype=int)
+    # statistics about the predictions of the learners since the last logging
+    self._inference_statistics = np.zeros(4, dtype=int)
 
     if Config.STORE_SCORES:
       self._checkpoint_data = list()
@@ -61,6 +80,10 @@ class Game:
     self._training_data_fh = None
     self._game_type_decisions_fh = None
     self._training_data_writer = None
+    # process that trains the learners if the training doesn't run in this process
+    self._learner = None
+    # coordinator of the remote workers if they play the hands instead of the pool
+    self._coordinator = None
 
   def initialize(self):
     if Config.STORE_SCORES:
@@ -77,13 +100,12 @@ class Game:
     elif Config.STORE_TRAINING_DATA:
       training_description = "(storing training data) "
     elif Config.ONLINE_TRAINING:
-      training_description = "(training online) "
+      training_description = "(training online{}) ".format(" in learner process" if Config.ACTOR_LEARNER else "")
     else:
       training_description = ""
-    self.log.error("Starting game of {} hands: {} vs {} {}({} processes, {} batch size, {} rounds{})"
+    self.log.error("Starting game of {} hands: {} vs {} {}({} processes, chunks of up to {} hands{})"
         .format(utils.format_human(Config.TOTAL_HANDS), Config.TEAM_1_STRATEGY, Config.TEAM_2_STRATEGY,
-          training_description, Config.PARALLEL_PROCESSES,
-          utils.format_human(Config.BATCH_SIZE), utils.format_human(Config.BATCH_COUNT),
+          training_description, Config.PARALLEL_PROCESSES, utils.format_human(Config.BATCH_SIZE),
           ", baseline: {}".format(Config.ENCODING.baseline) if Config.TEAM_1_STRATEGY == "baseline" or \
               Config.TEAM_2_STRATEGY == "baseline" else ""))
     if Config.FORCE_GAME_TYPE:
@@ -99,68 +121,121 @@ class Game:
 
     start_time = time.time()
     played_hands = 0
-    batch_round = 0
-    parallel_games = [ParallelGame(self.players) for _ in range(Config.PARALLEL_PROCESSES)]
-    last_to_index = 0
+    game_class = BatchGame if Config.BATCH_ENGINE else ParallelGame
+    current_game = game_class(self.players)
+    training_data = None
+    training_data_reference = None
+    # the hands are played by this process if there's neither a pool nor remote workers
+    sequential = Config.PARALLEL_PROCESSES == 1 and not Config.REMOTE_WORKERS
+    # the workers play ahead by up to this many training intervals
+    lookahead_intervals = Config.MAX_STALENESS if not sequential or Config.ACTOR_LEARNER else 0
 
     if Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING:
-      training_samples_per_batch = Const.DECISIONS_PER_HAND * Config.BATCH_SIZE
       training_samples_per_training = Const.DECISIONS_PER_HAND * Config.TRAINING_INTERVAL
       # setting it to ones immediately allocates space (which prevents surprises later on...)
-      training_data = np.ones((training_samples_per_training, Const.CARDS_PER_HAND + 1), dtype=int)
+      # NOTE: the intervals that are played ahead need their own space
+      training_data = np.ones(((lookahead_intervals + 1) * training_samples_per_training, Const.CARDS_PER_HAND + 1),
+          dtype=int)
+      if Config.PARALLEL_PROCESSES > 1 and not Config.REMOTE_WORKERS:
+        # the workers write the training data of their chunks directly to the shared array
+        training_data, = SharedWeights.share([training_data])
+        training_data_reference = SharedWeights.reference(training_data)
+
+    if Config.ACTOR_LEARNER:
+      self._learner = ActorLearner(self.players, self._get_distinct_strategy_players(), self.log)
+    if Config.REMOTE_WORKERS:
+      self._coordinator = RemoteCoordinator(RemoteCoordinator.parse_address(Config.REMOTE_ADDRESS),
+          Config.REMOTE_WORKERS, Config.REMOTE_AUTHKEY.encode(), self.log)
+      self._coordinator.accept_workers()
 
     # retrieve processes
     results = [self.pool.apply_async(ParallelGame.set_seed_and_get_pid, (i+1,))
         for i in range(Config.PARALLEL_PROCESSES)]
     pool_pids = [result.get() for result in results]
     assert len(set(pool_pids)) == len(pool_pids)
-    pids = [os.getpid()] + pool_pids
+    pids = [os.getpid()] + pool_pids + ([self._learner.pid] if self._learner else [])
     self.log.info("Running with 1+{} processes: {}".format(len(pids)-1, " ".join(str(p) for p in pids)))
     processes = [Process(pid) for pid in pids]
 
-    while played_hands < Config.TOTAL_HANDS:
-      self.log.debug("Starting batch {}".format(batch_round+1))
-      if Config.PARALLEL_PROCESSES > 1:
-        batch = [self.pool.apply_async(game.play_hands, (played_hands + i * Config.BATCH_SIZE,))
-          for i, game in enumerate(parallel_games)]
-        self.log.debug("Started parallel batch of size {}".format(utils.format_human(Config.BATCH_SIZE)))
-        results = [b.get() for b in batch]
-      else:
-        ParallelGame.inject_log(self.log) # this seems needed even though the pool is initialized with the log
-        self.log.debug("Starting sequential batch of size {}".format(utils.format_human(Config.BATCH_SIZE)))
-        results = [game.play_hands(played_hands + i * Config.BATCH_SIZE)
-            for i, game in enumerate(parallel_games)]
-
-      self.log.debug("Processing results of batch")
-      for result in results:
-        self._overall_score.add_other_score(result[0])
-        self._selected_game_types += result[4]
+    # the workers keep the players across chunks, they only need to load them again after training
+    published_game = self._publish_game(current_game)
+    # chunks of hands that were started but not processed yet, with the games they were started with;
+    # the workers take the next chunk whenever they're done, regardless of the pace of the others, but
+    # the results are processed in order
+    started_chunks = deque()
+    started_hands = 0
 
-      played_hands += Config.BATCH_SIZE * Config.PARALLEL_PROCESSES
-      batch_round += 1
+    while played_hands < Config.TOTAL_HANDS:
+      if self._learner:
+        # pick up the players that the learner trained in the meantime, waiting for them if the workers
+        # can't continue otherwise
+        players = None
+        while self._learner.has_update() or (not started_chunks and not self._can_start_chunk(
+            started_hands, self._learner.trained_hands, 0, lookahead_intervals)):
+          players = self._learner.receive_update()
+        if players:
+          self.players = players
+          current_game = game_class(self.players)
+          if all(game is not published_game for game, _, _ in started_chunks):
+            self._withdraw_game(published_game)
+          published_game = self._publish_game(current_game)
+
+      while started_hands < Config.TOTAL_HANDS and self._can_start_chunk(started_hands,
+          self._learner.trained_hands if self._learner else played_hands, len(started_chunks), lookahead_intervals):
+        hand_count = Game._get_chunk_size(started_hands)
+        # each chunk has its own rows in the training data of its training interval
+        first_row = None
+        if training_data is not None:
+          first_row = int(started_hands * Const.DECISIONS_PER_HAND % len(training_data))
+
+        if self._coordinator:
+          chunk = self._coordinator.play_hands(published_game, started_hands, hand_count)
+          self.log.debug("Started remote chunk of {} hands".format(utils.format_human(hand_count)))
+        elif not sequential:
+          chunk = self.pool.apply_async(ParallelGame.play_published_hands,
+            (started_hands, published_game, (training_data_reference, first_row) if training_data_reference else None,
+              hand_count))
+          self.log.debug("Started parallel chunk of {} hands".format(utils.format_human(hand_count)))
+        else:
+          ParallelGame.inject_log(self.log) # this seems needed even though the pool is initialized with the log
+          self.log.debug("Starting sequential chunk of {} hands".format(utils.format_human(hand_count)))
+          chunk = current_game.play_hands(started_hands, None if first_row is None else
+              training_data[first_row:first_row + Const.DECISIONS_PER_HAND * hand_count], hand_count)
+        started_chunks.append((published_game, hand_count, chunk))
+        started_hands += hand_count
+
+      chunk_game, hand_count, chunk = started_chunks.popleft()
+      result = chunk if sequential else chunk.get()
+      if chunk_game is not published_game and all(game is not chunk_game for game, _, _ in started_chunks):
+        # no worker needs to load the players of the previous training anymore
+        self._withdraw_game(chunk_game)
+      if self._coordinator and training_data is not None:
+        first_row = int(played_hands * Const.DECISIONS_PER_HAND % len(training_data))
+        training_data[first_row:first_row + len(result[1])] = result[1]
+
+      self.log.debug("Processing results of chunk")
+      self._update_scores(played_hands, result[0])
+      self._selected_game_types += result[3]
+      self._inference_statistics += result[4]
+
+      played_hands += hand_count
 
       # handle new training data if required - train before checkpoint!
-      if Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING:
-        start_index = int(((played_hands - Config.BATCH_SIZE * Config.PARALLEL_PROCESSES)
-          % Config.TRAINING_INTERVAL) / Config.BATCH_SIZE)
-        for i, result in enumerate(results):
-          from_index = (start_index+i) * training_samples_per_batch
-          to_index = (start_index+i+1) * training_samples_per_batch
-          assert from_index == last_to_index
-          last_to_index = to_index % len(training_data)
-          training_data[from_index:to_index] = result[1]
+      if training_data is not None:
         if played_hands % Config.TRAINING_INTERVAL == 0:
-          self._handle_training_data(training_data)
+          interval = int(played_hands / Config.TRAINING_INTERVAL - 1) % (lookahead_intervals + 1)
+          self._handle_training_data(
+              training_data[interval * training_samples_per_training:(interval + 1) * training_samples_per_training])
+          if Config.ONLINE_TRAINING and not self._learner:
+            if all(game is not published_game for game, _, _ in started_chunks):
+              self._withdraw_game(published_game)
+            published_game = self._publish_game(current_game)
 
       # store game type decisions
       if Config.STORE_TRAINING_DATA:
-        for result in results:
-          self._write_game_type_decisions(result[2])
+        self._write_game_type_decisions(result[2])
 
       # checkpoint
-      if Config.STORE_SCORES:
-        for result in results:
-          self._checkpoint_data.extend(result[3])
       if played_hands % Config.CHECKPOINT_INTERVAL == 0:
         self._create_checkpoint(played_hands, Config.TOTAL_HANDS)
         if Config.STORE_SCORES:
@@ -169,21 +244,30 @@ class Game:
       # logging
       if played_hands % Config.LOGGING_INTERVAL == 0:
         memory = [round(process.memory_info().rss/1e6, 1) for process in processes]
-        percentage = batch_round / Config.BATCH_COUNT
+        percentage = played_hands / Config.TOTAL_HANDS
 
         elapsed_minutes = (time.time() - start_time) / 60
         estimated_hours, estimated_minutes = divmod(elapsed_minutes / percentage - elapsed_minutes, 60)
         self.log.warning(
-            "Round {}/{} ({:.1f}%) ETA: {:%H:%M} ({}:{:02d}), {}/{} hands; current T1 wins: {:.1f}%, memory: {}={:.1f}M"
-            .format(utils.format_human(batch_round), utils.format_human(Config.BATCH_COUNT), 100.0 * percentage,
+            "Played {}/{} hands ({:.1f}%) ETA: {:%H:%M} ({}:{:02d}); current T1 wins: {:.1f}%, memory: {}={:.1f}M"
+            .format(utils.format_human(played_hands), utils.format_human(Config.TOTAL_HANDS), 100.0 * percentage,
               datetime.now() + timedelta(hours=estimated_hours, minutes=estimated_minutes),
               int(estimated_hours), int(estimated_minutes),
-              utils.format_human(played_hands), utils.format_human(Config.TOTAL_HANDS),
               self._overall_score.team_1_win_percentage, "+".join(str(m) for m in memory), sum(memory)))
+        self._log_inference_statistics()
 
     # the game is over
+    if self._learner:
+      self.players = self._learner.stop() or self.players
     self._print_results()
 
+    self._withdraw_game(published_game)
+    if self._coordinator:
+      self._coordinator.close()
+    if training_data_reference:
+      training_data = None
+      SharedWeights.release_block(training_data_reference.block_name)
+
     # cleanup
     if self._training_data_fh:
       self._training_data_fh.close()
@@ -192,10 +276,117 @@ class Game:
     if self._score_fh:
       self._score_fh.close()
 
+  @staticmethod
+  def _get_chunk_size(first_hand):
+    """
+    Gets the number of hands of the chunk that starts at a hand: Chunks have up to the batch size and
+    end with the intervals, so the intervals don't depend on the batch size and the number of processes.
+
+    :first_hand: Index of the first hand of the chunk.
+
+    :returns: The number of hands.
+    """
+    intervals = [Config.LOGGING_INTERVAL, Config.CHECKPOINT_INTERVAL]
+    if Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING:
+      intervals.append(Config.TRAINING_INTERVAL)
+    return int(min([Config.BATCH_SIZE, Config.TOTAL_HANDS - first_hand] +
+      [interval - first_hand % interval for interval in intervals]))
+
+  @staticmethod
+  def _can_start_chunk(first_hand, handled_hands, started_chunks, lookahead_intervals):
+    """
+    Checks whether the next chunk of hands can be started before the started chunks are processed.
+
+    :first_hand: Index of the first hand of the chunk.
+    :handled_hands: Number of hands whose training data was handled, i.e. that the players are trained on.
+    :started_chunks: Number of chunks that are started but not processed.
+    :lookahead_intervals: Number of training intervals that can be played before the training data of
+      the previous intervals is handled.
+
+    :returns: True if the chunk can be started.
+    """
+    if Config.PARALLEL_PROCESSES == 1 and not Config.REMOTE_WORKERS and started_chunks:
+      return False
+    if not (Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING):
+      return started_chunks < Game.STARTED_CHUNKS_PER_PROCESS * (Config.REMOTE_WORKERS or Config.PARALLEL_PROCESSES)
+    return int(first_hand / Config.TRAINING_INTERVAL) <= int(handled_hands / Config.TRAINING_INTERVAL) + \
+        lookahead_intervals
+
+  def _publish_game(self, game):
+    """
+    Publishes a game to the workers, see `ParallelGame.publish` and `RemoteCoordinator.publish`.
+
+    :game: The game to publish.
+
+    :returns: The published game or None if the hands are played by this process.
+    """
+    if self._coordinator:
+      return RemoteCoordinator.publish(game)
+    if Config.PARALLEL_PROCESSES > 1:
+      return ParallelGame.publish(game)
+    return None
+
+  def _withdraw_game(self, published_game):
+    if published_game is not None and not self._coordinator:
+      ParallelGame.withdraw(published_game)
+
+  def _update_scores(self, already_played_hands, score_progress):
+    """
+    Updates the scores of the ongoing game hand by hand.
+
+    :already_played_hands: Number of hands that were played before the hands of the progress.
+    :score_progress: Scores of the teams after each round (and the last stich bonus), per hand.
+    """
+    for i, progress in enumerate(score_progress.tolist()):
+      score_team_1, score_team_2 = progress[-1]
+      self._overall_score.add_scores(score_team_1, score_team_2)
+      self._checkpoint_score.add_scores(score_team_1, score_team_2)
+
+      # the game is won by the first team that exceeds the winning score
+      winner = None
+      for step_score_1, step_score_2 in progress:
+        if step_score_1 + self._current_score_team_1 > Const.WINNING_SCORE:
+          winner = 1
+        elif step_score_2 + self._current_score_team_2 > Const.WINNING_SCORE:
+          winner = 2
+        if winner:
+          break
+
+      if winner:
+        self._overall_score.add_win(winner == 1)
+        self._checkpoint_score.add_win(winner == 1)
+        self._current_score_team_1 = 0
+        self._current_score_team_2 = 0
+      else:
+        self._current_score_team_1 += score_team_1
+        self._current_score_team_2 += score_team_2
+
+      # update stats for current checkpoint
+      if Config.STORE_SCORES and (already_played_hands+i+1) % Config.CHECKPOINT_RESOLUTION == 0:
+        self._checkpoint_data.append([already_played_hands+i+1, *self._checkpoint_score.score_data,
+          self.players[0].get_checkpoint_data(), self.players[1].get_checkpoint_data()
+          ])
+        self._checkpoint_score.clear()
+
+  def _log_inference_statistics(self):
+    hits, misses, agreeing_decisions, compared_decisions = self._inference_statistics
+    if Config.PREDICTION_CACHE_SIZE:
+      self.log.info("Prediction cache: {} hits, {} misses ({:.1f}% hits)".format(utils.format_human(hits),
+        utils.format_human(misses), 100.0 * hits / max(hits + misses, 1)))
+    if Config.INFERENCE_PRECISION or Config.QUANTIZATION_ANALYSIS:
+      self.log.info("{}: {:.2f}% of {} compared decisions select the same card as with full precision".format(
+        "Quantized int8 weights" if Config.QUANTIZATION_ANALYSIS else "Inference with {}".format(
+          Config.INFERENCE_PRECISION), 100.0 * agreeing_decisions / max(compared_decisions, 1),
+        utils.format_human(compared_decisions)))
+    self._inference_statistics.fill(0)
+
   def _handle_training_data(self, training_data):
     if Config.STORE_TRAINING_DATA:
       self._write_training_data(training_data)
     if Config.ONLINE_TRAINING:
+      if self._learner:
+        self._learner.train(training_data)
+        return
       for player in self._get_distinct_strategy_players():
         player.train(training_data, self.log)
 
@@ -213,6 +404,9 @@ class Game:
       self._score_writer.writerows(self._checkpoint_data)
       self._score_fh.flush()
     if Config.ONLINE_TRAINING:
+      if self._learner:
+        self._learner.checkpoint(current_iteration, total_iterations)
+        return
       for player in self._get_distinct_strategy_players():
         player.checkpoint(current_iteration, total_iterations, self.log)
 
@@ -1,129 +1,165 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import logging
 from config import Config
 
 import numpy as np
 
 import utils
 from const import Const
+from game_type import GameType
 from round import Round
 
 
 class Hand:
+  """
+  Plays hands with a fixed set of players and cards. The same instance is reused for all hands
+  and owns the buffers of the current hand, so playing a hand allocates (almost) nothing.
+  """
+
+  """
+  Round and player of each training sample of a hand: first the decisions of team 1 (players 1 and 3),
+  then the decisions of team 2 (players 2 and 4), with the two decisions per round next to each other.
+  """
+  SAMPLE_ROUNDS = np.tile(np.repeat(np.arange(Const.CARDS_PER_PLAYER - 1), 2), 2)
+  SAMPLE_PLAYERS = np.concatenate([np.tile([0, 2], Const.CARDS_PER_PLAYER - 1),
+    np.tile([1, 3], Const.CARDS_PER_PLAYER - 1)])
+
   def __init__(self, players, cards, log):
     self._players = players
-    if Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING:
-      self._training_data = list()
+    self._cards = np.array(cards)
+    self.cards = np.array(cards)
     self.log = log
-    self._known_cards = np.zeros(Const.CARDS_PER_HAND, dtype=int)
-    self.game_type_decision = None
+    self._round = Round(players, log)
+    # publicly known cards from the view of each player, the players' codes are already relative if needed
+    self._known_cards = np.zeros((Const.PLAYER_COUNT, Const.CARDS_PER_HAND), dtype=np.uint8)
+    # decision states of each player for each round except the last (where there's no decision)
+    self._states = np.zeros((Const.CARDS_PER_PLAYER - 1, Const.PLAYER_COUNT, Const.CARDS_PER_HAND), dtype=int)
+    self._round_winners = np.zeros(Const.CARDS_PER_PLAYER, dtype=int)
+    self._round_scores = np.zeros(Const.CARDS_PER_PLAYER, dtype=int)
+    # scores of the teams after each round and after the bonus of the last stich
+    self._score_progress = np.zeros((Const.CARDS_PER_PLAYER + 1, 2), dtype=int)
+    self._training_data = np.zeros((Const.DECISIONS_PER_HAND, Const.CARDS_PER_HAND + 1), dtype=int)
+    # chosen game type, initial hand cards and score
+    self.game_type_decision = np.zeros(Const.CARDS_PER_PLAYER + 2, dtype=int)
+
+  def deal(self, deal):
+    """
+    Distributes the cards for the next hand.
 
-    # shuffle and distribute cards
-    self.cards = np.random.permutation(cards)
+    :deal: Array with the card ids in the order in which they're distributed.
+    """
+    np.take(self._cards, deal, out=self.cards)
     for i in range(len(self._players)):
       self._players[i].hand = self.cards[i*Const.CARDS_PER_PLAYER:(i+1)*Const.CARDS_PER_PLAYER]
 
-
-  def play(self, dealer, initial_score_team_1, initial_score_team_2):
+  def play(self, dealer):
     """Plays the hand by playing 9 rounds.
 
     :dealer: (int) Index of the player that plays the first card.
 
-    :returns: A tuple with the teams' scores, the index of the winning team, and the game type.
+    :returns: A tuple with the teams' scores and the game type.
     """
+    return utils.resolve_steps(self.play_steps(dealer))
+
+  def play_steps(self, dealer):
+    """
+    Like `play` but as generator which yields the predictions that are needed by the players, see
+    `utils.resolve_steps`. While the hand is suspended, other hands can be played with the same players
+    if their hand cards are restored (see `Player.hand_state`).
+    """
+    debug = self.log.isEnabledFor(logging.DEBUG)
 
     # choose game type and set up cards accordingly
     game_type = self._players[dealer].select_game_type()
     initial_dealer = dealer
-    self.game_type_decision = [game_type.value] + [card.card_index for card in self._players[dealer].hand]
-    self.log.debug("{} ({}) selected game type: {}".format(self._players[dealer].name,
-      self._players[dealer].__class__.__name__, game_type.name))
+    self.game_type_decision[0] = game_type.value
+    # the cards are encoded independently of the game type because it isn't known yet
+    for i, card in enumerate(self._players[dealer].hand):
+      self.game_type_decision[i+1] = Config.ENCODING.card_indices[GameType.OBENABE.value, card.card_id]
+    if debug:
+      self.log.debug("{} ({}) selected game type: {}".format(self._players[dealer].name,
+        self._players[dealer].__class__.__name__, game_type.name))
     for card in self.cards:
       card.set_game_type(game_type)
 
+    self._known_cards.fill(0)
     _score_team_1 = 0
     _score_team_2 = 0
-    training_data_team_1 = []
-    training_data_team_2 = []
-    winner = None
 
     for i in range(Const.CARDS_PER_PLAYER):
-      self.log.debug("---------- Round {} ----------".format(i+1))
-      current_round = Round(self._players, self._known_cards, game_type, self.log)
-      dealer, score, played_cards, states = current_round.play(dealer)
-
-      # update known cards - mark the cards that were played during this round
-      for j in range(Const.PLAYER_COUNT):
-        assert self._known_cards[played_cards[j].card_index] == 0, "Can't change known card"
-        self._known_cards[played_cards[j].card_index] = Config.ENCODING.card_code_players[j] + \
-            (Config.ENCODING.trump_code_offset if played_cards[j].is_trump else 0)
-      self.log.debug("Known cards: {}".format(utils.format_cards(self._known_cards)))
+      if debug:
+        self.log.debug("---------- Round {} ----------".format(i+1))
+      if i < Const.CARDS_PER_PLAYER-1:
+        dealer, score, played_cards = yield from self._round.play_steps(dealer, game_type,
+            self._known_cards, self._states[i])
+
+        # update known cards - mark the cards that were played during this round in the view of each player
+        for j in range(Const.PLAYER_COUNT):
+          assert self._known_cards[0, played_cards[j].card_index] == 0, "Can't change known card"
+          self._known_cards[:, played_cards[j].card_index] = \
+              Config.ENCODING.known_card_codes[:, j, int(played_cards[j].is_trump)]
+        if debug:
+          self.log.debug("Known cards: {}".format(utils.format_cards(self._known_cards[0])))
+      else:
+        # the last round is forced
+        dealer, score, played_cards = self._round.play_last(dealer)
+      self._round_winners[i] = dealer
+      self._round_scores[i] = score
 
       # update score
       if dealer % 2 == 0:
         _score_team_1 += score
-        if not winner and _score_team_1 + initial_score_team_1 > Const.WINNING_SCORE:
-          winner = 1
       else:
         _score_team_2 += score
-        if not winner and _score_team_2 + initial_score_team_2 > Const.WINNING_SCORE:
-          winner = 2
-
-      self.log.debug("States:\n{}".format(states))
-      # if we gather training data and actually had a decision to make, update training data
-      if i < Const.CARDS_PER_PLAYER-1 and (Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING):
-        Hand._update_current_training_data(training_data_team_1, training_data_team_2, states, score, dealer)
+      self._score_progress[i] = _score_team_1, _score_team_2
 
     # the hand is done, add 5 points for the last stich
     if dealer % 2 == 0:
       self.log.debug("Team 1 made the last stich")
       _score_team_1 += 5
-      if not winner and _score_team_1 + initial_score_team_1 > Const.WINNING_SCORE:
-        winner = 1
     else:
       self.log.debug("Team 2 made the last stich")
       _score_team_2 += 5
-      if not winner and _score_team_2 + initial_score_team_2 > Const.WINNING_SCORE:
-        winner = 2
+    self._score_progress[-1] = _score_team_1, _score_team_2
 
-    self.log.debug("The round ended {} vs {} (overall: {} vs {}) with {}".format(_score_team_1, _score_team_2,
-      _score_team_1 + initial_score_team_1, _score_team_2 + initial_score_team_2,
-      "no winner" if not winner else "team {} winning the game".format(winner)))
+    if debug:
+      self.log.debug("The round ended {} vs {}".format(_score_team_1, _score_team_2))
 
-    # after concluding the hand, update the global training data
+    # after concluding the hand, update the training data
     if Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING:
-      for team_1_training_entry in training_data_team_1:
-        team_1_training_entry[-1] += _score_team_1 * Config.ENCODING.hand_score_factor
-      for team_2_training_entry in training_data_team_2:
-        team_2_training_entry[-1] += _score_team_2 * Config.ENCODING.hand_score_factor
-
-      # pylint: disable=consider-using-enumerate
-      # for i in range(len(training_data_team_1)):
-      #   self._training_data.append(training_data_team_1[i])
-      #   self._training_data.append(training_data_team_2[i])
-      self._training_data.extend(training_data_team_1)
-      self._training_data.extend(training_data_team_2)
+      self._update_training_data(_score_team_1, _score_team_2)
 
     # add score to game type decision
-    self.game_type_decision.append(_score_team_1 if initial_dealer % 2 == 0 else _score_team_2)
-    self.log.debug("Game type decision: {}".format(self.game_type_decision))
-
-    return (_score_team_1, _score_team_2), winner, game_type
+    self.game_type_decision[-1] = _score_team_1 if initial_dealer % 2 == 0 else _score_team_2
+    if debug:
+      self.log.debug("Game type decision: {}".format(self.game_type_decision))
+
+    return (_score_team_1, _score_team_2), game_type
+
+  def _update_training_data(self, score_team_1, score_team_2):
+    # the reward of each decision consists of the (signed) score of the round and the score of the team's hand
+    rounds = Hand.SAMPLE_ROUNDS
+    players = Hand.SAMPLE_PLAYERS
+    self._training_data[:, :-1] = self._states[rounds, players]
+    round_scores = np.where(self._round_winners[rounds] % 2 == players % 2,
+        self._round_scores[rounds], -self._round_scores[rounds])
+    hand_scores = np.where(players % 2 == 0, score_team_1, score_team_2)
+    self._training_data[:, -1] = round_scores * Config.ENCODING.round_score_factor + \
+        hand_scores * Config.ENCODING.hand_score_factor
 
-  @staticmethod
-  def _update_current_training_data(training_data_team_1, training_data_team_2, states, score, dealer):
-    if dealer % 2 == 0:
-      training_data_team_1.append(np.append(states[0], score * Config.ENCODING.round_score_factor))
-      training_data_team_2.append(np.append(states[1], -score * Config.ENCODING.round_score_factor))
-      training_data_team_1.append(np.append(states[2], score * Config.ENCODING.round_score_factor))
-      training_data_team_2.append(np.append(states[3], -score * Config.ENCODING.round_score_factor))
-    else:
-      training_data_team_1.append(np.append(states[0], -score * Config.ENCODING.round_score_factor))
-      training_data_team_2.append(np.append(states[1], score * Config.ENCODING.round_score_factor))
-      training_data_team_1.append(np.append(states[2], -score * Config.ENCODING.round_score_factor))
-      training_data_team_2.append(np.append(states[3], score * Config.ENCODING.round_score_factor))
+  @property
+  def score_progress(self):
+    """
+    Scores of the teams after each round and after the bonus of the last stich, which are overwritten
+    by the next hand. The winner of the ongoing game is determined from these.
+    """
+    return self._score_progress
 
   @property
   def new_training_data(self):
+    """
+    Training data of the last hand, which is overwritten by the next hand.
+    """
     return self._training_data
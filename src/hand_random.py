@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+
+import numpy as np
+
+from const import Const
+
+
+class HandRandom:
+  """
+  Counter-based random numbers of the hands.
+
+  The random numbers of a hand only depend on the random key and the index of the hand within the
+  whole game, so a seeded run gives the same results regardless of the number of processes and the
+  batch size. There are separate streams for the deals and for the decisions of the players.
+  """
+
+  DEAL_STREAM = 0
+  DECISION_STREAM = 1
+
+  """
+  Each (Philox) counter step produces 4 64-bit values and each random number of a deal needs one.
+  """
+  COUNTER_STEPS_PER_DEAL = Const.CARDS_PER_HAND // 4
+
+  """
+  Generator for the decisions of the current hand, random if no hand was started.
+  """
+  generator = np.random.default_rng()
+
+  @staticmethod
+  def create_random_key():
+    """
+    Creates a random key for unseeded runs.
+
+    :returns: The key.
+    """
+    return int(np.random.SeedSequence().entropy % 2**64)
+
+  @staticmethod
+  def get_deal_values(first_hand, count):
+    """
+    Gets the random values from which the deals of consecutive hands are created.
+
+    :first_hand: Index of the first hand within the whole game.
+    :count: Number of hands.
+
+    :returns: Array of shape (count, CARDS_PER_HAND) with uniformly distributed random values.
+    """
+    bit_generator = np.random.Philox(key=[Config.RANDOM_KEY, HandRandom.DEAL_STREAM],
+        counter=[first_hand * HandRandom.COUNTER_STEPS_PER_DEAL, 0, 0, 0])
+    return np.random.Generator(bit_generator).random((count, Const.CARDS_PER_HAND))
+
+  @staticmethod
+  def get_decision_generator(hand_index):
+    """
+    Creates the generator for the decisions of a hand.
+
+    :hand_index: Index of the hand within the whole game.
+
+    :returns: The generator of the hand.
+    """
+    # the hand index is in the second word of the counter so each hand can draw 2^64 (blocks of) numbers
+    return np.random.Generator(np.random.Philox(key=[Config.RANDOM_KEY, HandRandom.DECISION_STREAM],
+      counter=[0, hand_index, 0, 0]))
+
+  @staticmethod
+  def start_hand(hand_index):
+    """
+    Makes the players draw the random numbers of a hand.
+
+    :hand_index: Index of the hand within the whole game.
+    """
+    HandRandom.generator = HandRandom.get_decision_generator(hand_index)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from card import Card
+from const import Const
+from dense_network import DenseNetwork
+from hand import Hand
+from hand_random import HandRandom
+
+
+class _RunningHand:
+  """
+  State of a hand that is suspended while waiting for predictions.
+  """
+
+  def __init__(self, hand, index, dealer, steps, generator, hand_states):
+    self.hand = hand
+    self.index = index
+    self.dealer = dealer
+    self.steps = steps
+    self.generator = generator
+    self.hand_states = hand_states
+
+
+class HandScheduler:
+  """
+  Plays many hands concurrently with the same players. A hand is suspended whenever one of its players
+  needs predictions and once no hand can continue, the predictions of all suspended hands are made
+  together with one call per network. Each hand is played exactly like it would be on its own.
+  """
+
+  def __init__(self, players, concurrent_hands, log):
+    """
+    Creates a new scheduler.
+
+    :players: The players of the hands.
+    :concurrent_hands: Number of hands that are played at the same time.
+    :log: Logger instance.
+    """
+    self._players = players
+    # each hand needs its own cards because the cards know the game type of their hand
+    self._hands = [Hand(players, [Card(suit, value) for suit in range(len(Card.SUITS))
+      for value in range(len(Card.VALUES))], log) for _ in range(concurrent_hands)]
+
+  def play_hands(self, first_hand, deals, hand_finished):
+    """
+    Plays hands until all deals are played.
+
+    :first_hand: Index of the first hand within the whole game.
+    :deals: Array with the deal of each hand.
+    :hand_finished: Function that is called with the index of the hand within the deals, the hand,
+      the dealer, and the game type when a hand is finished. Afterwards, the hand is reused.
+    """
+    free_hands = list(reversed(self._hands))
+    requests = []
+    next_deal = 0
+    while True:
+      while free_hands and next_deal < len(deals):
+        running_hand = self._start_hand(free_hands.pop(), first_hand + next_deal, next_deal, deals[next_deal])
+        next_deal += 1
+        self._resume(running_hand, None, requests, free_hands, hand_finished)
+
+      if not requests:
+        # all hands are finished
+        return
+
+      current_requests = requests
+      requests = []
+      for (running_hand, _, _), scores in zip(current_requests, HandScheduler._predict(current_requests)):
+        self._resume(running_hand, scores, requests, free_hands, hand_finished)
+
+  def _start_hand(self, hand, hand_index, index, deal):
+    dealer = hand_index % Const.PLAYER_COUNT
+    HandRandom.start_hand(hand_index)
+    hand.deal(deal)
+    return _RunningHand(hand, index, dealer, hand.play_steps(dealer), HandRandom.generator,
+        [player.hand_state for player in self._players])
+
+  def _resume(self, running_hand, scores, requests, free_hands, hand_finished):
+    """
+    Continues to play a hand until it needs predictions or is finished.
+
+    :running_hand: The hand to continue.
+    :scores: The predicted scores that the hand is waiting for, None when starting the hand.
+    :requests: List to which the predictions that the hand needs next are added.
+    :free_hands: List to which the hand is added once it's finished.
+    :hand_finished: Function that is called once the hand is finished, see `play_hands`.
+    """
+    HandRandom.generator = running_hand.generator
+    for player, hand_state in zip(self._players, running_hand.hand_states):
+      player.hand_state = hand_state
+
+    try:
+      predict, states = running_hand.steps.send(scores)
+    except StopIteration as ex:
+      _, game_type = ex.value
+      hand_finished(running_hand.index, running_hand.hand, running_hand.dealer, game_type)
+      free_hands.append(running_hand.hand)
+      return
+
+    running_hand.hand_states = [player.hand_state for player in self._players]
+    requests.append((running_hand, predict, states))
+
+  @staticmethod
+  def _predict(requests):
+    """
+    Makes the predictions that the suspended hands are waiting for. The states of all requests for the
+    same network are predicted at once, the other predict functions are called per request because
+    their results might depend on the other states.
+
+    :requests: List of tuples with the suspended hand, the predict function, and the states to predict.
+
+    :returns: List with the predicted scores of each request.
+    """
+    requests_by_predict = {}
+    for i, (_, predict, _) in enumerate(requests):
+      requests_by_predict.setdefault(predict, []).append(i)
+
+    scores = [None] * len(requests)
+    for predict, indices in requests_by_predict.items():
+      if len(indices) == 1 or not isinstance(getattr(predict, "__self__", None), DenseNetwork):
+        for i in indices:
+          scores[i] = predict(requests[i][2])
+        continue
+
+      all_states = [requests[i][2] for i in indices]
+      all_scores = predict(np.concatenate(all_states))
+      for i, request_scores in zip(indices, np.split(all_scores, np.cumsum([len(s) for s in all_states])[:-1])):
+        scores[i] = request_scores
+    return scores
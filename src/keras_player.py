@@ -13,6 +13,7 @@ import numpy as np
 
 import utils
 from const import Const
+from dense_network import DenseNetwork
 from game_type import GameType
 from learner_player import LearnerPlayer
 
@@ -28,6 +29,9 @@ class KerasPlayer(LearnerPlayer):
   """
 
   _keras_regressor = None
+  # training samples, game type, and last loss of the shared regressor, which are shared by the team mates
+  # (also in the processes that unpickle them together) so either player can be asked about them
+  _keras_metadata = None
 
   NAME_FIELD = "name"
   TRAINING_SAMPLES_FIELD = "training_samples"
@@ -44,11 +48,21 @@ class KerasPlayer(LearnerPlayer):
     """
     offline_training = False
     if KerasPlayer._keras_regressor is None:
-      KerasPlayer._keras_regressor, self._training_samples, self._game_type, self._last_loss = \
-          KerasPlayer._create_or_load_model(log)
+      KerasPlayer._keras_regressor, training_samples, game_type, last_loss = KerasPlayer._create_or_load_model(log)
+      KerasPlayer._keras_metadata = {
+          KerasPlayer.TRAINING_SAMPLES_FIELD: training_samples,
+          KerasPlayer.GAME_TYPE_FIELD: game_type,
+          KerasPlayer.LAST_LOSS_FIELD: last_loss
+          }
       offline_training = Config.LOAD_TRAINING_DATA_FILE_NAME is not None
     self.regressor = KerasPlayer._keras_regressor
+    self._metadata = KerasPlayer._keras_metadata
     self.last_training_done = time.time()
+    # forward pass of the regressor, re-created whenever the regressor was trained
+    self._network = KerasPlayer._create_network(self.regressor, log)
+    if Config.SHARED_WEIGHTS and self._network:
+      self._network = self._network.share()
+    self._network_training_samples = self.training_samples
 
     if offline_training:
       # need to define the file name before training (to determine if it's a new model)
@@ -62,9 +76,17 @@ class KerasPlayer(LearnerPlayer):
 
     super(KerasPlayer, self).__init__(name, number, [Config.FORCE_GAME_TYPE], log)
 
+  def __getstate__(self):
+    state = self.__dict__.copy()
+    if Config.SHARED_WEIGHTS and self._get_network():
+      # the process that unpickles the player maps the shared weights of the (current) network and
+      # doesn't need the model itself
+      state["regressor"] = None
+    return state
+
   @property
   def training_samples(self):
-    return self._training_samples
+    return self._metadata[KerasPlayer.TRAINING_SAMPLES_FIELD]
 
   @property
   def model_type(self):
@@ -72,13 +94,51 @@ class KerasPlayer(LearnerPlayer):
 
   def _train_model(self, training_data, log):
     history = self.regressor.fit(training_data[:, :-1], training_data[:, -1], verbose=0)
-    self._training_samples += len(training_data)
+    self._metadata[KerasPlayer.TRAINING_SAMPLES_FIELD] += len(training_data)
     loss = np.mean(history.history["loss"])
-    self._last_loss = loss
+    self._metadata[KerasPlayer.LAST_LOSS_FIELD] = loss
     return loss
 
   def _predict_scores(self, states):
-    return self.regressor.predict(np.array(states))
+    return self._get_predict_function()(states)
+
+  def _get_predict_function(self):
+    network = self._get_inference_network()
+    return network.predict if network else self._predict_scores_with_model
+
+  def _get_network(self):
+    # the regressor is shared with the team mate, so training by either player invalidates the network;
+    # without the regressor, the network is always up to date (see `__getstate__`)
+    if self.regressor is not None and self._network_training_samples != self.training_samples:
+      network = KerasPlayer._create_network(self.regressor)
+      if Config.SHARED_WEIGHTS and self._network and network:
+        # other processes map the weights, so they're updated in place
+        self._network.update_shared_weights(network)
+      else:
+        self._network = network.share() if Config.SHARED_WEIGHTS and network else network
+      self._network_training_samples = self.training_samples
+    return self._network
+
+  def _predict_scores_with_model(self, states):
+    # avoid the overhead of `predict` for the few states of a decision
+    return self.regressor.predict_on_batch(np.array(states)).ravel()
+
+  @staticmethod
+  def _create_network(regressor, log=None):
+    """
+    Extracts the forward pass of the regressor if it's a plain stack of dense layers.
+
+    :regressor: The Keras model.
+    :log: Optional: Logger instance to report unsupported models.
+
+    :returns: The network or None if the model isn't supported.
+    """
+    try:
+      return DenseNetwork.from_keras_model(regressor)
+    except ValueError as ex:
+      if log:
+        log.warning("Predicting scores with the Keras model: {}".format(ex))
+      return None
 
   @staticmethod
   def _create_or_load_model(log):
@@ -167,9 +227,9 @@ class KerasPlayer(LearnerPlayer):
       # save metadata
       metadata = json.dumps({
         KerasPlayer.NAME_FIELD: model_file_name,
-        KerasPlayer.TRAINING_SAMPLES_FIELD: self._training_samples,
-        KerasPlayer.GAME_TYPE_FIELD: self._game_type.value,
-        KerasPlayer.LAST_LOSS_FIELD: self._last_loss
+        KerasPlayer.TRAINING_SAMPLES_FIELD: self.training_samples,
+        KerasPlayer.GAME_TYPE_FIELD: self._metadata[KerasPlayer.GAME_TYPE_FIELD].value,
+        KerasPlayer.LAST_LOSS_FIELD: self._metadata[KerasPlayer.LAST_LOSS_FIELD]
         })
       metadata_path = "{}/info.json".format(temp_dir)
       with open(metadata_path, "w") as fh:
@@ -190,5 +250,6 @@ class KerasPlayer(LearnerPlayer):
         utils.format_human(current_iteration), utils.format_human(total_iterations),
         100.0*current_iteration/total_iterations))
     else:
-      log.fatal("Storing final regressor in '{}' with loss {:.1f}".format(file_name, self._last_loss))
+      log.fatal("Storing final regressor in '{}' with loss {:.1f}".format(file_name,
+        self._metadata[KerasPlayer.LAST_LOSS_FIELD]))
     self._save_model(file_path)
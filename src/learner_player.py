@@ -9,9 +9,11 @@ from datetime import datetime, timedelta
 import numpy as np
 
 import utils
+from card_tables import CardTables
 from config import Config
 from const import Const
 from player import Player
+from prediction_cache import PredictionCache
 
 
 class LearnerPlayer(Player):
@@ -19,6 +21,22 @@ class LearnerPlayer(Player):
   Base class of ML-based players. Currently, any ML player is only for a specific game type.
   """
 
+  """
+  Maximum number of changed state entries for which the first layer is updated instead of re-calculated.
+  """
+  FIRST_LAYER_MAX_CHANGES = Const.CARDS_PER_HAND // 2
+
+  """
+  Interval of the decisions that are compared with the full precision network when inferring with reduced
+  precision or analyzing quantized weights.
+  """
+  PRECISION_COMPARISON_INTERVAL = 10
+
+  # decisions of the learners of the current process, the compared decisions that selected the
+  # same card as with full precision, and the compared decisions
+  _decision_count = 0
+  _precision_statistics = np.zeros(2, dtype=int)
+
   def __init__(self, name, number, known_game_types, log):
     """
     Creates a new ML-based player.
@@ -29,8 +47,30 @@ class LearnerPlayer(Player):
     :log: Logger instance.
     """
     self.last_training_done = time.time()
+    # network, state, and first layer pre-activation of the previous decision of the current hand
+    self._first_layer_accumulator = None
+    # reduced precision network and the network from which it was created
+    self._inference_network = None
+    self._inference_network_source = None
+    # network with quantized weights and the network from which it was created
+    self._quantized_network = None
+    self._quantized_network_source = None
     super(LearnerPlayer, self).__init__(name, number, known_game_types, log)
 
+  @Player.hand.setter
+  def hand(self, hand):
+    Player.hand.fset(self, hand)
+    self._first_layer_accumulator = None
+
+  @property
+  def hand_state(self):
+    return Player.hand_state.fget(self), self._first_layer_accumulator
+
+  @hand_state.setter
+  def hand_state(self, hand_state):
+    Player.hand_state.fset(self, hand_state[0])
+    self._first_layer_accumulator = hand_state[1]
+
   @abstractproperty
   def training_samples(self):
     """
@@ -124,24 +164,163 @@ class LearnerPlayer(Player):
   def get_checkpoint_data(self):
     return self.training_samples
 
+  def _get_predict_function(self):
+    """
+    Gets the function that predicts the scores of states, which may be called with the states of many
+    decisions at once.
+
+    :returns: The predict function.
+    """
+    return self._predict_scores
+
+  def _get_network(self):
+    """
+    Gets the forward pass of the model if it's a plain stack of dense layers.
+
+    :returns: The `DenseNetwork` or None.
+    """
+    return None
+
+  def _get_inference_network(self):
+    """
+    Gets the network to predict the scores with, which has reduced precision if configured.
+
+    :returns: The `DenseNetwork` or None.
+    """
+    network = self._get_network()
+    if not Config.INFERENCE_PRECISION or network is None:
+      return network
+    if self._inference_network_source is not network:
+      self._inference_network = network.with_precision(Config.INFERENCE_PRECISION)
+      self._inference_network_source = network
+    return self._inference_network
+
+  @staticmethod
+  def collect_inference_statistics():
+    """
+    Collects the statistics about the predictions of the learners of the current process and resets them.
+
+    :returns: Array with the hits and misses of the prediction caches, the number of compared decisions
+      that selected the same card with reduced and with full precision, and the number of compared decisions.
+    """
+    statistics = np.concatenate((PredictionCache.collect_statistics(), LearnerPlayer._precision_statistics))
+    LearnerPlayer._precision_statistics = np.zeros(2, dtype=int)
+    return statistics
+
+  def _compare_with_full_precision(self, state, valid_cards, scores):
+    """
+    Checks whether the card that was selected with reduced precision (or that would be selected with
+    quantized weights if they're analyzed) would also be selected with full precision.
+
+    :state: The current state.
+    :valid_cards: The cards that could be selected.
+    :scores: The scores of the valid cards that were predicted with reduced precision.
+    """
+    network = self._get_network()
+    if network is None:
+      return
+    candidate_states = Player._encode_candidate_states(state, valid_cards)
+    if Config.QUANTIZATION_ANALYSIS:
+      if self._quantized_network_source is not network:
+        self._quantized_network = network.quantized()
+        self._quantized_network_source = network
+      scores = self._quantized_network.predict(candidate_states)
+    full_precision_scores = network.predict(candidate_states)
+    LearnerPlayer._precision_statistics += np.argmax(full_precision_scores) == np.argmax(scores), 1
+
+  def _get_first_layer(self, network, state):
+    """
+    Gets the pre-activation of the network's first layer for the state. Within a hand, only the few
+    entries that changed since the previous decision are applied to the previous pre-activation.
+
+    :network: The network.
+    :state: The current state.
+
+    :returns: The pre-activation of the first layer.
+    """
+    accumulator = self._first_layer_accumulator
+    changed_indices = None
+    if accumulator and accumulator[0] is network:
+      _, previous_state, first_layer = accumulator
+      changed_indices = np.flatnonzero(state != previous_state)
+    if changed_indices is not None and len(changed_indices) <= LearnerPlayer.FIRST_LAYER_MAX_CHANGES:
+      first_layer = network.update_first_layer(first_layer, changed_indices,
+          state[changed_indices] - previous_state[changed_indices])
+    else:
+      first_layer = network.get_first_layer(state)
+    self._first_layer_accumulator = network, state, first_layer
+    return first_layer
+
+  def _predict_candidate_scores(self, state, candidate_cards, candidate_states=None):
+    """
+    Generator that predicts the scores of selecting each of the candidate cards, see `_select_card_steps`.
+
+    :state: The current state.
+    :candidate_cards: The cards that could be selected.
+    :candidate_states: Optional: The decision states of the candidate cards if they're already encoded.
+
+    :returns: The scores of the candidate cards.
+    """
+    network = self._get_inference_network() if Config.FIRST_LAYER_ACCUMULATOR and \
+        not Config.ENCODING.sort_states else None
+    if network:
+      # the candidate states only differ from the current state in the code of the selected card
+      trumps = [int(card.is_trump) for card in candidate_cards]
+      first_layers = network.get_candidate_first_layers(self._get_first_layer(network, state),
+          [card.card_index for card in candidate_cards],
+          Config.ENCODING.selected_codes[trumps] - Config.ENCODING.in_hand_codes[trumps])
+      return (yield network.predict_from_first_layer, first_layers)
+
+    if candidate_states is None:
+      candidate_states = Player._encode_candidate_states(state, candidate_cards)
+    return (yield self._get_predict_function(), candidate_states)
+
   def _select_card(self, args, log):
-    valid_cards, played_cards, known_cards, _ = args
-    states = []
-    scores = []
+    return utils.resolve_steps(self._select_card_steps(args, log))
 
-    state = self._encode_current_state(played_cards, known_cards)
-    for card in valid_cards:
-      my_state = np.array(state, copy=True)
-      my_state[card.card_index] = Config.ENCODING.card_code_selected + \
-          (Config.ENCODING.trump_code_offset if card.is_trump else 0)
-      if Config.ENCODING.sort_states:
-        my_state = Player._sort_decision_state(my_state, Config.ENCODING.card_index_by_suit)
-      states.append(my_state)
+  def _get_equivalent_card_representatives(self, valid_cards, known_cards, game_type):
+    """
+    Gets one card of each group of equivalent valid cards (see `CardTables.get_equivalent_cards`).
+
+    :valid_cards: The cards that could be selected.
+    :known_cards: The publicly known state from the view of the player.
+    :game_type: The current game type.
+
+    :returns: List with the weakest card of each group.
+    """
+    # the cards of the previous rounds are known and the player's own cards are gone for the others
+    gone_mask = self.hand_mask
+    for card_id in np.flatnonzero(known_cards[Config.ENCODING.card_indices[game_type.value]]):
+      gone_mask |= 1 << int(card_id)
+    groups = CardTables.get_equivalent_cards([card.card_id for card in valid_cards], gone_mask, game_type.value)
+    return [valid_cards[group[0]] for group in groups]
+
+  def _select_card_steps(self, args, log):
+    valid_cards, played_cards, known_cards, game_type = args
+
+    if Config.PRUNE_EQUIVALENT_CARDS and len(valid_cards) > 1:
+      valid_cards = self._get_equivalent_card_representatives(valid_cards, known_cards, game_type)
 
     if len(valid_cards) == 1:
       log.debug("Selecting the only valid card {}".format(valid_cards[0]))
       return valid_cards[0]
-    scores = self._predict_scores(states)
+
+    state = self._encode_current_state(played_cards, known_cards)
+    if not Config.PREDICTION_CACHE_SIZE:
+      scores = yield from self._predict_candidate_scores(state, valid_cards)
+    else:
+      states = Player._encode_candidate_states(state, valid_cards)
+      cache = PredictionCache.get(self.name, Config.PREDICTION_CACHE_SIZE)
+      scores, missing = cache.lookup(states, self.training_samples)
+      if missing:
+        missing_scores = yield from self._predict_candidate_scores(state, [valid_cards[i] for i in missing],
+            states[missing])
+        scores[missing] = missing_scores
+        cache.store(states[missing], missing_scores)
+    if Config.INFERENCE_PRECISION or Config.QUANTIZATION_ANALYSIS:
+      LearnerPlayer._decision_count += 1
+      if LearnerPlayer._decision_count % LearnerPlayer.PRECISION_COMPARISON_INTERVAL == 0:
+        self._compare_with_full_precision(state, valid_cards, scores)
     card = valid_cards[np.argmax(scores)]
     log.debug("Playing cards {} has predicted scores of {}, selecting {}"
         .format(utils.format_cards(valid_cards), scores, card))
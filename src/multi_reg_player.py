@@ -6,9 +6,12 @@ import pickle
 from config import Config
 
 import numpy as np
+from sklearn.neural_network import MLPRegressor
 
 import utils
+from dense_network import DenseNetwork
 from player import Player
+from shared_weights import SharedWeights
 
 
 class MultiRegPlayer(Player):
@@ -28,7 +31,27 @@ class MultiRegPlayer(Player):
     :log: Logger instance.
     """
     self.regressors = MultiRegPlayer._load_regressors(log)
-    super(MultiRegPlayer, self).__init__(name, number, self.regressors.keys(), log)
+    if Config.SHARED_WEIGHTS:
+      for regressor in self.regressors.values():
+        if isinstance(regressor, MLPRegressor):
+          SharedWeights.share_regressor(regressor)
+    # the regressors aren't trained, so the forward passes of the MLP regressors can be extracted once
+    self.networks = {game_type: DenseNetwork.from_mlp_regressor(regressor)
+        for game_type, regressor in self.regressors.items() if isinstance(regressor, MLPRegressor)}
+    super(MultiRegPlayer, self).__init__(name, number, list(self.regressors.keys()), log)
+
+  def __getstate__(self):
+    state = self.__dict__.copy()
+    state["regressors"] = {game_type: SharedWeights.reference_regressor(regressor)
+        if isinstance(regressor, MLPRegressor) and SharedWeights.is_shared(regressor.coefs_[0]) else regressor
+        for game_type, regressor in self.regressors.items()}
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    for regressor in self.regressors.values():
+      if isinstance(regressor, MLPRegressor):
+        SharedWeights.resolve_regressor(regressor)
 
   @staticmethod
   def _load_regressors(log):
@@ -50,26 +73,22 @@ class MultiRegPlayer(Player):
     return regressors
 
   def _select_card(self, args, log):
+    return utils.resolve_steps(self._select_card_steps(args, log))
+
+  def _select_card_steps(self, args, log):
     valid_cards, played_cards, known_cards, game_type = args
     regressor = self.regressors.get(game_type)
     if not regressor:
       raise RuntimeError("Don't have a regressor for game type '{}'".format(game_type))
 
-    states = []
-    scores = []
-
-    state = self._encode_current_state(played_cards, known_cards)
-    for card in valid_cards:
-      my_state = np.array(state, copy=True)
-      my_state[card.card_index] = Config.ENCODING.card_code_selected
-      if Config.ENCODING.sort_states:
-        my_state = Player._sort_decision_state(my_state, Config.ENCODING.card_index_by_suit)
-      states.append(my_state)
-
     if len(valid_cards) == 1:
       log.debug("Selecting the only valid card {}".format(valid_cards[0]))
       return valid_cards[0]
-    scores = regressor.predict(states)
+
+    state = self._encode_current_state(played_cards, known_cards)
+    states = Player._encode_candidate_states(state, valid_cards)
+    network = self.networks.get(game_type)
+    scores = yield network.predict if network else regressor.predict, states
     card = valid_cards[np.argmax(scores)]
     log.debug("Playing cards {} has predicted scores of {}, selecting {}"
         .format(utils.format_cards(valid_cards), scores, card))
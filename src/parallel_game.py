@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import pickle
 from config import Config
 from multiprocessing import current_process
 from time import sleep
@@ -11,11 +12,18 @@ import numpy as np
 import utils
 from card import Card
 from const import Const
+from deal_stream import DealStream
 from game_type import GameType
 from hand import Hand
-from score import Score
+from hand_random import HandRandom
+from hand_scheduler import HandScheduler
+from learner_player import LearnerPlayer
+from shared_weights import SharedWeights
 
 LOG = None
+# game of the worker process with the players that were published last (see `publish`)
+WORKER_GAME = None
+WORKER_GAME_BLOCK_NAME = None
 
 class ParallelGame:
 
@@ -24,74 +32,121 @@ class ParallelGame:
     self.players = players
 
     self._cards = [Card(suit, value) for suit in range(len(Card.SUITS)) for value in range(len(Card.VALUES))]
-    self.dealer = 0
-
-    # the "current score" is the score of the current, ongoing game
-    self.current_score_team_1 = 0
-    self.current_score_team_2 = 0
+    self._deal_stream = DealStream(Config.DEAL_FILE)
 
   @staticmethod
   def inject_log(log):
     global LOG # pylint: disable=global-statement
     LOG = log
 
-  def play_hands(self, already_played_hands):
+  def play_hands(self, already_played_hands, training_data=None, hand_count=None):
+    """
+    Plays a batch of hands. Each hand only depends on its index within the whole game, the ongoing
+    games (which span multiple hands and batches) are evaluated by the caller.
+
+    :already_played_hands: Number of hands that were played before, i.e. the index of the first hand.
+    :training_data: Optional: Array to write the training data to instead of a new array, if it's needed.
+    :hand_count: Optional: Number of hands to play, defaults to the batch size.
+
+    :returns: A tuple with the score progress of each hand (see `Hand.score_progress`), the training
+      data, the game type decisions, the number of selected game types per player, and the inference
+      statistics (see `LearnerPlayer.collect_inference_statistics`).
+    """
+    hand_count = int(hand_count or Config.BATCH_SIZE)
     if Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING:
-      # samples per game times number of games, number of cards plus score
-      training_data = np.ones((Const.DECISIONS_PER_HAND * Config.BATCH_SIZE, Const.CARDS_PER_HAND + 1), dtype=int)
+      if training_data is None:
+        # samples per game times number of games, number of cards plus score
+        training_data = np.ones((Const.DECISIONS_PER_HAND * hand_count, Const.CARDS_PER_HAND + 1), dtype=int)
       # number of games, number of initial hand cards plus chosen game type and score
-      game_type_decisions = np.ones((Config.BATCH_SIZE, Const.CARDS_PER_PLAYER + 2), dtype=int)
+      game_type_decisions = np.ones((hand_count, Const.CARDS_PER_PLAYER + 2), dtype=int)
     else:
       training_data = None
       game_type_decisions = None
-    last_to_index = 0
-    checkpoint_data = list()
-    batch_score = Score()
-    checkpoint_score = Score()
+    score_progress = np.zeros((hand_count, Const.CARDS_PER_PLAYER + 1, 2), dtype=int)
     selected_game_types = np.zeros((Const.PLAYER_COUNT, len(GameType)), dtype=int)
 
-    LOG.debug("[{}]: Starting to play {} hands...".format(self._id, utils.format_human(Config.BATCH_SIZE)))
-    for i in range(int(Config.BATCH_SIZE)):
-      # set up and play new hand
-      # NOTE: we're always playing witht he same cards and expect that the game type and scores get overwritten
-      hand = Hand(self.players, self._cards, LOG)
-      (score_team_1, score_team_2), winner, game_type = hand.play(self.dealer,
-          self.current_score_team_1, self.current_score_team_2)
-      selected_game_types[self.dealer, game_type.value] += 1
-
-      # the next hand is started by the next player
-      self.dealer = (self.dealer + 1) % Const.PLAYER_COUNT
-
-      # update scores and win counts
-      batch_score.add_scores(score_team_1, score_team_2)
-      checkpoint_score.add_scores(score_team_1, score_team_2)
-      if winner:
-        batch_score.add_win(winner == 1)
-        checkpoint_score.add_win(winner == 1)
-        self.current_score_team_1 = 0
-        self.current_score_team_2 = 0
-      else:
-        self.current_score_team_1 += score_team_1
-        self.current_score_team_2 += score_team_2
-
-      # update stats for current checkpoint
-      if Config.STORE_SCORES and (i+1) % Config.CHECKPOINT_RESOLUTION == 0:
-        checkpoint_data.append([i+1+already_played_hands, *checkpoint_score.score_data,
-          self.players[0].get_checkpoint_data(), self.players[1].get_checkpoint_data()
-          ])
-        checkpoint_score.clear()
-
-      if Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING:
-        from_index = i * Const.DECISIONS_PER_HAND
-        to_index = (i+1) * Const.DECISIONS_PER_HAND
-        assert from_index == last_to_index
-        last_to_index = to_index
-        training_data[from_index:to_index] = hand.new_training_data
+    def store_hand_results(i, hand, dealer, game_type):
+      selected_game_types[dealer, game_type.value] += 1
+      score_progress[i] = hand.score_progress
+      if training_data is not None:
+        training_data[i*Const.DECISIONS_PER_HAND:(i+1)*Const.DECISIONS_PER_HAND] = hand.new_training_data
         game_type_decisions[i] = hand.game_type_decision
 
-    LOG.debug("[{}]: ... finished playing {} hands".format(self._id, utils.format_human(Config.BATCH_SIZE)))
+    LOG.debug("[{}]: Starting to play {} hands...".format(self._id, utils.format_human(hand_count)))
+    deals = self._deal_stream.get_deals(already_played_hands, hand_count)
+    if Config.CONCURRENT_HANDS > 1:
+      HandScheduler(self.players, Config.CONCURRENT_HANDS, LOG).play_hands(already_played_hands, deals,
+          store_hand_results)
+    else:
+      # NOTE: we're always playing with the same cards and expect that the game type and scores get overwritten
+      hand = Hand(self.players, self._cards, LOG)
+      for i in range(hand_count):
+        # deal and play new hand, the hands are started by the players in turn
+        hand_index = already_played_hands + i
+        dealer = hand_index % Const.PLAYER_COUNT
+        HandRandom.start_hand(hand_index)
+        hand.deal(deals[i])
+        _, game_type = hand.play(dealer)
+        store_hand_results(i, hand, dealer, game_type)
+
+    LOG.debug("[{}]: ... finished playing {} hands".format(self._id, utils.format_human(hand_count)))
+
+    return score_progress, training_data, game_type_decisions, selected_game_types, \
+        LearnerPlayer.collect_inference_statistics()
 
-    return batch_score, training_data, game_type_decisions, checkpoint_data, selected_game_types
+  @staticmethod
+  def publish(game):
+    """
+    Publishes a game with its players to the worker processes, which keep them across batches until
+    the next game is published. Needs to be repeated whenever the players change, e.g. after training.
+
+    :game: The game to publish.
+
+    :returns: Reference to the published game, which is released by `withdraw`.
+    """
+    blob = pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)
+    shared_blob, = SharedWeights.share([np.frombuffer(blob, dtype=np.uint8)])
+    return SharedWeights.reference(shared_blob)
+
+  @staticmethod
+  def withdraw(reference):
+    """
+    Releases a published game once no worker process needs to load it anymore.
+
+    :reference: Reference to the published game.
+    """
+    SharedWeights.release_block(reference.block_name)
+
+  @staticmethod
+  def play_published_hands(already_played_hands, reference, training_data_slot=None, hand_count=None):
+    """
+    Plays a batch of hands in a worker process with the game that was published last, see `play_hands`.
+
+    :already_played_hands: Number of hands that were played before, i.e. the index of the first hand.
+    :reference: Reference to the published game.
+    :training_data_slot: Optional: Tuple with the reference to an array in shared memory and the index
+      of the row from which on the training data of the batch is written to the array. The training
+      data isn't returned then.
+    :hand_count: Optional: Number of hands to play, defaults to the batch size.
+
+    :returns: The results of the batch.
+    """
+    global WORKER_GAME, WORKER_GAME_BLOCK_NAME # pylint: disable=global-statement
+    if reference.block_name != WORKER_GAME_BLOCK_NAME:
+      blob = SharedWeights.resolve(reference)
+      WORKER_GAME = pickle.loads(blob)
+      del blob
+      SharedWeights.release_block(reference.block_name)
+      WORKER_GAME_BLOCK_NAME = reference.block_name
+      LOG.debug("[{}]: Loaded published players".format(WORKER_GAME._id)) # pylint: disable=protected-access
+
+    if not training_data_slot:
+      return WORKER_GAME.play_hands(already_played_hands, hand_count=hand_count)
+    training_data_reference, first_row = training_data_slot
+    training_data = SharedWeights.resolve(training_data_reference, writable=True)[
+        first_row:first_row + Const.DECISIONS_PER_HAND * int(hand_count or Config.BATCH_SIZE)]
+    results = WORKER_GAME.play_hands(already_played_hands, training_data, hand_count)
+    return (results[0], None) + results[2:]
 
   @staticmethod
   def set_seed_and_get_pid(worker_id):
@@ -2,13 +2,14 @@
 # -*- coding: utf-8 -*-
 
 from abc import ABC, abstractmethod
+import logging
 from config import Config
 
 import numpy as np
 
 import utils
+from card_tables import CardTables
 from const import Const
-from game_type import GameType
 
 
 class Player(ABC):
@@ -29,6 +30,7 @@ class Player(ABC):
     self._number = number
     self._known_game_types = known_game_types
     self._hand = None
+    self._hand_mask = 0
     log.debug("Created player {}".format(self.name))
 
   @property
@@ -47,8 +49,38 @@ class Player(ABC):
 
   @hand.setter
   def hand(self, hand):
-    # sort hand cards, NOTE: might be omitted for performance
-    self._hand = sorted(hand, key=lambda c: str(c.suit) + str(c.value))
+    # sort hand cards by suit and value
+    self._hand = sorted(hand, key=lambda c: c.card_id)
+    self._hand_mask = 0
+    for card in self._hand:
+      self._hand_mask |= 1 << card.card_id
+
+  @property
+  def hand_state(self):
+    """
+    Current hand cards and their bit mask, to switch between hands that are played concurrently.
+    """
+    return self._hand, self._hand_mask
+
+  @hand_state.setter
+  def hand_state(self, hand_state):
+    self._hand, self._hand_mask = hand_state
+
+  @property
+  def hand_mask(self):
+    """
+    Bit mask of the ids of the current hand cards of the player.
+    """
+    return self._hand_mask
+
+  def remove_card(self, card):
+    """
+    Removes a card from the player's hand.
+
+    :card: The card to remove.
+    """
+    self._hand.remove(card)
+    self._hand_mask &= ~(1 << card.card_id)
 
   def knows_game_type(self, game_type):
     """
@@ -76,35 +108,40 @@ class Player(ABC):
     Have the player select a valid hand card to play.
 
     :played_cards: The cards that are currently in play.
-    :known_cards: Array of all cards encoding the publicly known state.
+    :known_cards: Array of all cards encoding the publicly known state from the view of the player.
     :game_type: The current game type.
     :log: Logger instance.
 
     :returns: The selected card to play and the associated decision state.
     """
+    return utils.resolve_steps(self.select_card_to_play_steps(played_cards, known_cards, game_type, log))
+
+  def select_card_to_play_steps(self, played_cards, known_cards, game_type, log):
+    """
+    Like `select_card_to_play` but as generator which yields the predictions that are needed for the
+    decision instead of making them, see `utils.resolve_steps`.
+    """
     assert self.knows_game_type(game_type)
 
     # get all cards that would be valid to play
     valid_cards = self.get_valid_cards_to_play(played_cards, game_type)
 
     # actually select a card
-    selected_card = self._select_card((valid_cards, played_cards, known_cards, game_type), log)
-    log.debug("{} selects card {} to play (valid: {} - invalid: {})".format(
-      self.name, selected_card, utils.format_cards(valid_cards), \
-          utils.format_cards([card for card in self.hand if card not in valid_cards])))
+    selected_card = yield from self._select_card_steps((valid_cards, played_cards, known_cards, game_type), log)
+    if log.isEnabledFor(logging.DEBUG):
+      log.debug("{} selects card {} to play (valid: {} - invalid: {})".format(
+        self.name, selected_card, utils.format_cards(valid_cards), \
+            utils.format_cards([card for card in self.hand if card not in valid_cards])))
 
     # a decision was made, create the corresponding state
-    decision_state = self._encode_current_state(played_cards, known_cards)
-    assert decision_state[selected_card.card_index] in [Config.ENCODING.card_code_in_hand, \
-        Config.ENCODING.card_code_in_hand + Config.ENCODING.trump_code_offset], \
-        "Card to be played must be in the player's hand."
-    decision_state[selected_card.card_index] = Config.ENCODING.card_code_selected + \
-        (Config.ENCODING.trump_code_offset if selected_card.is_trump else 0)
-
-    # if requested, sort the decision state
     # afterwards, the encoding of the current state mustn't be modified, all that's missing is cost
+    current_state = self._encode_current_state(played_cards, known_cards)
+    assert current_state[selected_card.card_index] in Config.ENCODING.in_hand_codes, \
+        "Card to be played must be in the player's hand."
+    decision_state = current_state
+    decision_state[selected_card.card_index] = Config.ENCODING.selected_codes[int(selected_card.is_trump)]
     if Config.ENCODING.sort_states:
-      decision_state = Player._sort_decision_state(decision_state, Config.ENCODING.card_index_by_suit)
+      decision_state = Player._sort_decision_states(decision_state[np.newaxis], Config.ENCODING.card_index_by_suit)[0]
 
     return selected_card, decision_state
 
@@ -120,6 +157,14 @@ class Player(ABC):
     """
     pass
 
+  def _select_card_steps(self, args, log):
+    """
+    Decision making as generator which yields the predictions it needs, see `select_card_to_play_steps`.
+    Players that don't predict scores select the card right away.
+    """
+    return self._select_card(args, log)
+    yield # pylint: disable=unreachable
+
   def get_valid_cards_to_play(self, played_cards, game_type):
     """
     Get all cards in the player's hand that would be valid to play.
@@ -133,34 +178,16 @@ class Player(ABC):
       # the first player can always choose from all cards
       return self.hand
 
-    if game_type in [GameType.OBENABE, GameType.UNNENUFE]:
-      # try to match suit
-      valid_cards = list(filter(lambda c: played_cards[0].suit == c.suit, self.hand))
-      # all cards are valid if unable to match suit
-      return valid_cards or self.hand
-    if game_type.is_trump_game_type:
-      # try to match suit
-      valid_cards = list(filter(lambda c: played_cards[0].suit == c.suit, self.hand))
-      # prepare trump-related things
-      played_trumps = list(filter(lambda c: c.is_trump, played_cards))
-      best_trump = played_trumps[0] if played_trumps else None
-      for played_trump in played_trumps:
-        if best_trump.is_beaten_by(played_trump):
-          best_trump = played_trump
-      non_undertrumping_trumps = list(filter(lambda c: c.is_trump and \
-          (best_trump is None or best_trump.is_beaten_by(c)), self.hand))
-      if not valid_cards:
-        # all non-undertrumping cards are valid if unable to match suit and non-trump cards are in the hand
-        if all(map(lambda c: c.is_trump, self.hand)):
-          return self.hand
-        return list(filter(lambda c: not c.is_trump or c in non_undertrumping_trumps, self.hand))
-      if played_cards[0].is_trump:
-        # if the only valid (trump) card is the buur, all cards are valid, otherwise all valid (trump) cards are
-        return self.hand if len(valid_cards) == 1 and valid_cards[0].is_buur else valid_cards
-      # besides matching suit, non-undertrumping trumps can also be played
-      valid_cards.extend(non_undertrumping_trumps)
-      return valid_cards
-    raise ValueError("Unknown game type: '{}'".format(GameType.name))
+    valid_mask = CardTables.get_valid_cards_mask(self._hand_mask, [card.card_id for card in played_cards],
+        game_type.value)
+    following_mask = valid_mask & CardTables.SUIT_MASKS[played_cards[0].suit]
+    if following_mask and following_mask != valid_mask and not played_cards[0].is_trump:
+      # cards that match the suit come first, followed by the non-undertrumping trumps
+      return [card for card in self.hand if following_mask >> card.card_id & 1] + \
+          [card for card in self.hand if (valid_mask & ~following_mask) >> card.card_id & 1]
+    if valid_mask == self._hand_mask:
+      return self.hand
+    return [card for card in self.hand if valid_mask >> card.card_id & 1]
 
   def select_game_type(self):
     """
@@ -222,42 +249,50 @@ class Player(ABC):
     if player_number == 0:
       # unknown cards stay unknown
       return 0
-    # all other known cards must have been previously played by some player
-    # check if the card code is for a trump card of a player
-    card_is_trump = Config.ENCODING.trump_code_offset and player_number in \
-        np.array(Config.ENCODING.card_code_players) + Config.ENCODING.trump_code_offset
-    if card_is_trump:
-      player_number -= Config.ENCODING.trump_code_offset
-    # after accounting for trump cards, the card's code must be a player's
-    assert player_number in Config.ENCODING.card_code_players
+    # all other known cards must have been previously played by some player (the code is valid for every player)
+    assert Config.ENCODING.relative_player_codes[0, player_number] >= 0
     own_index = Config.ENCODING.card_code_players.index(self._number)
-    player_index = Config.ENCODING.card_code_players.index(player_number)
-    return Config.ENCODING.card_code_players[(player_index - own_index) % Const.PLAYER_COUNT] + \
-        (Config.ENCODING.trump_code_offset if card_is_trump else 0)
+    return int(Config.ENCODING.relative_player_codes[own_index, player_number])
 
   def _encode_current_state(self, played_cards, known_cards):
     """
     Encodes the current state that is specific to the player.
 
     :played_cards: The cards that are currently in play.
-    :known_cards: Array of all cards encoding the publicly known state.
+    :known_cards: Array of all cards encoding the publicly known state from the view of the player.
 
     :returns: Numpy-array with the current state from the view of the player. This encodes the
       decision state of the player.
     """
-    cards = np.array([self.convert_to_relative(card) for card in known_cards]) if \
-        Config.ENCODING.relative_player_encoding else np.array(known_cards, copy=True)
+    # the known cards are already relative to the player, only the cards in play and in hand are added
+    cards = known_cards.astype(int)
+    in_play_codes = Config.ENCODING.in_play_codes[len(played_cards)]
     for i, pc in enumerate(played_cards):
       assert cards[pc.card_index] == 0, "Cards in play must've previously been unknown"
-      cards[pc.card_index] = (Config.ENCODING.card_code_in_play[len(played_cards) - i - 1] if \
-          Config.ENCODING.relative_in_play_encoding else Config.ENCODING.card_code_in_play) + \
-          (Config.ENCODING.trump_code_offset if pc.is_trump else 0)
+      cards[pc.card_index] = in_play_codes[i, int(pc.is_trump)]
+    in_hand_codes = Config.ENCODING.in_hand_codes
     for hc in self.hand:
       assert cards[hc.card_index] == 0, "Cards in the player's hand must be unknown"
-      cards[hc.card_index] = Config.ENCODING.card_code_in_hand + \
-          (Config.ENCODING.trump_code_offset if hc.is_trump else 0)
+      cards[hc.card_index] = in_hand_codes[int(hc.is_trump)]
     return cards
 
+  @staticmethod
+  def _encode_candidate_states(current_state, candidate_cards):
+    """
+    Encodes the decision states of selecting each of the candidate cards at once.
+
+    :current_state: Numpy-array with the current state from the view of the player.
+    :candidate_cards: The cards that could be selected.
+
+    :returns: 2D-numpy-array with the decision state of each candidate card, sorted if requested.
+    """
+    candidate_states = np.tile(current_state, (len(candidate_cards), 1))
+    candidate_states[np.arange(len(candidate_cards)), [card.card_index for card in candidate_cards]] = \
+        Config.ENCODING.selected_codes[[int(card.is_trump) for card in candidate_cards]]
+    if Config.ENCODING.sort_states:
+      candidate_states = Player._sort_decision_states(candidate_states, Config.ENCODING.card_index_by_suit)
+    return candidate_states
+
   @staticmethod
   def _sort_decision_state(decision_state, cards_by_suit):
     """
@@ -270,20 +305,37 @@ class Player(ABC):
     :returns: The list of the sorted decision state.
     """
     assert len(decision_state) == Const.CARDS_PER_PLAYER * Const.PLAYER_COUNT
+    return Player._sort_decision_states(np.array([decision_state]), cards_by_suit)[0]
+
+  @staticmethod
+  def _sort_decision_states(decision_states, cards_by_suit):
+    """
+    Re-arranges multiple decision states at once, like `_sort_decision_state`.
+
+    :decision_states: 2D-numpy-array with one decision state per row.
+    :cards_by_suit: True if the decision states represent cards that are ordered by suit, false if
+                    they're ordered by value.
+
+    :returns: 2D-numpy-array of the sorted decision states.
+    """
+    # NOTE: sorting the suits lexicographically corresponds to sorting them as byte arrays
+    assert decision_states.shape[1] == Const.CARDS_PER_PLAYER * Const.PLAYER_COUNT
+    count = len(decision_states)
 
-    # split the decision state into separate lists per suit
+    # split the decision states into separate rows per suit
     if cards_by_suit:
-      cards_per_suit = [decision_state[Const.CARDS_PER_SUIT*i:Const.CARDS_PER_SUIT*(i+1)] \
-          for i in range(Const.SUIT_COUNT)]
+      cards_per_suit = decision_states.reshape(count, Const.SUIT_COUNT, Const.CARDS_PER_SUIT)
     else:
-      cards_per_suit = [decision_state[i::Const.SUIT_COUNT] for i in range(Const.SUIT_COUNT)]
+      cards_per_suit = decision_states.reshape(count, Const.CARDS_PER_SUIT, Const.SUIT_COUNT).transpose(0, 2, 1)
+    cards_per_suit = cards_per_suit.reshape(count * Const.SUIT_COUNT, Const.CARDS_PER_SUIT)
 
-    # sort the suits as byte arrays
-    sorted_suits = sorted(cards_per_suit, key=bytearray)
+    # sort the suits of each state lexicographically (the last key is the primary key)
+    keys = [cards_per_suit[:, i] for i in reversed(range(Const.CARDS_PER_SUIT))] + \
+        [np.repeat(np.arange(count), Const.SUIT_COUNT)]
+    sorted_suits = cards_per_suit[np.lexsort(keys)].reshape(count, Const.SUIT_COUNT, Const.CARDS_PER_SUIT)
 
-    # if the cards are ordered by value, the suit lists need to be zipped to re-establish that order
+    # if the cards are ordered by value, the suits need to be interleaved again
     if not cards_by_suit:
-      sorted_suits = zip(*sorted_suits)
+      sorted_suits = sorted_suits.transpose(0, 2, 1)
 
-    # flatten and return the sorted decision state
-    return np.array(utils.flatten(sorted_suits))
+    return sorted_suits.reshape(count, Const.CARDS_PER_HAND)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+  """
+  Bounded cache of the predicted scores of decision states, which evicts the least recently used
+  states. The caches are kept per process (they aren't serialized with the players), so each
+  worker builds up its own caches over the batches it plays.
+  """
+
+  # caches of the current process by name
+  _caches = {}
+
+  def __init__(self, size):
+    """
+    Creates a new cache.
+
+    :size: Maximum number of cached states.
+    """
+    self.size = size
+    self._scores = OrderedDict()
+    self._version = None
+    self.hits = 0
+    self.misses = 0
+
+  def __len__(self):
+    return len(self._scores)
+
+  @staticmethod
+  def get(name, size):
+    """
+    Gets the cache with the provided name of the current process, creating it if needed.
+
+    :name: Name of the cache.
+    :size: Maximum number of cached states of a new cache.
+
+    :returns: The cache.
+    """
+    cache = PredictionCache._caches.get(name)
+    if cache is None:
+      cache = PredictionCache._caches[name] = PredictionCache(size)
+    return cache
+
+  @staticmethod
+  def collect_statistics():
+    """
+    Collects the hits and misses of all caches of the current process and resets them.
+
+    :returns: Array with the number of hits and misses since the last collection.
+    """
+    statistics = np.zeros(2, dtype=int)
+    for cache in PredictionCache._caches.values():
+      statistics += cache.hits, cache.misses
+      cache.hits = 0
+      cache.misses = 0
+    return statistics
+
+  def lookup(self, states, version):
+    """
+    Looks up the scores of states.
+
+    :states: 2D-numpy-array of the states.
+    :version: Version of the model that predicts the scores (e.g. its number of training samples). If it
+      differs from the version of the cached scores, the cache is cleared.
+
+    :returns: A tuple with an array of the scores of the states (NaN if missing) and a list of the
+      indices of the missing states.
+    """
+    if version != self._version:
+      self._scores.clear()
+      self._version = version
+
+    scores = np.full(len(states), np.nan)
+    missing = []
+    for i, state in enumerate(states):
+      key = state.tobytes()
+      score = self._scores.get(key)
+      if score is None:
+        missing.append(i)
+      else:
+        self._scores.move_to_end(key)
+        scores[i] = score
+    self.hits += len(states) - len(missing)
+    self.misses += len(missing)
+    return scores, missing
+
+  def store(self, states, scores):
+    """
+    Adds the predicted scores of states, evicting the least recently used states if the cache is full.
+
+    :states: 2D-numpy-array of the states.
+    :scores: The predicted scores of the states.
+    """
+    for state, score in zip(states, scores):
+      self._scores[state.tobytes()] = score
+    while len(self._scores) > self.size:
+      self._scores.popitem(last=False)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+import queue
+import threading
+import traceback
+from argparse import ArgumentParser
+from config import Config
+from multiprocessing.connection import Client, Listener
+
+import utils
+from parallel_game import ParallelGame
+
+
+class RemoteResult:
+  """
+  Results of a chunk of hands that is played by a remote worker, which are retrieved like the results
+  of a pool.
+  """
+
+  def __init__(self):
+    self._done = threading.Event()
+    self._results = None
+    self._error = None
+
+  def set(self, results=None, error=None):
+    self._results = results
+    self._error = error
+    self._done.set()
+
+  def get(self):
+    """
+    Waits for the results.
+
+    :returns: The results of `ParallelGame.play_hands`.
+    """
+    self._done.wait()
+    if self._error:
+      raise RuntimeError("Remote worker failed to play hands: {}".format(self._error))
+    return self._results
+
+
+class RemoteCoordinator:
+  """
+  Distributes chunks of hands to workers that connect over TCP, e.g. from other machines (see
+  `RemoteWorker`). The workers receive the config and the published game with the players and their
+  weights, play the hands they're assigned, and send back the results including the training data.
+  Each worker takes the next chunk whenever it's done with its previous one. The chunks of a lost worker
+  are played by the others, they fail once all workers are lost.
+  """
+
+  NO_WORKERS_ERROR = "All remote workers were lost"
+
+  def __init__(self, address, worker_count, authkey, log):
+    """
+    Starts listening for workers.
+
+    :address: Tuple with the host and the port to listen on, port 0 selects a free port.
+    :worker_count: Number of workers to wait for.
+    :authkey: Key that the workers need to authenticate (bytes).
+    :log: Logger instance.
+    """
+    self.log = log
+    self._listener = Listener(address, authkey=authkey)
+    self._worker_count = worker_count
+    self._jobs = queue.Queue()
+    self._threads = []
+    # number of workers that weren't lost (including the ones that didn't connect yet), guarded by
+    # the lock together with queuing the chunks
+    self._live_workers = 0
+    self._lock = threading.Lock()
+
+  @property
+  def address(self):
+    return self._listener.address
+
+  @staticmethod
+  def parse_address(address):
+    """
+    Parses an address like "host:port".
+
+    :address: The address.
+
+    :returns: Tuple with the host and the port.
+    """
+    host, port = address.rsplit(":", 1)
+    return host, int(port)
+
+  def accept_workers(self):
+    """
+    Waits for all workers to connect and sends them the config.
+    """
+    self.log.warning("Waiting for {} remote workers on {}:{}".format(self._worker_count, *self.address))
+    with self._lock:
+      self._live_workers = self._worker_count
+    # the config is pickled explicitly so a worker that can't load it can still report the error
+    config = pickle.dumps({name: value for name, value in vars(Config).items() if name.isupper()},
+        protocol=pickle.HIGHEST_PROTOCOL)
+    for i in range(self._worker_count):
+      connection = self._listener.accept()
+      self.log.info("Remote worker {} connected from {}".format(i+1, self._listener.last_accepted))
+      connection.send(("config", config))
+      thread = threading.Thread(target=self._serve, args=(connection,), daemon=True)
+      thread.start()
+      self._threads.append(thread)
+
+  @staticmethod
+  def publish(game):
+    """
+    Publishes a game with its players to the workers, which load it before playing the next chunk
+    that was started with it. Needs to be repeated whenever the players change, e.g. after training.
+
+    :game: The game to publish.
+
+    :returns: The published game.
+    """
+    return pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL)
+
+  def play_hands(self, published_game, already_played_hands, hand_count):
+    """
+    Queues a chunk of hands for the next free worker, see `ParallelGame.play_hands`.
+
+    :published_game: The published game to play the hands with.
+    :already_played_hands: Number of hands that were played before, i.e. the index of the first hand.
+    :hand_count: Number of hands to play.
+
+    :returns: The `RemoteResult` of the chunk.
+    """
+    result = RemoteResult()
+    with self._lock:
+      if self._live_workers:
+        self._jobs.put((published_game, already_played_hands, hand_count, result))
+      else:
+        result.set(error=RemoteCoordinator.NO_WORKERS_ERROR)
+    return result
+
+  def close(self):
+    """
+    Stops the workers after the queued chunks.
+    """
+    for _ in self._threads:
+      self._jobs.put(None)
+    for thread in self._threads:
+      thread.join()
+    self._listener.close()
+
+  def _serve(self, connection):
+    """
+    Sends the queued chunks to a worker until it's stopped or lost.
+
+    :connection: Connection to the worker.
+    """
+    worker_game = None
+    for job in iter(self._jobs.get, None):
+      published_game, already_played_hands, hand_count, result = job
+      try:
+        if published_game is not worker_game:
+          connection.send(("game", published_game))
+          worker_game = published_game
+        connection.send(("play", (already_played_hands, hand_count)))
+        message, argument = connection.recv()
+      except (EOFError, OSError) as ex:
+        self.log.error("Lost remote worker: {}".format(ex))
+        connection.close()
+        self._lose_worker(job)
+        return
+      if message == "error":
+        result.set(error=argument)
+      else:
+        result.set(argument)
+    connection.send(("stop", None))
+    connection.close()
+
+  def _lose_worker(self, job):
+    """
+    Hands the chunk of a lost worker to the other workers, or fails all chunks if there are none left.
+
+    :job: The chunk that the lost worker was playing.
+    """
+    with self._lock:
+      self._live_workers -= 1
+      if self._live_workers:
+        self._jobs.put(job)
+        return
+      self.log.error(RemoteCoordinator.NO_WORKERS_ERROR)
+      job[-1].set(error=RemoteCoordinator.NO_WORKERS_ERROR)
+      while not self._jobs.empty():
+        queued_job = self._jobs.get()
+        if queued_job:
+          queued_job[-1].set(error=RemoteCoordinator.NO_WORKERS_ERROR)
+
+
+class RemoteWorker:
+  """
+  Plays the hands that a `RemoteCoordinator` assigns.
+  """
+
+  @staticmethod
+  def run(address, authkey, log):
+    """
+    Connects to a coordinator and plays hands until it stops the worker.
+
+    :address: Tuple with the host and the port of the coordinator.
+    :authkey: Key to authenticate with the coordinator (bytes).
+    :log: Logger instance.
+    """
+    connection = Client(address, authkey=authkey)
+    log.warning("Connected to coordinator at {}:{}".format(*address))
+    ParallelGame.inject_log(log)
+    game = None
+    # tracebacks of the config or the game if they can't be loaded, which are reported instead of playing
+    errors = {}
+    while True:
+      try:
+        message, argument = connection.recv()
+      except EOFError:
+        log.error("Lost connection to coordinator")
+        break
+      if message in ("config", "game"):
+        try:
+          if message == "config":
+            for name, value in pickle.loads(argument).items():
+              setattr(Config, name, value)
+          else:
+            game = pickle.loads(argument)
+            log.info("Loaded published players")
+          errors.pop(message, None)
+        except Exception: # pylint: disable=broad-except
+          log.error(traceback.format_exc())
+          errors[message] = traceback.format_exc()
+      elif message == "play":
+        already_played_hands, hand_count = argument
+        try:
+          if errors:
+            connection.send(("error", "\n".join(errors.values())))
+          else:
+            connection.send(("results", game.play_hands(already_played_hands, hand_count=hand_count)))
+        except Exception: # pylint: disable=broad-except
+          log.error(traceback.format_exc())
+          connection.send(("error", traceback.format_exc()))
+      else:
+        log.warning("Stopped by coordinator")
+        break
+    connection.close()
+
+
+def main():
+  parser = ArgumentParser()
+  parser.add_argument("--coordinator", required=True,
+      help="Address of the coordinator (host:port), i.e. the remote address of the evaluation")
+  parser.add_argument("--authkey", required=True,
+      help="Key to authenticate with the coordinator")
+  parser.add_argument("--loglevel", type=str, nargs="?", default="INFO",
+      help="Minimum log level of logged messages, defaults to INFO")
+  args = parser.parse_args()
+
+  log = utils.get_logger("jass-worker")
+  log.setLevel(args.loglevel.upper())
+  RemoteWorker.run(RemoteCoordinator.parse_address(args.coordinator), args.authkey.encode(), log)
+
+if __name__ == "__main__":
+  main()
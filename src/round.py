@@ -1,52 +1,95 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import numpy as np
+import logging
+
 import utils
 from const import Const
 
 
 class Round:
+  """
+  Plays the rounds (tricks) of hands, the same instance is reused for all rounds of all hands.
+  """
 
-  def __init__(self, players, known_cards, game_type, log):
+  def __init__(self, players, log):
     self._players = players
-    self._known_cards = known_cards
     self.p1, self.p2, self.p3, self.p4 = players # pylint: disable=invalid-name
-    self._game_type = game_type
     self.log = log
+    # buffers of the current round, in order of play and in order of player
+    self._played_cards = []
+    self._played_cards_by_player = [None] * Const.PLAYER_COUNT
 
-  def play(self, dealer):
+  def play(self, dealer, game_type, known_cards, states):
     """Play a round where each player plays one card.
 
     :dealer: (int) Index of the player that plays the first card.
+    :game_type: The current game type.
+    :known_cards: Array with the publicly known cards from the view of each player.
+    :states: Array to which the decision states of the players are written (in order of player).
 
     :returns: A tuple consisting of:
     - Index of the player who won the round
     - The score of the round
-    - An array with the played cards (in order of player, not in order of played card)
-    - The player states during this round
+    - A list with the played cards (in order of player, not in order of played card), which is
+      overwritten by the next round
+    """
+    return utils.resolve_steps(self.play_steps(dealer, game_type, known_cards, states))
+
+  def play_steps(self, dealer, game_type, known_cards, states):
+    """
+    Like `play` but as generator which yields the predictions that are needed by the players, see
+    `utils.resolve_steps`.
     """
     # self._print_hands()
 
-    played_cards = []
-    states = []
+    played_cards = self._played_cards
+    played_cards.clear()
 
     # play round
     for i in range(Const.PLAYER_COUNT):
-      current_player = self._players[(dealer+i) % Const.PLAYER_COUNT]
-      played_card, player_state = current_player.select_card_to_play(played_cards, self._known_cards,
-          self._game_type, self.log)
-      current_player.hand.remove(played_card)
+      player_index = (dealer+i) % Const.PLAYER_COUNT
+      current_player = self._players[player_index]
+      played_card, states[player_index] = yield from current_player.select_card_to_play_steps(played_cards,
+          known_cards[player_index], game_type, self.log)
+      current_player.remove_card(played_card)
 
       played_cards.append(played_card)
-      states.append(player_state)
+      self._played_cards_by_player[player_index] = played_card
+
+    return self._conclude(dealer)
+
+  def play_last(self, dealer):
+    """Play the last round where each player is forced to play the last hand card.
+    Since there are no decisions to make, the players aren't asked to select their card.
+
+    :dealer: (int) Index of the player that plays the first card.
+
+    :returns: The same as `play`.
+    """
+    played_cards = self._played_cards
+    played_cards.clear()
+
+    for i in range(Const.PLAYER_COUNT):
+      player_index = (dealer+i) % Const.PLAYER_COUNT
+      current_player = self._players[player_index]
+      assert len(current_player.hand) == 1, "Last round must be played with the last card"
+      played_card = current_player.hand[0]
+      current_player.remove_card(played_card)
+
+      played_cards.append(played_card)
+      self._played_cards_by_player[player_index] = played_card
+
+    return self._conclude(dealer)
 
+  def _conclude(self, dealer):
     # evaluate round
-    winner, score = Round._evaluate(played_cards, dealer)
-    rolled_cards = np.roll(played_cards, dealer, axis=0)
-    self.log.debug("{} wins the round ({} points): {} beats {}".format(self._players[winner].name, score,
-      rolled_cards[winner], utils.format_cards([c for c in played_cards if not c == rolled_cards[winner]])))
-    return winner, score, rolled_cards, np.roll(states, dealer, axis=0)
+    winner, score = Round._evaluate(self._played_cards, dealer)
+    if self.log.isEnabledFor(logging.DEBUG):
+      winning_card = self._played_cards_by_player[winner]
+      self.log.debug("{} wins the round ({} points): {} beats {}".format(self._players[winner].name, score,
+        winning_card, utils.format_cards([c for c in self._played_cards if not c == winning_card])))
+    return winner, score, self._played_cards_by_player
 
   @staticmethod
   def _evaluate(played_cards, dealer):
@@ -59,7 +102,7 @@ class Round:
     # the winner is the best card offset by the initial dealer
     winner = (dealer + best_index) % Const.PLAYER_COUNT
 
-    score = sum(map(lambda c: c.score, played_cards))
+    score = sum(card.score for card in played_cards)
     return winner, score
 
   def _print_hands(self):
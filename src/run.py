@@ -14,10 +14,15 @@ from multiprocessing import Pool
 import numpy as np
 
 import utils
+from batch_game import BatchGame
+from dense_network import DenseNetwork
+from distillation import Distillation
 from encoding import Encoding
 from game import Game
 from game_type import GameType
+from hand_random import HandRandom
 from parallel_game import ParallelGame
+from shared_weights import SharedWeights
 
 __version__ = "1.0"
 
@@ -49,6 +54,10 @@ def parse_arguments():
       help="Name of the training data file to write to")
   parser.add_argument("--store-game-type-file",
       help="Name of the file to write game type decisions to")
+  parser.add_argument("--distill-file",
+      help="Name of the training data file with the states to distill on instead of playing hands")
+  parser.add_argument("--deal-file",
+      help="Name of the deal file (created with deal_stream.py) to read the deals from instead of shuffling")
   parser.add_argument("--model", required=True,
       help="Name of the folder in the models/ directory, determines the encoding to use")
   parser.add_argument("--regressor-name",
@@ -68,6 +77,36 @@ def parse_arguments():
       help="Strategy for team 2")
   parser.add_argument("--force-game-type", choices=[""] + [game_type.name.lower() for game_type in GameType],
       help="Force playing of a specific game type")
+  parser.add_argument("--batch-engine", action="store_true",
+      help="True if all hands of a batch should be played at once (only for random/highest players)")
+  parser.add_argument("--first-layer-accumulator", action="store_true",
+      help="True if the learners should update the first layer of their networks with the changes of the state")
+  parser.add_argument("--prediction-cache", type=float, default=0,
+      help="Number of decision states whose predicted scores each learner caches per process, 0 to disable")
+  parser.add_argument("--inference-precision", choices=DenseNetwork.PRECISIONS,
+      help="Reduced precision of the learners' networks for predicting scores")
+  parser.add_argument("--quantization-analysis", action="store_true",
+      help="True if some decisions of the learners should be compared with the ones of int8 weights (not for playing)")
+  parser.add_argument("--prune-equivalent-cards", action="store_true",
+      help="True if the learners should only predict the score of one of multiple equivalent valid cards")
+  parser.add_argument("--concurrent-hands", type=int, default=1,
+      help="Number of hands a process plays concurrently, to predict the scores of their decisions together")
+  parser.add_argument("--shared-weights", action="store_true",
+      help="True if the processes should map the weights of the models from shared memory instead of copying them")
+  parser.add_argument("--actor-learner", action="store_true",
+      help="True if a dedicated process should train online while the other processes keep playing")
+  parser.add_argument("--remote-workers", type=int, default=0,
+      help="Number of remote workers (see remote.py) that play the hands instead of the local processes")
+  parser.add_argument("--remote-address", default="0.0.0.0:6543",
+      help="Address (host:port) on which the remote workers connect, defaults to port 6543 on all interfaces")
+  parser.add_argument("--remote-authkey",
+      help="Key that the remote workers need to authenticate")
+  parser.add_argument("--max-staleness", type=int, default=0,
+      help="Number of training intervals that the processes may play ahead while the previous ones are trained/written")
+
+  parser.add_argument("--distill", type=lambda sizes: tuple(int(size) for size in sizes.split(",")),
+      metavar="SIZE1,SIZE2,...",
+      help="Hidden layer sizes of an MLP student to train on the predictions of team 1 instead of playing a game")
 
   # intervals
   default_hands = 1e4
@@ -81,7 +120,7 @@ def parse_arguments():
   parser.add_argument("--chkresolution", type=float, nargs="?",
       help="Checkpoint data resolution (hands), defaults to checkpoint interval/10")
   parser.add_argument("--batchsize", type=float, nargs="?",
-      help="Size of a single batch to run on a process, defaults to 1e3")
+      help="Maximum number of hands in a chunk that a process plays at once, defaults to 1e3")
   parser.add_argument("--logint", type=float, nargs="?",
       help="Logging interval, defaults to hands/20")
 
@@ -95,6 +134,8 @@ def apply_arguments(args):
     Config.SEED = args.seed2
   if Config.SEED:
     np.random.seed(Config.SEED)
+  # the random numbers of the hands are derived from the key and don't depend on the processes
+  Config.RANDOM_KEY = Config.SEED if Config.SEED else HandRandom.create_random_key()
   Config.PARALLEL_PROCESSES = args.procs
 
   if args.store_data and not args.no_store_data:
@@ -120,6 +161,11 @@ def apply_arguments(args):
   if args.store_game_type_file:
     Config.STORE_GAME_TYPE_DECISIONS_FILE_NAME = args.store_game_type_file if \
         args.store_game_type_file.startswith("/") else "data/{}".format(args.store_game_type_file)
+  if args.distill_file:
+    Config.DISTILLATION_DATA_FILE_NAME = args.distill_file if \
+        args.distill_file.startswith("/") else "data/{}".format(args.distill_file)
+  if args.deal_file:
+    Config.DEAL_FILE = args.deal_file if args.deal_file.startswith("/") else "data/{}".format(args.deal_file)
   Config.EVALUATION_DIRECTORY = "evaluations/{}".format(args.eid)
   Config.LOSS_FILE = "{}/loss.csv".format(Config.EVALUATION_DIRECTORY)
 
@@ -131,6 +177,30 @@ def apply_arguments(args):
     Config.TEAM_2_STRATEGY = args.team2
   if args.force_game_type:
     Config.FORCE_GAME_TYPE = utils.get_enum_by_name(GameType, args.force_game_type)
+  if args.batch_engine:
+    Config.BATCH_ENGINE = True
+  Config.CONCURRENT_HANDS = args.concurrent_hands
+  if args.shared_weights:
+    Config.SHARED_WEIGHTS = True
+  Config.MAX_STALENESS = args.max_staleness
+  if args.actor_learner:
+    Config.ACTOR_LEARNER = True
+  Config.REMOTE_WORKERS = args.remote_workers
+  Config.REMOTE_ADDRESS = args.remote_address
+  Config.REMOTE_AUTHKEY = args.remote_authkey
+  if args.first_layer_accumulator:
+    Config.FIRST_LAYER_ACCUMULATOR = True
+  Config.PREDICTION_CACHE_SIZE = int(args.prediction_cache)
+  if args.inference_precision:
+    Config.INFERENCE_PRECISION = args.inference_precision
+  if args.quantization_analysis:
+    Config.QUANTIZATION_ANALYSIS = True
+  if args.prune_equivalent_cards:
+    Config.PRUNE_EQUIVALENT_CARDS = True
+  if args.distill:
+    Config.DISTILLATION_LAYERS = args.distill
+    # the states of the played hands are needed to train the student
+    Config.STORE_TRAINING_DATA = not Config.DISTILLATION_DATA_FILE_NAME
 
   if args.hands is not None:
     Config.TOTAL_HANDS = int(args.hands)
@@ -146,7 +216,7 @@ def apply_arguments(args):
   if args.chkint:
     Config.CHECKPOINT_INTERVAL = int(args.chkint)
   else:
-    Config.CHECKPOINT_INTERVAL = Config.TRAINING_INTERVAL if Config.ONLINE_TRAINING else Config.TOTAL_HANDS / 10
+    Config.CHECKPOINT_INTERVAL = Config.TRAINING_INTERVAL if Config.ONLINE_TRAINING else int(Config.TOTAL_HANDS / 10)
   Config.CHECKPOINT_INTERVAL = min(Config.CHECKPOINT_INTERVAL, Config.TOTAL_HANDS)
   if args.chkresolution:
     Config.CHECKPOINT_RESOLUTION = int(args.chkresolution)
@@ -157,8 +227,6 @@ def apply_arguments(args):
   else:
     Config.LOGGING_INTERVAL = int(Config.TOTAL_HANDS / 20)
 
-  Config.set_batch_count()
-
 def check_config(log):
   # pylint: disable=too-many-return-statements,too-many-branches
   model_based_strategies = ["sgd", "mlp", "mlp-other", "keras"]
@@ -181,12 +249,30 @@ def check_config(log):
     log.error("Cannot train online when not using models")
     return False
 
+  if Config.BATCH_ENGINE and any(Config.ENCODING.baseline if strategy == "baseline" else strategy
+      not in BatchGame.SUPPORTED_STRATEGIES for strategy in [Config.TEAM_1_STRATEGY, Config.TEAM_2_STRATEGY]):
+    log.error("The batch engine only supports the strategies {}".format(", ".join(BatchGame.SUPPORTED_STRATEGIES)))
+    return False
+
   if (Config.TEAM_1_STRATEGY in other_models or Config.TEAM_2_STRATEGY in other_models) and \
       not Config.OTHER_REGRESSOR_NAME:
     log.error("No other regressor name provided")
     return False
 
-  if Config.STORE_TRAINING_DATA:
+  if Config.DISTILLATION_LAYERS:
+    if Config.TEAM_1_STRATEGY not in model_based_strategies:
+      log.error("Team 1 must be a learner to distill it")
+      return False
+    if Config.ONLINE_TRAINING or Config.FIRST_LAYER_ACCUMULATOR:
+      log.error("Can't distill while training online or with the first layer accumulator")
+      return False
+    if Config.STORE_TRAINING_DATA_FILE_NAME or Config.STORE_GAME_TYPE_DECISIONS_FILE_NAME:
+      log.error("Can't store training data while distilling")
+      return False
+    if Config.DISTILLATION_DATA_FILE_NAME and not os.path.exists(Config.DISTILLATION_DATA_FILE_NAME):
+      log.error("Training data file to distill on doesn't exist!")
+      return False
+  elif Config.STORE_TRAINING_DATA:
     if not Config.STORE_TRAINING_DATA_FILE_NAME or not Config.STORE_GAME_TYPE_DECISIONS_FILE_NAME:
       log.error("Need training and game type decision file names when storing data")
       return False
@@ -205,6 +291,48 @@ def check_config(log):
     log.error("Training data file to load doesn't exist!")
     return False
 
+  if Config.DEAL_FILE and not os.path.exists(Config.DEAL_FILE):
+    log.error("Deal file doesn't exist!")
+    return False
+
+  if Config.PREDICTION_CACHE_SIZE < 0:
+    log.error("The prediction cache can't have a negative size")
+    return False
+
+  if Config.CONCURRENT_HANDS < 1:
+    log.error("Must play at least one hand at a time")
+    return False
+
+  if Config.MAX_STALENESS < 0:
+    log.error("The players can't be ahead of the training")
+    return False
+
+  if Config.ACTOR_LEARNER:
+    if not Config.ONLINE_TRAINING:
+      log.error("The learner process only trains online")
+      return False
+    if Config.SHARED_WEIGHTS:
+      # the learner sends its trained players instead of updating their weights in place
+      log.error("Can't train in a learner process with shared weights")
+      return False
+
+  if Config.REMOTE_WORKERS:
+    if not Config.REMOTE_AUTHKEY:
+      log.error("Need an authentication key for the remote workers")
+      return False
+    if Config.SHARED_WEIGHTS or Config.DISTILLATION_LAYERS:
+      log.error("Remote workers can't map shared weights or play the hands of the distillation")
+      return False
+    if Config.DEAL_FILE:
+      # the path would be opened on the machines of the workers
+      log.error("Remote workers can't read the deal file")
+      return False
+
+  if Config.MAX_STALENESS and Config.ONLINE_TRAINING and Config.SHARED_WEIGHTS:
+    # the processes would see the weights change while they're trained
+    log.error("Can't play ahead of the training with shared weights")
+    return False
+
   actually_plays_hands = Config.TOTAL_HANDS > 0
 
   if actually_plays_hands and Config.TOTAL_HANDS % Config.CHECKPOINT_INTERVAL != 0:
@@ -212,14 +340,8 @@ def check_config(log):
       utils.format_human(Config.CHECKPOINT_INTERVAL), utils.format_human(Config.TOTAL_HANDS)))
     return False
 
-  if Config.LOGGING_INTERVAL % (Config.BATCH_SIZE*Config.PARALLEL_PROCESSES) != 0:
-    log.error("Batch size {} times processes {} must divide logging interval {}".format(
-      utils.format_human(Config.BATCH_SIZE), Config.PARALLEL_PROCESSES, utils.format_human(Config.LOGGING_INTERVAL)))
-    return False
-
-  if Config.CHECKPOINT_INTERVAL % (Config.BATCH_SIZE*Config.PARALLEL_PROCESSES) != 0:
-    log.error("Batch size {} times processes {} must divide checkpoint interval {}".format(
-      utils.format_human(Config.BATCH_SIZE), Config.PARALLEL_PROCESSES, utils.format_human(Config.CHECKPOINT_INTERVAL)))
+  if actually_plays_hands and (Config.BATCH_SIZE < 1 or Config.LOGGING_INTERVAL < 1 or Config.CHECKPOINT_INTERVAL < 1):
+    log.error("The batch size and the logging and checkpoint intervals must be at least one hand")
     return False
 
   if (Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING) and actually_plays_hands and \
@@ -228,12 +350,6 @@ def check_config(log):
       utils.format_human(Config.TRAINING_INTERVAL), utils.format_human(Config.TOTAL_HANDS)))
     return False
 
-  if (Config.STORE_TRAINING_DATA or Config.ONLINE_TRAINING) and \
-      Config.TRAINING_INTERVAL % (Config.BATCH_SIZE*Config.PARALLEL_PROCESSES) != 0:
-    log.error("Batch size {} times processes {} must divide training interval {}".format(
-      utils.format_human(Config.BATCH_SIZE), Config.PARALLEL_PROCESSES, utils.format_human(Config.TRAINING_INTERVAL)))
-    return False
-
   if Config.ONLINE_TRAINING and Config.CHECKPOINT_INTERVAL < Config.TRAINING_INTERVAL:
     log.error("Checkpoint interval {} should be greater than training interval {}".format(
       utils.format_human(Config.CHECKPOINT_INTERVAL), utils.format_human(Config.TRAINING_INTERVAL)))
@@ -245,16 +361,9 @@ def check_config(log):
       utils.format_human(Config.TRAINING_INTERVAL), utils.format_human(Config.CHECKPOINT_INTERVAL)))
     return False
 
-  if Config.STORE_SCORES and (Config.BATCH_SIZE % Config.CHECKPOINT_RESOLUTION) != 0:
-    log.error("The checkpoint resolution {} must divide the batch size {}".format(
-      utils.format_human(Config.CHECKPOINT_RESOLUTION), Config.BATCH_SIZE))
-    return False
-
-  if (Config.TOTAL_HANDS % (Config.BATCH_SIZE * Config.PARALLEL_PROCESSES)) != 0 or \
-      Config.BATCH_COUNT * Config.BATCH_SIZE * Config.PARALLEL_PROCESSES != Config.TOTAL_HANDS:
-    log.error("The configuration would lead to incomplete batches: {} hands can't be split into parts of {}*{}={}"
-        .format(utils.format_human(Config.TOTAL_HANDS), utils.format_human(Config.PARALLEL_PROCESSES),
-          utils.format_human(Config.BATCH_SIZE), utils.format_human(Config.PARALLEL_PROCESSES*Config.BATCH_SIZE)))
+  if Config.STORE_SCORES and (Config.CHECKPOINT_INTERVAL % Config.CHECKPOINT_RESOLUTION) != 0:
+    log.error("The checkpoint resolution {} must divide the checkpoint interval {}".format(
+      utils.format_human(Config.CHECKPOINT_RESOLUTION), utils.format_human(Config.CHECKPOINT_INTERVAL)))
     return False
 
   return True
@@ -431,16 +540,22 @@ def main():
 
   try:
     log.warning("Starting evaluation '{}' (PID: {})".format(args.eid, os.getpid()))
+    # the players and possibly their weights are shared with the workers
+    SharedWeights.initialize()
     # fork as early as possible
     with Pool(processes=Config.PARALLEL_PROCESSES, initializer=ParallelGame.inject_log, initargs=(log,)) as pool:
-      game = Game(pool, log)
-      if Config.TOTAL_HANDS:
-        game.play()
+      if Config.DISTILLATION_LAYERS:
+        Distillation(pool, Game(pool, log).players, log).run()
+      else:
+        game = Game(pool, log)
+        if Config.TOTAL_HANDS:
+          game.play()
   except Exception as ex:
     log.critical("{} during evaluation: {}".format(type(ex).__name__, str(ex)))
     log.critical(traceback.format_exc())
     sys.exit(1)
   finally:
+    SharedWeights.release()
     mins, secs = divmod(time.time() - start_time, 60)
     hours, mins = divmod(mins, 60)
     time_string = \
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+
+class SharedArrayReference:
+  """
+  Location of an array in a block of shared memory, which is pickled instead of the array's data.
+  """
+
+  def __init__(self, block_name, offset, shape, dtype):
+    self.block_name = block_name
+    self.offset = offset
+    self.shape = shape
+    self.dtype = dtype
+
+
+class SharedWeights:
+  """
+  Keeps the weights of models in blocks of shared memory. The process that creates a block (the one
+  that trains the models) can update the weights in place, other processes map the same memory
+  read-only instead of keeping their own copies. Owners of shared arrays exchange them with
+  references when they're pickled (see `reference` and `resolve`).
+  """
+
+  # alignment of the arrays within a block in bytes
+  ALIGNMENT = 64
+
+  # blocks that the current process created or attached to by name, with their first address and
+  # whether the current process created them
+  _blocks = {}
+
+  @staticmethod
+  def initialize():
+    """
+    Prepares sharing weights with processes that are forked afterwards. The processes must share the
+    resource tracker, otherwise the tracker of a process that attached to a block removes the block
+    when the process exits.
+    """
+    resource_tracker.ensure_running()
+
+  @staticmethod
+  def share(arrays):
+    """
+    Copies arrays into a new block of shared memory.
+
+    :arrays: List of the arrays.
+
+    :returns: List of (writable) arrays of the same shapes and values in the block.
+    """
+    offsets = []
+    size = 0
+    for array in arrays:
+      offsets.append(size)
+      size += -(-array.nbytes // SharedWeights.ALIGNMENT) * SharedWeights.ALIGNMENT
+    block = SharedMemory(create=True, size=max(size, 1))
+    SharedWeights._register(block, True)
+
+    shared_arrays = []
+    for array, offset in zip(arrays, offsets):
+      shared_array = np.ndarray(array.shape, array.dtype, buffer=block.buf, offset=offset)
+      shared_array[...] = array
+      shared_arrays.append(shared_array)
+    return shared_arrays
+
+  @staticmethod
+  def update(shared_arrays, arrays):
+    """
+    Overwrites shared arrays in place, so all processes see the new values.
+
+    :shared_arrays: List of the arrays in shared memory.
+    :arrays: List of the new values with the same shapes.
+    """
+    for shared_array, array in zip(shared_arrays, arrays):
+      assert shared_array.shape == array.shape, "Can't change the shape of shared weights"
+      shared_array[...] = array
+
+  @staticmethod
+  def is_shared(array):
+    return SharedWeights._locate(array) is not None
+
+  @staticmethod
+  def reference(array):
+    """
+    Gets the reference to an array for pickling.
+
+    :array: The array.
+
+    :returns: A `SharedArrayReference` if the array is in shared memory, else the array itself.
+    """
+    location = SharedWeights._locate(array)
+    if location is None:
+      return array
+    block_name, offset = location
+    return SharedArrayReference(block_name, offset, array.shape, array.dtype.str)
+
+  @staticmethod
+  def resolve(value, writable=False):
+    """
+    Gets the array of a reference after unpickling, attaching to its block of shared memory if needed.
+
+    :value: A `SharedArrayReference` or any other value.
+    :writable: Optional: True if the array is written to, e.g. to return results without pickling them.
+
+    :returns: An array in shared memory (read-only unless specified otherwise) if the value is a
+      reference, else the value itself.
+    """
+    if not isinstance(value, SharedArrayReference):
+      return value
+    if value.block_name not in SharedWeights._blocks:
+      SharedWeights._register(SharedMemory(name=value.block_name), False)
+    block, _, _ = SharedWeights._blocks[value.block_name]
+    array = np.ndarray(value.shape, np.dtype(value.dtype), buffer=block.buf, offset=value.offset)
+    array.flags.writeable = writable
+    return array
+
+  @staticmethod
+  def share_regressor(regressor):
+    """
+    Moves the weights of a (fitted) sklearn MLPRegressor into shared memory unless they're there already.
+    The regressor trains its weights in place, so they stay shared.
+
+    :regressor: The regressor.
+
+    :returns: True if the weights were moved.
+    """
+    if SharedWeights.is_shared(regressor.coefs_[0]):
+      return False
+    arrays = SharedWeights.share(regressor.coefs_ + regressor.intercepts_)
+    regressor.coefs_ = arrays[:len(regressor.coefs_)]
+    regressor.intercepts_ = arrays[len(regressor.coefs_):]
+    return True
+
+  @staticmethod
+  def reference_regressor(regressor):
+    """
+    Creates a copy of an MLPRegressor for pickling that references its shared weights (see `share_regressor`).
+    The copy can only predict, the state of its optimizer is left out.
+
+    :regressor: The regressor.
+
+    :returns: The copy.
+    """
+    regressor = copy.copy(regressor)
+    regressor.coefs_ = [SharedWeights.reference(coef) for coef in regressor.coefs_]
+    regressor.intercepts_ = [SharedWeights.reference(intercept) for intercept in regressor.intercepts_]
+    if hasattr(regressor, "_optimizer"):
+      del regressor._optimizer # pylint: disable=protected-access
+    return regressor
+
+  @staticmethod
+  def resolve_regressor(regressor):
+    """
+    Restores the shared weights of an unpickled copy of an MLPRegressor (see `reference_regressor`).
+
+    :regressor: The regressor.
+    """
+    regressor.coefs_ = [SharedWeights.resolve(coef) for coef in regressor.coefs_]
+    regressor.intercepts_ = [SharedWeights.resolve(intercept) for intercept in regressor.intercepts_]
+
+  @staticmethod
+  def release_block(block_name):
+    """
+    Detaches from a block and removes it if the current process created it. The arrays of the block
+    mustn't be used anymore.
+
+    :block_name: Name of the block.
+    """
+    block, _, created = SharedWeights._blocks.pop(block_name)
+    block.close()
+    if created:
+      block.unlink()
+
+  @staticmethod
+  def release():
+    """
+    Detaches from all blocks of the current process and removes the blocks that it created.
+    """
+    for block, _, created in SharedWeights._blocks.values():
+      try:
+        block.close()
+      except BufferError:
+        # arrays of the block are still in use, the memory is freed when the process exits
+        pass
+      if created:
+        block.unlink()
+    SharedWeights._blocks.clear()
+
+  @staticmethod
+  def _register(block, created):
+    address = np.frombuffer(block.buf, dtype=np.uint8).ctypes.data
+    SharedWeights._blocks[block.name] = block, address, created
+
+  @staticmethod
+  def _locate(array):
+    """
+    Finds the block of shared memory that contains an array.
+
+    :array: The array.
+
+    :returns: A tuple with the name of the block and the offset of the array or None if the array
+      isn't (contiguously) in any block.
+    """
+    if not isinstance(array, np.ndarray) or not array.flags.c_contiguous:
+      return None
+    address = array.__array_interface__["data"][0]
+    for name, (block, block_address, _) in SharedWeights._blocks.items():
+      if block_address <= address and address + array.nbytes <= block_address + block.size:
+        return name, address - block_address
+    return None
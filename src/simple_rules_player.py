@@ -1,11 +1,10 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import numpy as np
-
 from baseline_players import RulesPlayer
 from card import Card
 from game_type import GameType
+from hand_random import HandRandom
 
 
 class SimpleRulesPlayer(RulesPlayer):
@@ -169,4 +168,4 @@ class SimpleRulesPlayer(RulesPlayer):
         self.hand)))
     best_choices = [game_type for game_type in game_type_counts.keys() if \
         game_type_counts[game_type] == max(game_type_counts.values())]
-    return best_choices[np.random.randint(len(best_choices))]
+    return best_choices[HandRandom.generator.integers(len(best_choices))]
@@ -12,7 +12,9 @@ from sklearn.neural_network import MLPRegressor
 import utils
 from config import Config
 from const import Const
+from dense_network import DenseNetwork
 from learner_player import LearnerPlayer
+from shared_weights import SharedWeights
 
 
 class SklearnPlayer(LearnerPlayer):
@@ -33,6 +35,9 @@ class SklearnPlayer(LearnerPlayer):
     """
     self.regressor = regressor
     self.last_training_done = time.time()
+    # forward pass of MLP regressors, re-created whenever the regressor was trained
+    self._network = None
+    self._network_training_samples = None
 
     if offline_training:
       # need to define the file name before training (to determine if it's a new model)
@@ -47,6 +52,22 @@ class SklearnPlayer(LearnerPlayer):
 
     super(SklearnPlayer, self).__init__(name, number, [self.regressor.game_type], log)
 
+  def __getstate__(self):
+    state = self.__dict__.copy()
+    if Config.SHARED_WEIGHTS and self._can_share_regressor():
+      if SharedWeights.share_regressor(self.regressor):
+        # the network still has the previous copies of the weights
+        self._network = self._network_training_samples = None
+        state.update(_network=None, _network_training_samples=None)
+      # the weights are mapped instead of copied by the process that unpickles the player
+      state["regressor"] = SharedWeights.reference_regressor(self.regressor)
+    return state
+
+  def __setstate__(self, state):
+    self.__dict__.update(state)
+    if self._can_share_regressor():
+      SharedWeights.resolve_regressor(self.regressor)
+
   @property
   def training_samples(self):
     return self.regressor.training_samples
@@ -61,7 +82,24 @@ class SklearnPlayer(LearnerPlayer):
     return self.regressor.loss_
 
   def _predict_scores(self, states):
-    return self.regressor.predict(states)
+    return self._get_predict_function()(states)
+
+  def _get_predict_function(self):
+    network = self._get_inference_network()
+    return network.predict if network else self.regressor.predict
+
+  def _can_share_regressor(self):
+    return isinstance(self.regressor, MLPRegressor) and hasattr(self.regressor, "coefs_")
+
+  def _get_network(self):
+    if not isinstance(self.regressor, MLPRegressor):
+      return None
+
+    # the regressor is shared with the team mate, so training by either player invalidates the network
+    if self._network_training_samples != self.regressor.training_samples:
+      self._network = DenseNetwork.from_mlp_regressor(self.regressor)
+      self._network_training_samples = self.regressor.training_samples
+    return self._network
 
   @staticmethod
   def _create_or_load_model(regressor_constructor, log, regressor_name=None):
@@ -79,6 +79,22 @@ def get_enum_by_name(enum, name):
       return en
   return None
 
+def resolve_steps(steps):
+  """
+  Runs a generator of steps to completion by making each requested prediction right away. The steps
+  are tuples of a predict function and the states to predict, the predicted scores are sent back.
+
+  :steps: The generator.
+
+  :returns: The return value of the generator.
+  """
+  try:
+    predict, states = next(steps)
+    while True:
+      predict, states = steps.send(predict(states))
+  except StopIteration as ex:
+    return ex.value
+
 def flatten(nested_list):
   return [item for sublist in nested_list for item in sublist]
 
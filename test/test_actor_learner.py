@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+import os
+from config import Config
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from sklearn.neural_network import MLPRegressor
+
+from actor_learner import ActorLearner
+from baseline_players import RandomCardPlayer
+from const import Const
+from encoding import Encoding
+from game_type import GameType
+from keras_player import KerasPlayer
+from sklearn_player import SklearnPlayer
+from test_keras_player import create_keras_model, create_keras_players
+
+
+class ActorLearnerTest(TestCase):
+  # pylint: disable=invalid-name
+
+  def setUp(self):
+    Config.ENCODING = Encoding("better", [1, 2, 13, 4], 50, [125, 200, 100], 250, 1, 4,
+        relative_player_encoding=True, relative_in_play_encoding=True)
+    Config.FORCE_GAME_TYPE = GameType.OBENABE
+
+  def tearDown(self):
+    Config.FORCE_GAME_TYPE = None
+    Config.EVALUATION_DIRECTORY = None
+    Config.LOSS_FILE = None
+    KerasPlayer._keras_regressor = KerasPlayer._keras_metadata = None # pylint: disable=protected-access
+
+  @staticmethod
+  def create_players():
+    np.random.seed(42)
+    regressor = MLPRegressor(hidden_layer_sizes=(20,), max_iter=5)
+    regressor.partial_fit(np.random.randint(0, 250, (200, 36)), np.random.randint(-100, 100, 200))
+    regressor.training_samples = 200
+    regressor.game_type = GameType.OBENABE
+    return [SklearnPlayer("p1", 1, regressor, False, MagicMock()), RandomCardPlayer("p2", 2, MagicMock())]
+
+  def test_learner_process_trains_players(self):
+    players = ActorLearnerTest.create_players()
+    expected_player = copy.deepcopy(players[0])
+    training_data = [np.random.randint(0, 250, (2 * Const.DECISIONS_PER_HAND, 37)) for _ in range(2)]
+    for data in training_data:
+      expected_player._train_model(data, MagicMock()) # pylint: disable=protected-access
+    states = np.random.randint(0, 250, (9, 36))
+
+    with TemporaryDirectory() as directory:
+      Config.EVALUATION_DIRECTORY = directory
+      Config.LOSS_FILE = "{}/loss.csv".format(directory)
+      learner = ActorLearner(players, players[:1], MagicMock())
+      for data in training_data:
+        learner.train(data)
+      learner.checkpoint(2, 2)
+      trained_players = learner.stop()
+
+      with open(Config.LOSS_FILE) as fh:
+        losses = fh.readlines()
+      checkpoint_files = [file_name for file_name in os.listdir(directory) if file_name.endswith(".pkl")]
+
+    # the players in this process aren't trained
+    self.assertEqual(200, players[0].training_samples)
+    self.assertEqual(4, learner.trained_hands)
+    self.assertEqual(len(players), len(trained_players))
+    self.assertEqual(expected_player.training_samples, trained_players[0].training_samples)
+    self.assertTrue(np.array_equal(expected_player.regressor.predict(states),
+      trained_players[0].regressor.predict(states)))
+    self.assertEqual(2, len(losses))
+    self.assertEqual(["p1_MLPRegressor_2.pkl"], checkpoint_files)
+
+  def test_received_keras_players_predict_with_trained_model(self):
+    players = create_keras_players()
+    training_data = np.random.randint(0, 250, (2 * Const.DECISIONS_PER_HAND, 37))
+    expected_model = create_keras_model()
+    expected_model.fit(training_data[:, :-1], training_data[:, -1], verbose=0)
+    states = np.random.randint(0, 250, (9, 36))
+
+    with TemporaryDirectory() as directory:
+      Config.LOSS_FILE = "{}/loss.csv".format(directory)
+      learner = ActorLearner(players, players[:1], MagicMock())
+      learner.train(training_data)
+      trained_players = learner.stop()
+
+    # both team mates use the network of the trained model
+    expected_scores = expected_model.predict_on_batch(states).ravel()
+    for player in trained_players[::2]:
+      self.assertEqual(len(training_data), player.training_samples)
+      self.assertTrue(np.allclose(expected_scores, player._predict_scores(states))) # pylint: disable=protected-access
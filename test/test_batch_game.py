@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from baseline_players import HighestCardPlayer, RandomCardPlayer
+from batch_game import BatchGame
+from const import Const
+from encoding import Encoding
+from game_type import GameType
+from parallel_game import ParallelGame
+from parameterized import parameterized
+
+
+class BatchGameTest(TestCase):
+  # pylint: disable=invalid-name,protected-access
+
+  HANDS = 40
+
+  ENCODINGS = {
+      "relative": Encoding("better", [1, 2, 13, 4], 50, [125, 200, 100], 250, 1, 4,
+        relative_player_encoding=True, relative_in_play_encoding=True, order_value=True),
+      "sorted": Encoding("better", [1, 2, 13, 4], 50, [125, 200, 100], 235, 1, 4,
+        relative_player_encoding=True, relative_in_play_encoding=True,
+        card_index_by_suit=True, sort_states=True, trump_code_offset=20),
+      "absolute": Encoding("simple", [1, 2, 3, 4], 10, 20, 30, 2, 1)
+      }
+
+  def setUp(self):
+    ParallelGame.inject_log(MagicMock())
+    Config.STORE_TRAINING_DATA = True
+    Config.STORE_SCORES = True
+    Config.BATCH_SIZE = BatchGameTest.HANDS
+    Config.CHECKPOINT_RESOLUTION = 10
+
+  def tearDown(self):
+    Config.STORE_TRAINING_DATA = False
+    Config.STORE_SCORES = False
+    Config.FORCE_GAME_TYPE = None
+
+  @staticmethod
+  def create_players(*player_classes):
+    return [player_classes[i % len(player_classes)]("p{}".format(i+1), Config.ENCODING.card_code_players[i],
+      MagicMock()) for i in range(Const.PLAYER_COUNT)]
+
+  def assert_same_results(self, expected, actual):
+    for expected_result, actual_result in zip(expected, actual):
+      self.assertTrue(np.array_equal(expected_result, actual_result))
+
+  @parameterized.expand([[game_type, encoding] for game_type in GameType
+    for encoding in ["relative", "sorted", "absolute"]])
+  def test_same_results_as_hands(self, game_type, encoding):
+    Config.ENCODING = BatchGameTest.ENCODINGS[encoding]
+    Config.FORCE_GAME_TYPE = game_type
+
+    expected = ParallelGame(BatchGameTest.create_players(HighestCardPlayer)).play_hands(100)
+    actual = BatchGame(BatchGameTest.create_players(HighestCardPlayer)).play_hands(100)
+
+    self.assert_same_results(expected, actual)
+
+  @parameterized.expand([
+    [[RandomCardPlayer]],
+    [[RandomCardPlayer, HighestCardPlayer]],
+    [[HighestCardPlayer, RandomCardPlayer]]
+    ])
+  def test_same_random_decisions_as_hands(self, player_classes):
+    # the hands draw the same random numbers, which includes the game type
+    Config.ENCODING = BatchGameTest.ENCODINGS["relative"]
+
+    expected = ParallelGame(BatchGameTest.create_players(*player_classes)).play_hands(100)
+    actual = BatchGame(BatchGameTest.create_players(*player_classes)).play_hands(100)
+
+    self.assert_same_results(expected, actual)
+
+  def test_random_players_play_valid_hands(self):
+    Config.ENCODING = BatchGameTest.ENCODINGS["relative"]
+    score_progress, training_data, game_type_decisions, selected_game_types, _ = \
+        BatchGame(BatchGameTest.create_players(RandomCardPlayer)).play_hands(0)
+
+    # all cards are played and worth 157 points per hand
+    self.assertTrue(np.all(score_progress[:, -1].sum(axis=1) == 157))
+    self.assertEqual(BatchGameTest.HANDS, selected_game_types.sum())
+    self.assertEqual(BatchGameTest.HANDS, len(game_type_decisions))
+    self.assertEqual(Const.DECISIONS_PER_HAND * BatchGameTest.HANDS, len(training_data))
+    # each state contains exactly one selected card
+    self.assertTrue(np.all((training_data[:, :-1] == Config.ENCODING.card_code_selected).sum(axis=1) == 1))
@@ -4,7 +4,11 @@
 from config import Config
 from unittest import TestCase
 
+import numpy as np
+
 from card import Card
+from card_tables import CardTables
+from const import Const
 from encoding import Encoding
 from game_type import GameType
 from parameterized import parameterized
@@ -201,3 +205,61 @@ class CardTest(TestCase):
     self.assertEqual(15, cards[13].card_index)
     self.assertEqual(23, cards[14].card_index)
     self.assertEqual(35, cards[15].card_index)
+
+  @parameterized.expand([[game_type] for game_type in GameType])
+  def test_scores_per_game_type(self, game_type):
+    # without the last stich, the cards of every game type are worth 152 points
+    self.assertEqual(152, CardTables.SCORES[game_type.value].sum())
+    cards = [Card(suit, value) for suit in range(len(Card.SUITS)) for value in range(len(Card.VALUES))]
+    for card in cards:
+      card.set_game_type(game_type)
+      self.assertEqual(CardTables.SCORES[game_type.value, card.card_id], card.score)
+
+  @parameterized.expand([[game_type] for game_type in GameType])
+  def test_beaten_by_table(self, game_type):
+    cards = [Card(suit, value) for suit in range(len(Card.SUITS)) for value in range(len(Card.VALUES))]
+    for card in cards:
+      card.set_game_type(game_type)
+
+    for card in cards:
+      for other_card in cards:
+        self.assertEqual(card.is_beaten_by(other_card),
+            CardTables.BEATEN_BY[game_type.value, card.card_id, other_card.card_id])
+
+  @parameterized.expand([
+    # 6 and 7 of spades are neighbors with the same score
+    [[0, 1], 0, GameType.OBENABE, [[0, 1]]],
+    # 7 and 8 of spades have different scores, unless spades are trumps
+    [[1, 2], 0, GameType.OBENABE, [[0], [1]]],
+    [[2, 1], 0, GameType.TRUMP_SPADES, [[1, 0]]],
+    # 6 and 9 of spades are only equivalent if the 7 and 8 are gone
+    [[3, 0], 0, GameType.OBENABE, [[1], [0]]],
+    [[3, 0], 1 << 1, GameType.OBENABE, [[1], [0]]],
+    [[3, 0], 1 << 1 | 1 << 2, GameType.OBENABE, [[1, 0]]],
+    # in unnenufe, the 6 is the strongest card
+    [[0, 1, 9], 0, GameType.UNNENUFE, [[1], [0], [2]]],
+    # cards of different suits are never equivalent
+    [[0, 9, 10], 0, GameType.OBENABE, [[0], [1, 2]]],
+    ])
+  def test_get_equivalent_cards(self, card_ids, gone_mask, game_type, expected_groups):
+    self.assertEqual(expected_groups, CardTables.get_equivalent_cards(card_ids, gone_mask, game_type.value))
+
+  def test_get_trick_winners(self):
+    np.random.seed(42)
+    cards = [Card(suit, value) for suit in range(len(Card.SUITS)) for value in range(len(Card.VALUES))]
+    game_types = np.random.randint(len(GameType), size=1000)
+    tricks = np.array([np.random.permutation(Const.CARDS_PER_HAND)[:Const.PLAYER_COUNT] for _ in game_types])
+
+    winners = CardTables.get_trick_winners(game_types, tricks)
+    scores = CardTables.get_trick_scores(game_types, tricks)
+
+    for game_type, trick, winner, score in zip(game_types, tricks, winners, scores):
+      played_cards = [cards[card_id] for card_id in trick]
+      for card in played_cards:
+        card.set_game_type(GameType(game_type))
+      best_index = 0
+      for i in range(1, Const.PLAYER_COUNT):
+        if played_cards[best_index].is_beaten_by(played_cards[i]):
+          best_index = i
+      self.assertEqual(best_index, winner)
+      self.assertEqual(sum(card.score for card in played_cards), score)
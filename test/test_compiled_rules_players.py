@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from better_rules_player import BetterRulesPlayer
+from card import Card
+from compiled_rules_players import CompiledBetterRulesPlayer, CompiledFixedBetterRulesPlayer, CompiledSimpleRulesPlayer
+from const import Const
+from encoding import Encoding
+from fixed_better_rules_player import FixedBetterRulesPlayer
+from game_type import GameType
+from parameterized import parameterized
+from simple_rules_player import SimpleRulesPlayer
+
+
+class CompiledRulesPlayerTest(TestCase):
+  # pylint: disable=invalid-name,protected-access
+
+  @classmethod
+  def setUpClass(cls):
+    Config.ENCODING = Encoding("better", [1, 2, 3, 4], 5, [10, 15, 20], 50, 0, 0,
+        relative_in_play_encoding=True, trump_code_offset=100)
+
+  @parameterized.expand([
+    [SimpleRulesPlayer, CompiledSimpleRulesPlayer],
+    [BetterRulesPlayer, CompiledBetterRulesPlayer],
+    [FixedBetterRulesPlayer, CompiledFixedBetterRulesPlayer]
+    ])
+  def test_same_decisions(self, player_class, compiled_player_class):
+    np.random.seed(42)
+    log = MagicMock()
+    player = player_class("player", 1, log)
+    compiled_player = compiled_player_class("compiled", 1, log)
+    cards = [Card(suit, value) for suit in range(len(Card.SUITS)) for value in range(len(Card.VALUES))]
+
+    for _ in range(2000):
+      game_type = GameType(np.random.randint(len(GameType)))
+      for card in cards:
+        card.set_game_type(game_type)
+      card_ids = np.random.permutation(Const.CARDS_PER_HAND)
+      hand_size = np.random.randint(1, Const.CARDS_PER_PLAYER + 1)
+      played_cards = [cards[card_id] for card_id in card_ids[hand_size:hand_size + np.random.randint(4)]]
+      player.hand = [cards[card_id] for card_id in card_ids[:hand_size]]
+      valid_cards = player.get_valid_cards_to_play(played_cards, game_type)
+
+      args = (valid_cards, played_cards, None, game_type)
+      self.assertEqual(player._select_card(args, log), compiled_player._select_card(args, log))
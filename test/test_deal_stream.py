@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from const import Const
+from deal_stream import DealStream
+
+
+class DealStreamTest(TestCase):
+  # pylint: disable=invalid-name,protected-access
+
+  def test_generated_deals_are_permutations(self):
+    deals = DealStream().get_deals(0, 100)
+
+    self.assertEqual((100, Const.CARDS_PER_HAND), deals.shape)
+    self.assertEqual(np.uint8, deals.dtype)
+    self.assertTrue(np.all(np.sort(deals, axis=1) == np.arange(Const.CARDS_PER_HAND)))
+
+  def test_generated_deals_only_depend_on_hand_index(self):
+    deals = DealStream.generate_deals(10, 20)
+
+    self.assertTrue(np.array_equal(deals, np.concatenate((DealStream.generate_deals(10, 5),
+      DealStream.generate_deals(15, 15)))))
+    self.assertFalse(np.array_equal(deals[:10], DealStream.generate_deals(0, 10)))
+
+  def test_deal_file(self):
+    deals = DealStream.generate_deals(0, 10)
+    with tempfile.TemporaryDirectory() as directory:
+      deal_file = os.path.join(directory, "deals.npy")
+      np.save(deal_file, deals)
+      deal_stream = DealStream(deal_file)
+
+      self.assertEqual(10, deal_stream.deal_count)
+      self.assertTrue(np.array_equal(deals[2:6], deal_stream.get_deals(2, 4)))
+      # more hands than deals wrap around
+      self.assertTrue(np.array_equal(np.concatenate((deals[8:], deals[:3])), deal_stream.get_deals(18, 5)))
+      # the deals aren't pickled with the stream
+      self.assertIsNone(deal_stream.__getstate__()["_deals"])
+      del deal_stream
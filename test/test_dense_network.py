@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+from sklearn.neural_network import MLPRegressor
+
+from dense_network import DenseNetwork
+from parameterized import parameterized
+
+
+class DenseNetworkTest(TestCase):
+  # pylint: disable=invalid-name
+
+  @parameterized.expand([["relu"], ["tanh"], ["logistic"], ["identity"]])
+  def test_same_predictions_as_mlp_regressor(self, activation):
+    np.random.seed(42)
+    regressor = MLPRegressor(hidden_layer_sizes=(20, 10), activation=activation, max_iter=5)
+    regressor.partial_fit(np.random.randint(0, 250, (200, 36)), np.random.randint(-100, 100, 200))
+    states = np.random.randint(0, 250, (9, 36))
+
+    network = DenseNetwork.from_mlp_regressor(regressor)
+
+    self.assertTrue(np.allclose(regressor.predict(states), network.predict(states)))
+
+  def test_predictions_independent_of_other_states(self):
+    np.random.seed(42)
+    network = DenseNetwork([np.random.randn(36, 20), np.random.randn(20, 1)], [np.random.randn(20), np.zeros(1)])
+    decisions = [np.random.randint(0, 250, (np.random.randint(1, 10), 36)) for _ in range(50)]
+
+    scores = network.predict(np.concatenate(decisions))
+
+    self.assertTrue(np.array_equal(np.concatenate([network.predict(states) for states in decisions]), scores))
+
+  def test_pickled_network(self):
+    np.random.seed(42)
+    network = DenseNetwork([np.random.randn(36, 20), np.random.randn(20, 1)], [np.random.randn(20), np.zeros(1)],
+        activation="tanh")
+    states = np.random.randint(0, 250, (9, 36))
+
+    unpickled_network = pickle.loads(pickle.dumps(network))
+
+    self.assertTrue(np.array_equal(network.predict(states), unpickled_network.predict(states)))
+
+  def test_predictions_from_updated_first_layer(self):
+    np.random.seed(42)
+    network = DenseNetwork([np.random.randn(36, 20), np.random.randn(20, 1)], [np.random.randn(20), np.zeros(1)])
+    previous_state = np.random.randint(0, 250, 36)
+    state = previous_state.copy()
+    state[[3, 17]] = [0, 200]
+    candidate_states = np.tile(state, (2, 1))
+    candidate_states[[0, 1], [5, 30]] += [7, -3]
+
+    changed = np.flatnonzero(state != previous_state)
+    first_layer = network.update_first_layer(network.get_first_layer(previous_state), changed,
+        state[changed] - previous_state[changed])
+    scores = network.predict_from_first_layer(network.get_candidate_first_layers(first_layer, [5, 30], [7, -3]))
+
+    self.assertTrue(np.allclose(network.predict(candidate_states), scores))
+
+  @parameterized.expand([["float32"], ["int8"]])
+  def test_reduced_precision(self, precision):
+    np.random.seed(42)
+    network = DenseNetwork([np.random.randn(36, 20), np.random.randn(20, 1)], [np.random.randn(20), np.zeros(1)])
+    states = np.random.randint(0, 250, (9, 36))
+
+    reduced_network = network.quantized() if precision == "int8" else network.with_precision(precision)
+
+    self.assertEqual(np.float32, reduced_network.dtype)
+    scores = network.predict(states)
+    # the errors are small compared to the range of the scores
+    self.assertLess(np.abs(scores - reduced_network.predict(states)).max(), 0.02 * np.abs(scores).max())
+
+  def test_quantize(self):
+    weight = np.array([[0.5, -1.27], [0.01, 0.0]])
+
+    quantized, scale = DenseNetwork.quantize(weight)
+
+    self.assertEqual(np.int8, quantized.dtype)
+    self.assertTrue(np.array_equal([[50, -127], [1, 0]], quantized))
+    self.assertAlmostEqual(0.01, scale)
+
+  def test_custom_dtype(self):
+    network = DenseNetwork([np.ones((2, 3)), np.ones((3, 1))], [np.zeros(3), np.array([-1.0])], dtype=np.float32)
+
+    self.assertEqual(np.float32, network.dtype)
+    self.assertTrue(np.array_equal([2, 5], network.predict(np.array([[1, 0], [-1, 3]]))))
+
+  def test_keras_dense_stack(self):
+    # stand-ins for the layers of a Keras model (only the used attributes)
+    class Dense:
+      def __init__(self, weights, activation):
+        self.weights = weights
+        self.activation = activation
+
+      def get_weights(self):
+        return self.weights
+
+    class Dropout:
+      pass
+
+    def relu():
+      pass
+
+    def linear():
+      pass
+
+    model = MagicMock(layers=[
+      Dense([np.array([[1.0, -1.0], [2.0, 1.0]]), np.array([0.0, 1.0])], relu),
+      Dropout(),
+      Dense([np.array([[1.0], [3.0]])], linear)
+      ])
+
+    network = DenseNetwork.from_keras_model(model)
+
+    self.assertEqual("relu", network.activation)
+    self.assertEqual("identity", network.output_activation)
+    self.assertTrue(np.array_equal([6, 3], network.predict(np.array([[1, 1], [0, 0]]))))
+
+  def test_unsupported_keras_layer(self):
+    class Conv1D:
+      pass
+
+    with self.assertRaises(ValueError):
+      DenseNetwork.from_keras_model(MagicMock(layers=[Conv1D()]))
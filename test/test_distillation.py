@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import pickle
+from config import Config
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from sklearn.neural_network import MLPRegressor
+
+from baseline_players import RandomCardPlayer
+from const import Const
+from distillation import Distillation
+from encoding import Encoding
+from game_type import GameType
+from parallel_game import ParallelGame
+from sklearn_player import SklearnPlayer
+
+
+class DistillationTest(TestCase):
+  # pylint: disable=invalid-name
+
+  def setUp(self):
+    Config.ENCODING = Encoding("better", [1, 2, 13, 4], 50, [125, 200, 100], 250, 1, 4,
+        relative_player_encoding=True, relative_in_play_encoding=True)
+    Config.STORE_TRAINING_DATA = True
+    Config.FORCE_GAME_TYPE = GameType.OBENABE
+    Config.DISTILLATION_LAYERS = (5,)
+    Config.PARALLEL_PROCESSES = 1
+    Config.TOTAL_HANDS = 40
+    Config.BATCH_SIZE = 20
+    Config.LOGGING_INTERVAL = 20
+
+  def tearDown(self):
+    Config.STORE_TRAINING_DATA = False
+    Config.FORCE_GAME_TYPE = None
+    Config.DISTILLATION_LAYERS = None
+    Config.EVALUATION_DIRECTORY = None
+
+  @staticmethod
+  def create_players():
+    np.random.seed(42)
+    regressor = MLPRegressor(hidden_layer_sizes=(20,), max_iter=5)
+    regressor.partial_fit(np.random.randint(0, 250, (200, 36)), np.random.randint(-100, 100, 200))
+    regressor.training_samples = 200
+    regressor.game_type = Config.FORCE_GAME_TYPE
+    return [SklearnPlayer("p{}".format(i+1), Config.ENCODING.card_code_players[i], regressor, False, MagicMock())
+        if i % 2 == 0 else RandomCardPlayer("p{}".format(i+1), Config.ENCODING.card_code_players[i], MagicMock())
+        for i in range(Const.PLAYER_COUNT)]
+
+  def test_distills_teacher_from_played_hands(self):
+    log = MagicMock()
+    ParallelGame.inject_log(log)
+    distillation = Distillation(None, DistillationTest.create_players(), log)
+
+    with TemporaryDirectory() as directory:
+      Config.EVALUATION_DIRECTORY = directory
+      distillation.run()
+
+      with open("{}/student_5.pkl".format(directory), "rb") as fh:
+        student = pickle.load(fh)
+      with open("{}/distillation.json".format(directory)) as fh:
+        report = json.load(fh)
+      self.assertEqual(2, len(os.listdir(directory)))
+
+    # the student is trained on every decision of the played hands
+    self.assertEqual(Const.DECISIONS_PER_HAND * Config.TOTAL_HANDS, student.training_samples)
+    self.assertEqual((5,), student.hidden_layer_sizes)
+    self.assertEqual(student.training_samples, report["student_training_samples"])
+    self.assertGreater(report["decisions"], 0)
+    self.assertTrue(0 <= report["agreement"] <= 1)
+    self.assertGreater(report["speedup"], 0)
+
+  def test_student_agrees_with_itself(self):
+    # a teacher that predicts the same scores as the student always agrees
+    players = DistillationTest.create_players()
+    distillation = Distillation(None, players, MagicMock())
+    distillation.student = players[0].regressor
+    distillation.student_players[0].regressor = players[0].regressor
+
+    agreeing_decisions, decisions = distillation._compare_decisions(0) # pylint: disable=protected-access
+
+    self.assertGreater(decisions, 0)
+    self.assertEqual(decisions, agreeing_decisions)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+from unittest import TestCase
+
+from game import Game
+from parameterized import parameterized
+
+
+class GameTest(TestCase):
+  # pylint: disable=invalid-name
+
+  def setUp(self):
+    Config.PARALLEL_PROCESSES = 2
+    Config.ONLINE_TRAINING = True
+    Config.TRAINING_INTERVAL = 400
+
+  def tearDown(self):
+    Config.PARALLEL_PROCESSES = None
+    Config.ONLINE_TRAINING = False
+    Config.TRAINING_INTERVAL = None
+    Config.TOTAL_HANDS = None
+    Config.BATCH_SIZE = None
+    Config.LOGGING_INTERVAL = None
+    Config.CHECKPOINT_INTERVAL = None
+
+  def test_chunks_end_with_intervals(self):
+    Config.TOTAL_HANDS = 1000
+    Config.BATCH_SIZE = 300
+    Config.LOGGING_INTERVAL = 250
+    Config.CHECKPOINT_INTERVAL = 500
+
+    first_hands = [0]
+    while first_hands[-1] < Config.TOTAL_HANDS:
+      first_hands.append(first_hands[-1] + Game._get_chunk_size(first_hands[-1])) # pylint: disable=protected-access
+
+    self.assertEqual([0, 250, 400, 500, 750, 800, 1000], first_hands)
+
+  @parameterized.expand([
+    # the chunks of the current training interval can always be started
+    [200, 0, 1, 0, True],
+    # the next interval must wait for the training of the current one...
+    [400, 200, 1, 0, False],
+    [400, 400, 0, 0, True],
+    # ...unless the players may be stale
+    [400, 200, 1, 1, True],
+    [800, 200, 3, 1, False],
+    [800, 400, 2, 1, True],
+    ])
+  def test_chunks_are_started_within_staleness(self, first_hand, handled_hands, started_chunks, lookahead_intervals,
+      expected):
+    self.assertEqual(expected,
+        Game._can_start_chunk(first_hand, handled_hands, started_chunks, lookahead_intervals)) # pylint: disable=protected-access
+
+  def test_sequential_chunks_are_not_started_ahead(self):
+    Config.PARALLEL_PROCESSES = 1
+
+    self.assertTrue(Game._can_start_chunk(0, 0, 0, 0)) # pylint: disable=protected-access
+    self.assertFalse(Game._can_start_chunk(200, 0, 1, 0)) # pylint: disable=protected-access
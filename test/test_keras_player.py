@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+from multiprocessing import Pool
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from baseline_players import RandomCardPlayer
+from const import Const
+from dense_network import DenseNetwork
+from encoding import Encoding
+from game_type import GameType
+from keras_player import KerasPlayer
+from parallel_game import ParallelGame
+from prediction_cache import PredictionCache
+
+
+def relu():
+  pass
+
+
+def linear():
+  pass
+
+
+class Dense:
+  """
+  Stand-in for a dense layer of a Keras model (only the used attributes).
+  """
+
+  def __init__(self, weights, activation):
+    self.weights = weights
+    self.activation = activation
+
+  def get_weights(self):
+    return self.weights
+
+
+class KerasModel:
+  """
+  Stand-in for a Keras model of dense layers, whose training doubles the weights of the output layer.
+  """
+
+  def __init__(self, layers):
+    self.layers = layers
+
+  def fit(self, states, scores, verbose): # pylint: disable=unused-argument
+    output_layer = self.layers[-1]
+    output_layer.weights = [2 * weights for weights in output_layer.weights]
+    return SimpleNamespace(history={"loss": [1.0]})
+
+  def predict_on_batch(self, states):
+    return DenseNetwork.from_keras_model(self).predict(states)[:, np.newaxis]
+
+
+def create_keras_model():
+  """
+  Creates a stand-in for a small Keras model (see `KerasModel`).
+
+  :returns: The model.
+  """
+  random = np.random.RandomState(42)
+  return KerasModel([Dense([random.uniform(-0.1, 0.1, (36, 10)), random.uniform(-1, 1, 10)], relu),
+    Dense([random.uniform(-1, 1, (10, 1)), np.zeros(1)], linear)])
+
+
+def create_keras_players(model=None):
+  """
+  Creates players of the config's encoding where the first team consists of Keras players that share a model.
+
+  :model: Optional: The model of the learners, defaults to a new one (see `create_keras_model`).
+
+  :returns: List with the players.
+  """
+  KerasPlayer._keras_regressor = None # pylint: disable=protected-access
+  with patch.object(KerasPlayer, "_create_or_load_model",
+      return_value=(model or create_keras_model(), 0, Config.FORCE_GAME_TYPE, None)):
+    return [KerasPlayer("p{}".format(i+1), Config.ENCODING.card_code_players[i], MagicMock())
+        if i % 2 == 0 else RandomCardPlayer("p{}".format(i+1), Config.ENCODING.card_code_players[i], MagicMock())
+        for i in range(Const.PLAYER_COUNT)]
+
+
+class KerasPlayerTest(TestCase):
+  # pylint: disable=invalid-name,protected-access
+
+  def setUp(self):
+    ParallelGame.inject_log(MagicMock())
+    Config.ENCODING = Encoding("better", [1, 2, 13, 4], 50, [125, 200, 100], 250, 1, 4,
+        relative_player_encoding=True, relative_in_play_encoding=True)
+    Config.FORCE_GAME_TYPE = GameType.TRUMP_HEARTS
+    Config.BATCH_SIZE = 24
+
+  def tearDown(self):
+    Config.FORCE_GAME_TYPE = None
+    Config.PREDICTION_CACHE_SIZE = 0
+    PredictionCache._caches.clear()
+    KerasPlayer._keras_regressor = KerasPlayer._keras_metadata = None
+
+  def test_team_mates_share_training_samples(self):
+    players = create_keras_players()
+
+    players[0]._train_model(np.random.randint(0, 250, (2 * Const.DECISIONS_PER_HAND, 37)), MagicMock())
+
+    self.assertEqual(2 * Const.DECISIONS_PER_HAND, players[0].training_samples)
+    self.assertEqual(players[0].training_samples, players[2].training_samples)
+
+  def test_prediction_cache_keeps_results_of_team_mates(self):
+    expected = ParallelGame(create_keras_players()).play_hands(0)
+
+    Config.PREDICTION_CACHE_SIZE = 100
+    actual = ParallelGame(create_keras_players()).play_hands(0)
+
+    for expected_result, actual_result in zip(expected[:4], actual[:4]):
+      self.assertTrue(np.array_equal(expected_result, actual_result))
+    self.assertGreater(actual[4].sum(), 0)
+
+  def test_players_in_other_processes_predict_with_trained_model(self):
+    players = create_keras_players()
+    states = np.random.randint(0, 250, (9, 36))
+
+    # the process is started before the training, like the workers of a game
+    with Pool(processes=1) as pool:
+      players[0]._train_model(np.random.randint(0, 250, (2 * Const.DECISIONS_PER_HAND, 37)), MagicMock())
+      actual = pool.starmap(KerasPlayer._predict_scores, [(players[0], states), (players[2], states)])
+
+    expected = players[0].regressor.predict_on_batch(states).ravel()
+    for actual_scores in actual:
+      self.assertTrue(np.allclose(expected, actual_scores))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+from multiprocessing import Pool
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from sklearn.neural_network import MLPRegressor
+
+from baseline_players import RandomCardPlayer
+from const import Const
+from encoding import Encoding
+from game_type import GameType
+from parallel_game import ParallelGame
+from parameterized import parameterized
+from prediction_cache import PredictionCache
+from shared_weights import SharedWeights
+from simple_rules_player import SimpleRulesPlayer
+from sklearn_player import SklearnPlayer
+
+
+class ParallelGameTest(TestCase):
+  # pylint: disable=invalid-name
+
+  def setUp(self):
+    ParallelGame.inject_log(MagicMock())
+    Config.ENCODING = Encoding("better", [1, 2, 13, 4], 50, [125, 200, 100], 250, 1, 4,
+        relative_player_encoding=True, relative_in_play_encoding=True)
+    Config.STORE_TRAINING_DATA = True
+    Config.RANDOM_KEY = 42
+
+  def tearDown(self):
+    Config.STORE_TRAINING_DATA = False
+    Config.RANDOM_KEY = 0
+    Config.FORCE_GAME_TYPE = None
+    Config.CONCURRENT_HANDS = 1
+    Config.FIRST_LAYER_ACCUMULATOR = False
+    Config.PREDICTION_CACHE_SIZE = 0
+    Config.INFERENCE_PRECISION = None
+    Config.QUANTIZATION_ANALYSIS = False
+    PredictionCache._caches.clear() # pylint: disable=protected-access
+    SharedWeights.release()
+
+  @staticmethod
+  def create_game():
+    player_classes = [RandomCardPlayer, SimpleRulesPlayer]
+    return ParallelGame([player_classes[i % 2]("p{}".format(i+1), Config.ENCODING.card_code_players[i], MagicMock())
+      for i in range(Const.PLAYER_COUNT)])
+
+  @staticmethod
+  def create_learner_game():
+    np.random.seed(42)
+    regressor = MLPRegressor(hidden_layer_sizes=(20,), max_iter=5)
+    regressor.partial_fit(np.random.randint(0, 250, (200, 36)), np.random.randint(-100, 100, 200))
+    regressor.training_samples = 200
+    regressor.game_type = Config.FORCE_GAME_TYPE
+    return ParallelGame([SklearnPlayer("p{}".format(i+1), Config.ENCODING.card_code_players[i], regressor,
+      False, MagicMock()) if i % 2 == 0 else RandomCardPlayer("p{}".format(i+1),
+        Config.ENCODING.card_code_players[i], MagicMock()) for i in range(Const.PLAYER_COUNT)])
+
+  def test_results_are_independent_of_batches(self):
+    Config.BATCH_SIZE = 24
+    expected = ParallelGameTest.create_game().play_hands(0)
+
+    # each batch is played by a fresh copy of the game like in a separate process
+    Config.BATCH_SIZE = 8
+    batches = [ParallelGameTest.create_game().play_hands(i * Config.BATCH_SIZE) for i in range(3)]
+
+    for i, expected_result in enumerate(expected[:3]):
+      self.assertTrue(np.array_equal(expected_result, np.concatenate([batch[i] for batch in batches])))
+    self.assertTrue(np.array_equal(expected[3], sum(batch[3] for batch in batches)))
+
+  def test_results_depend_on_random_key(self):
+    Config.BATCH_SIZE = 8
+    expected = ParallelGameTest.create_game().play_hands(0)
+    Config.RANDOM_KEY = 123
+    actual = ParallelGameTest.create_game().play_hands(0)
+
+    self.assertFalse(np.array_equal(expected[1], actual[1]))
+
+  def test_workers_keep_published_players(self):
+    Config.BATCH_SIZE = 8
+    Config.FORCE_GAME_TYPE = GameType.TRUMP_HEARTS
+    game = ParallelGameTest.create_learner_game()
+    expected = [game.play_hands(i * Config.BATCH_SIZE) for i in range(3)]
+
+    SharedWeights.initialize()
+    with Pool(processes=1, initializer=ParallelGame.inject_log, initargs=(MagicMock(),)) as pool:
+      published_game = ParallelGame.publish(game)
+      # the worker keeps the players after loading them, so the published game can be released
+      actual = [pool.apply(ParallelGame.play_published_hands, (0, published_game))]
+      ParallelGame.withdraw(published_game)
+      actual += [pool.apply(ParallelGame.play_published_hands, (i * Config.BATCH_SIZE, published_game))
+          for i in range(1, 3)]
+
+    for expected_results, actual_results in zip(expected, actual):
+      for expected_result, actual_result in zip(expected_results, actual_results):
+        self.assertTrue(np.array_equal(expected_result, actual_result))
+
+  def test_workers_write_training_data_to_shared_array(self):
+    Config.BATCH_SIZE = 8
+    game = ParallelGameTest.create_game()
+    expected = [game.play_hands(i * Config.BATCH_SIZE) for i in range(2)]
+    rows = Const.DECISIONS_PER_HAND * Config.BATCH_SIZE
+    training_data, = SharedWeights.share([np.zeros((2 * rows, Const.CARDS_PER_HAND + 1), dtype=int)])
+    training_data_reference = SharedWeights.reference(training_data)
+
+    SharedWeights.initialize()
+    with Pool(processes=1, initializer=ParallelGame.inject_log, initargs=(MagicMock(),)) as pool:
+      published_game = ParallelGame.publish(game)
+      # write the batches in reverse order to the array
+      actual = [pool.apply(ParallelGame.play_published_hands, (i * Config.BATCH_SIZE, published_game,
+        (training_data_reference, (1 - i) * rows))) for i in range(2)]
+      ParallelGame.withdraw(published_game)
+
+    for i in range(2):
+      self.assertIsNone(actual[i][1])
+      self.assertTrue(np.array_equal(expected[i][0], actual[i][0]))
+      self.assertTrue(np.array_equal(expected[i][1], training_data[(1 - i) * rows:(2 - i) * rows]))
+
+  @parameterized.expand([[False], [True]])
+  def test_concurrent_hands_play_like_sequential_hands(self, first_layer_accumulator):
+    Config.BATCH_SIZE = 24
+    Config.FORCE_GAME_TYPE = GameType.TRUMP_HEARTS
+    Config.FIRST_LAYER_ACCUMULATOR = first_layer_accumulator
+    expected = ParallelGameTest.create_learner_game().play_hands(0)
+
+    Config.CONCURRENT_HANDS = 5
+    actual = ParallelGameTest.create_learner_game().play_hands(0)
+
+    for expected_result, actual_result in zip(expected, actual):
+      self.assertTrue(np.array_equal(expected_result, actual_result))
+
+  def test_prediction_cache_keeps_results(self):
+    Config.BATCH_SIZE = 24
+    Config.FORCE_GAME_TYPE = GameType.TRUMP_HEARTS
+    expected = ParallelGameTest.create_learner_game().play_hands(0)
+
+    Config.PREDICTION_CACHE_SIZE = 100
+    actual = ParallelGameTest.create_learner_game().play_hands(0)
+
+    for expected_result, actual_result in zip(expected[:4], actual[:4]):
+      self.assertTrue(np.array_equal(expected_result, actual_result))
+    self.assertGreater(actual[4].sum(), 0)
+
+  def test_quantized_weights_are_compared_with_full_precision(self):
+    Config.BATCH_SIZE = 24
+    Config.FORCE_GAME_TYPE = GameType.TRUMP_HEARTS
+    expected = ParallelGameTest.create_learner_game().play_hands(0)
+
+    Config.QUANTIZATION_ANALYSIS = True
+    actual = ParallelGameTest.create_learner_game().play_hands(0)
+
+    # the hands are still played with full precision
+    for expected_result, actual_result in zip(expected[:4], actual[:4]):
+      self.assertTrue(np.array_equal(expected_result, actual_result))
+    agreeing_decisions, compared_decisions = actual[4][2:]
+    self.assertGreater(compared_decisions, 0)
+    self.assertLessEqual(agreeing_decisions, compared_decisions)
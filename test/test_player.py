@@ -131,6 +131,33 @@ class PlayerTest(TestCase):
           PlayerTest.get_correct_decision_state(all_cards, range(Const.SUIT_COUNT), cards_by_suit), cards_by_suit)
       self.verify_card_permutations(all_cards, first_order, cards_by_suit)
 
+  @parameterized.expand([
+    [True],
+    [False]
+    ])
+  def test_sort_decision_states(self, cards_by_suit):
+    np.random.seed(42)
+    states = np.random.randint(4, size=(100, Const.CARDS_PER_HAND))
+    sorted_states = Player._sort_decision_states(states, cards_by_suit)
+
+    for state, sorted_state in zip(states, sorted_states):
+      # the suits are sorted like byte arrays
+      suits = [state[Const.CARDS_PER_SUIT*i:Const.CARDS_PER_SUIT*(i+1)] if cards_by_suit else \
+          state[i::Const.SUIT_COUNT] for i in range(Const.SUIT_COUNT)]
+      expected_suits = sorted(suits, key=lambda suit: bytearray(suit.astype(np.uint8)))
+      expected = flatten(expected_suits if cards_by_suit else zip(*expected_suits))
+      self.assertTrue(np.array_equal(expected, sorted_state))
+
+  def test_hand_mask(self):
+    testee = RandomCardPlayer("testee", 0, MagicMock())
+    testee.hand = [Card(Card.CLUBS, 3), Card(Card.SPADES, 5), Card(Card.HEARTS, 7)]
+    self.assertEqual(testee.hand, [Card(Card.SPADES, 5), Card(Card.HEARTS, 7), Card(Card.CLUBS, 3)])
+    self.assertEqual(testee.hand_mask, 1 << 5 | 1 << 16 | 1 << 30)
+
+    testee.remove_card(Card(Card.HEARTS, 7))
+    self.assertEqual(testee.hand, [Card(Card.SPADES, 5), Card(Card.CLUBS, 3)])
+    self.assertEqual(testee.hand_mask, 1 << 5 | 1 << 30)
+
   @parameterized.expand([
     [GameType.OBENABE],
     [GameType.UNNENUFE]
@@ -295,3 +322,17 @@ class PlayerTest(TestCase):
     self.assertEqual(testee.convert_to_relative(102), 103)
     self.assertEqual(testee.convert_to_relative(103), 104)
     self.assertEqual(testee.convert_to_relative(104), 101)
+
+  def test_known_card_codes(self):
+    encoding = Config.ENCODING
+    Config.ENCODING = Encoding("better", [1, 2, 3, 4], 5, [10, 15, 20], 50, 0, 0,
+        relative_player_encoding=True, relative_in_play_encoding=True, trump_code_offset=100)
+
+    # the precompiled codes of known cards correspond to the converted absolute codes
+    for viewer, player_number in enumerate(Config.ENCODING.card_code_players):
+      testee = RandomCardPlayer("testee", player_number, MagicMock())
+      for player, code in enumerate(Config.ENCODING.card_code_players):
+        self.assertEqual(Config.ENCODING.known_card_codes[viewer, player, 0], testee.convert_to_relative(code))
+        self.assertEqual(Config.ENCODING.known_card_codes[viewer, player, 1], testee.convert_to_relative(code + 100))
+
+    Config.ENCODING = encoding
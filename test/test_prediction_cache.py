@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from unittest import TestCase
+
+import numpy as np
+
+from prediction_cache import PredictionCache
+
+
+class PredictionCacheTest(TestCase):
+  # pylint: disable=invalid-name
+
+  STATES = np.arange(12).reshape(4, 3)
+
+  def tearDown(self):
+    PredictionCache._caches.clear() # pylint: disable=protected-access
+
+  def test_lookup_returns_stored_scores(self):
+    cache = PredictionCache(10)
+    cache.lookup(PredictionCacheTest.STATES[:2], 1)
+    cache.store(PredictionCacheTest.STATES[:2], [1.5, 2.5])
+
+    scores, missing = cache.lookup(PredictionCacheTest.STATES[[1, 2, 0]], 1)
+
+    self.assertEqual([1], missing)
+    self.assertTrue(np.array_equal([2.5, 1.5], scores[[0, 2]]))
+    self.assertEqual((2, 3), (cache.hits, cache.misses))
+
+  def test_evicts_least_recently_used_states(self):
+    cache = PredictionCache(2)
+    cache.store(PredictionCacheTest.STATES[:2], [1, 2])
+    cache.lookup(PredictionCacheTest.STATES[:1], None)
+    cache.store(PredictionCacheTest.STATES[2:3], [3])
+
+    _, missing = cache.lookup(PredictionCacheTest.STATES[:3], None)
+
+    self.assertEqual(2, len(cache))
+    self.assertEqual([1], missing)
+
+  def test_new_version_clears_cache(self):
+    cache = PredictionCache(10)
+    cache.lookup(PredictionCacheTest.STATES, 1)
+    cache.store(PredictionCacheTest.STATES, [1, 2, 3, 4])
+
+    _, missing = cache.lookup(PredictionCacheTest.STATES, 2)
+
+    self.assertEqual([0, 1, 2, 3], missing)
+
+  def test_collect_statistics_of_all_caches(self):
+    PredictionCache.get("p1", 10).lookup(PredictionCacheTest.STATES, 1)
+    PredictionCache.get("p3", 10).lookup(PredictionCacheTest.STATES[:1], 1)
+
+    self.assertIs(PredictionCache.get("p1", 10), PredictionCache.get("p1", 5))
+    self.assertTrue(np.array_equal([0, 5], PredictionCache.collect_statistics()))
+    self.assertTrue(np.array_equal([0, 0], PredictionCache.collect_statistics()))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from config import Config
+from multiprocessing import Process
+from multiprocessing.connection import Client
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from baseline_players import RandomCardPlayer
+from const import Const
+from encoding import Encoding
+from parallel_game import ParallelGame
+from remote import RemoteCoordinator, RemoteWorker
+from simple_rules_player import SimpleRulesPlayer
+
+
+def leave_when_playing(address, authkey, log): # pylint: disable=unused-argument
+  """
+  Connects to a coordinator like a worker, but leaves when it should play hands.
+  """
+  connection = Client(address, authkey=authkey)
+  while connection.recv()[0] != "play":
+    pass
+  connection.close()
+
+
+class RemoteTest(TestCase):
+  # pylint: disable=invalid-name
+
+  def setUp(self):
+    ParallelGame.inject_log(MagicMock())
+    Config.ENCODING = Encoding("better", [1, 2, 13, 4], 50, [125, 200, 100], 250, 1, 4,
+        relative_player_encoding=True, relative_in_play_encoding=True)
+    Config.STORE_TRAINING_DATA = True
+    Config.RANDOM_KEY = 42
+
+  def tearDown(self):
+    Config.STORE_TRAINING_DATA = False
+    Config.RANDOM_KEY = 0
+
+  @staticmethod
+  def create_game(*player_classes):
+    return ParallelGame([player_classes[i % 2]("p{}".format(i+1), Config.ENCODING.card_code_players[i], MagicMock())
+      for i in range(Const.PLAYER_COUNT)])
+
+  @staticmethod
+  def start_workers(coordinator, targets):
+    workers = [Process(target=target, args=(coordinator.address, b"test", MagicMock())) for target in targets]
+    for worker in workers:
+      worker.start()
+    coordinator.accept_workers()
+    return workers
+
+  def assert_same_results(self, expected, actual):
+    for expected_results, actual_results in zip(expected, actual):
+      self.assertEqual(len(expected_results), len(actual_results))
+      for expected_result, actual_result in zip(expected_results, actual_results):
+        self.assertTrue(np.array_equal(expected_result, actual_result))
+
+  def test_local_workers_play_assigned_hands(self):
+    games = [RemoteTest.create_game(RandomCardPlayer, SimpleRulesPlayer),
+        RemoteTest.create_game(SimpleRulesPlayer, RandomCardPlayer)]
+    chunks = [(0, 8), (8, 3), (11, 5), (16, 8)]
+    expected = [games[i // 2].play_hands(first_hand, hand_count=hand_count)
+        for i, (first_hand, hand_count) in enumerate(chunks)]
+
+    coordinator = RemoteCoordinator(("localhost", 0), 2, b"test", MagicMock())
+    workers = RemoteTest.start_workers(coordinator, [RemoteWorker.run] * 2)
+    # the players change after the first two chunks
+    published_games = [RemoteCoordinator.publish(game) for game in games]
+    results = [coordinator.play_hands(published_games[i // 2], first_hand, hand_count)
+        for i, (first_hand, hand_count) in enumerate(chunks)]
+    actual = [result.get() for result in results]
+    coordinator.close()
+    for worker in workers:
+      worker.join()
+
+    self.assert_same_results(expected, actual)
+    self.assertEqual([0, 0], [worker.exitcode for worker in workers])
+
+  def test_chunks_of_lost_worker_are_played_by_others(self):
+    game = RemoteTest.create_game(RandomCardPlayer, SimpleRulesPlayer)
+    chunks = [(i * 8, 8) for i in range(4)]
+    expected = [game.play_hands(first_hand, hand_count=hand_count) for first_hand, hand_count in chunks]
+    log = MagicMock()
+
+    coordinator = RemoteCoordinator(("localhost", 0), 2, b"test", log)
+    workers = RemoteTest.start_workers(coordinator, [leave_when_playing, RemoteWorker.run])
+    published_game = RemoteCoordinator.publish(game)
+    results = [coordinator.play_hands(published_game, first_hand, hand_count) for first_hand, hand_count in chunks]
+    actual = [result.get() for result in results]
+    coordinator.close()
+    for worker in workers:
+      worker.join()
+
+    self.assert_same_results(expected, actual)
+    self.assertTrue(any("Lost remote worker" in call[0][0] for call in log.error.call_args_list))
+
+  def test_chunks_fail_when_all_workers_are_lost(self):
+    game = RemoteTest.create_game(RandomCardPlayer, SimpleRulesPlayer)
+
+    coordinator = RemoteCoordinator(("localhost", 0), 1, b"test", MagicMock())
+    workers = RemoteTest.start_workers(coordinator, [leave_when_playing])
+    published_game = RemoteCoordinator.publish(game)
+    results = [coordinator.play_hands(published_game, 0, 8) for _ in range(3)]
+    for result in results:
+      with self.assertRaises(RuntimeError):
+        result.get()
+    # chunks that are started afterwards fail immediately
+    with self.assertRaises(RuntimeError):
+      coordinator.play_hands(published_game, 8, 8).get()
+    coordinator.close()
+    workers[0].join()
+
+  def test_workers_report_game_that_cant_be_loaded(self):
+    game = RemoteTest.create_game(RandomCardPlayer, SimpleRulesPlayer)
+
+    coordinator = RemoteCoordinator(("localhost", 0), 2, b"test", MagicMock())
+    workers = RemoteTest.start_workers(coordinator, [RemoteWorker.run] * 2)
+    invalid_results = [coordinator.play_hands(b"invalid", 0, 8) for _ in range(2)]
+    for result in invalid_results:
+      with self.assertRaises(RuntimeError):
+        result.get()
+    # the workers are still available for the next game
+    actual = coordinator.play_hands(RemoteCoordinator.publish(game), 0, 8).get()
+    coordinator.close()
+    for worker in workers:
+      worker.join()
+
+    self.assert_same_results([game.play_hands(0, hand_count=8)], [actual])
+    self.assertEqual([0, 0], [worker.exitcode for worker in workers])
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pickle
+from config import Config
+from multiprocessing import Pool
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from sklearn.neural_network import MLPRegressor
+
+from dense_network import DenseNetwork
+from game_type import GameType
+from shared_weights import SharedWeights
+from sklearn_player import SklearnPlayer
+
+
+def sum_network_weights(pickled_network):
+  network = pickle.loads(pickled_network)
+  return sum(weight.sum() for weight in network.weights)
+
+
+class SharedWeightsTest(TestCase):
+  # pylint: disable=invalid-name
+
+  def tearDown(self):
+    Config.SHARED_WEIGHTS = False
+    SharedWeights.release()
+
+  def test_pickles_references(self):
+    arrays = [np.random.randn(300, 300), np.arange(7, dtype=np.int8)]
+
+    shared_arrays = SharedWeights.share(arrays)
+    pickled_references = pickle.dumps([SharedWeights.reference(array) for array in shared_arrays])
+    resolved_arrays = [SharedWeights.resolve(reference) for reference in pickle.loads(pickled_references)]
+
+    self.assertLess(len(pickled_references), 1000)
+    for array, resolved_array in zip(arrays, resolved_arrays):
+      self.assertTrue(np.array_equal(array, resolved_array))
+      self.assertEqual(array.dtype, resolved_array.dtype)
+      self.assertFalse(resolved_array.flags.writeable)
+    # arrays that aren't shared are kept
+    self.assertIs(arrays[0], SharedWeights.reference(arrays[0]))
+
+  def test_updates_are_visible_to_unpickled_networks(self):
+    np.random.seed(42)
+    network = DenseNetwork([np.random.randn(36, 20), np.random.randn(20, 1)],
+        [np.random.randn(20), np.zeros(1)]).share()
+    new_network = DenseNetwork([np.random.randn(36, 20), np.random.randn(20, 1)],
+        [np.random.randn(20), np.zeros(1)])
+    states = np.random.randint(0, 250, (9, 36))
+
+    unpickled_network = pickle.loads(pickle.dumps(network))
+    network.update_shared_weights(new_network)
+
+    self.assertTrue(np.array_equal(new_network.predict(states), unpickled_network.predict(states)))
+
+  def test_trained_regressor_stays_shared(self):
+    Config.SHARED_WEIGHTS = True
+    np.random.seed(42)
+    regressor = MLPRegressor(hidden_layer_sizes=(20,))
+    regressor.partial_fit(np.random.randint(0, 250, (200, 36)), np.random.randint(-100, 100, 200))
+    regressor.training_samples = 200
+    regressor.game_type = GameType.OBENABE
+    player = SklearnPlayer("p1", 1, regressor, False, MagicMock())
+    states = np.random.randint(0, 250, (9, 36))
+
+    unpickled_player = pickle.loads(pickle.dumps(player))
+    player._train_model(np.random.randint(0, 250, (100, 37)), MagicMock()) # pylint: disable=protected-access
+
+    self.assertTrue(SharedWeights.is_shared(regressor.coefs_[0]))
+    self.assertTrue(np.array_equal(regressor.predict(states), unpickled_player.regressor.predict(states)))
+
+  def test_processes_map_updated_weights(self):
+    SharedWeights.initialize()
+    network = DenseNetwork([np.ones((36, 20)), np.ones((20, 1))], [np.zeros(20), np.zeros(1)]).share()
+    pickled_network = pickle.dumps(network)
+
+    with Pool(processes=1) as pool:
+      self.assertEqual(740, pool.apply(sum_network_weights, (pickled_network,)))
+      network.update_shared_weights(DenseNetwork([2 * np.ones((36, 20)), np.ones((20, 1))],
+        [np.zeros(20), np.zeros(1)]))
+      self.assertEqual(1460, pool.apply(sum_network_weights, (pickled_network,)))